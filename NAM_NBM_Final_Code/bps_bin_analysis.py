@@ -1,7 +1,9 @@
+import argparse
 import pickle
 import pandas as pd
 import numpy as np
-from shared_functions import preprocess_data, dip_distribution_data_only, rise_distribution_data_only
+from preprocess_cache import load_preprocessed
+from breakeven_sweep import run_sweep, parse_breakevens
 import os
 from collections import defaultdict
 
@@ -46,39 +48,39 @@ def create_bps_bins(dips_bps, rises_bps, bin_size=1.0, max_bps=20):
     
     return pd.DataFrame(results)
 
-def analyze_all_breakevens(df1_path, df2_path, bin_size=1.0, max_bps=20):
+def analyze_all_breakevens(df1_path, df2_path, bin_size=1.0, max_bps=20, breakevens=None, sweep=None, max_workers=None):
     """
     Analyze all breakeven levels and create bps bin analysis
+
+    Args:
+        breakevens: Breakevens in 1/16ths (breakeven_sweep.default_breakevens() if None)
+        sweep: Result of breakeven_sweep.run_sweep to reuse (computed here if None)
+        max_workers: Process pool size for the sweep
     """
-    print("Preprocessing data...")
-    df, nan_ranges, cols_to_null = preprocess_data(df1_path, df2_path)
+    if sweep is None:
+        print("Preprocessing data...")
+        df, nan_ranges, cols_to_null = load_preprocessed(df1_path, df2_path)
+        sweep = run_sweep(df, nan_ranges, breakevens, max_workers=max_workers)
     
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    
+
     # Load existing percentile tables if they exist
     nbm_path = os.path.join(script_dir, 'distributions', 'percentile_tables_NBM.pkl')
     nam_path = os.path.join(script_dir, 'distributions', 'percentile_tables_NAM.pkl')
-    
+
     all_dips = []
     all_rises = []
     
-    breakeven_levels = [1, 1.5, 2, 2.5, 3, 4, 5]
-    
-    for breakeven in breakeven_levels:
-        breakeven_decimal = breakeven / 16
-        
-        print(f"Processing breakeven = {breakeven}/16...")
-        
-        # Get dips and rises for this breakeven
-        dips_bps = dip_distribution_data_only(df, breakeven_decimal, breakeven_decimal, nan_ranges)
-        rises_bps = rise_distribution_data_only(df, breakeven_decimal, breakeven_decimal, nan_ranges)
+    for breakeven in sweep['dip']:
+        dips_bps = sweep['dip'][breakeven]
+        rises_bps = sweep['rise'][breakeven]
         
         # Add to overall lists
         all_dips.extend(dips_bps)
         all_rises.extend(rises_bps)
         
-        print(f"  Found {len(dips_bps)} dips, {len(rises_bps)} rises")
+        print(f"Breakeven = {breakeven}/16: {len(dips_bps)} dips, {len(rises_bps)} rises")
     
     print(f"\nTotal: {len(all_dips)} dips, {len(all_rises)} rises")
     
@@ -105,18 +107,22 @@ def analyze_all_breakevens(df1_path, df2_path, bin_size=1.0, max_bps=20):
     
     return bps_df, all_dips, all_rises
 
-def analyze_single_breakeven(df1_path, df2_path, breakeven, bin_size=1.0, max_bps=20):
+def analyze_single_breakeven(df1_path, df2_path, breakeven, bin_size=1.0, max_bps=20, sweep=None):
     """
     Analyze a single breakeven level
+
+    Args:
+        sweep: Result of breakeven_sweep.run_sweep covering this breakeven (computed here if None)
     """
     print(f"Analyzing breakeven = {breakeven}/16...")
     
-    df, nan_ranges, cols_to_null = preprocess_data(df1_path, df2_path)
-    breakeven_decimal = breakeven / 16
+    if sweep is None:
+        df, nan_ranges, cols_to_null = load_preprocessed(df1_path, df2_path)
+        sweep = run_sweep(df, nan_ranges, [breakeven], max_workers=1)
     
     # Get dips and rises
-    dips_bps = dip_distribution_data_only(df, breakeven_decimal, breakeven_decimal, nan_ranges)
-    rises_bps = rise_distribution_data_only(df, breakeven_decimal, breakeven_decimal, nan_ranges)
+    dips_bps = sweep['dip'][breakeven]
+    rises_bps = sweep['rise'][breakeven]
     
     # Create bps bins analysis
     bps_df = create_bps_bins(dips_bps, rises_bps, bin_size, max_bps)
@@ -131,6 +137,13 @@ def analyze_single_breakeven(df1_path, df2_path, breakeven, bin_size=1.0, max_bp
     return bps_df, dips_bps, rises_bps
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count dips/rises per bps bin for each breakeven")
+    parser.add_argument('--breakevens', type=parse_breakevens, default=None,
+                        help="Comma-separated breakevens in 1/16ths (default: 1,1.5,2,2.5,3,4,5 or $BREAKEVEN_LEVELS)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: one per job up to the CPU count, 1 = no pool)")
+    args = parser.parse_args()
+
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
@@ -138,9 +151,14 @@ if __name__ == "__main__":
     df1_path = os.path.join(script_dir, 'ZN_1h_events_tagged_target_tz_nonevents.csv')
     df2_path = os.path.join(script_dir, 'Intraday_data_ZN_1h_2022-12-20_to_2025-06-11.csv')
     
+    # Preprocess once and compute every (breakeven, direction) distribution in one parallel sweep
+    print("Preprocessing data...")
+    df, nan_ranges, cols_to_null = load_preprocessed(df1_path, df2_path)
+    sweep = run_sweep(df, nan_ranges, args.breakevens, max_workers=args.workers)
+    
     # Analyze all breakeven levels combined
-    bps_df, all_dips, all_rises = analyze_all_breakevens(df1_path, df2_path, bin_size=1.0, max_bps=20)
+    bps_df, all_dips, all_rises = analyze_all_breakevens(df1_path, df2_path, bin_size=1.0, max_bps=20, sweep=sweep)
     
     # Also analyze individual breakeven levels
-    for breakeven in [1, 1.5, 2, 2.5, 3, 4, 5]:
-        analyze_single_breakeven(df1_path, df2_path, breakeven, bin_size=1.0, max_bps=20) 
\ No newline at end of file
+    for breakeven in sweep['dip']:
+        analyze_single_breakeven(df1_path, df2_path, breakeven, bin_size=1.0, max_bps=20, sweep=sweep)
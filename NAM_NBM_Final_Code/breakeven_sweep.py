@@ -0,0 +1,186 @@
+"""
+Parallel breakeven sweep for the dip/rise distributions.
+
+historical_analysis.py and bps_bin_analysis.py need the dip (NBM) and rise
+(NAM) distributions for every breakeven level. The jobs are independent, so
+run_sweep fans the (breakeven, direction) pairs out over a process pool.
+The preprocessed bars are copied once into a shared memory block: every
+worker attaches to it in its initializer and rebuilds the DataFrame on top of
+the shared buffers, so the frame is not pickled per job. Only the resulting
+bps arrays travel back to the parent.
+
+The breakeven levels default to DEFAULT_BREAKEVENS and can be overridden
+with parse_breakevens (e.g. "1,1.5,2") or the BREAKEVEN_LEVELS environment
+variable.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from shared_functions import dip_distribution_data_only, rise_distribution_data_only
+
+# Breakevens in 1/16ths of a point
+DEFAULT_BREAKEVENS = [1, 1.5, 2, 2.5, 3, 4, 5]
+
+# Direction -> distribution function (dips feed the NBM tables, rises the NAM tables)
+DIRECTIONS = {
+    'dip': dip_distribution_data_only,
+    'rise': rise_distribution_data_only,
+}
+
+# Set in each worker by _attach_worker
+_worker_df = None
+_worker_nan_ranges = None
+_worker_shm = None
+
+
+def parse_breakevens(text):
+    """
+    Parse a comma-separated list of breakevens ("1,1.5,2") into numbers.
+
+    Whole numbers come back as int so they match the keys of the existing
+    percentile tables (1, not 1.0).
+    """
+    breakevens = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        value = float(part)
+        if value <= 0:
+            raise ValueError(f"Breakeven must be positive: {part}")
+        breakevens.append(int(value) if value.is_integer() else value)
+    if not breakevens:
+        raise ValueError(f"No breakevens in '{text}'")
+    return breakevens
+
+
+def default_breakevens():
+    """DEFAULT_BREAKEVENS, or the BREAKEVEN_LEVELS environment variable if set."""
+    env = os.environ.get('BREAKEVEN_LEVELS')
+    return parse_breakevens(env) if env else list(DEFAULT_BREAKEVENS)
+
+
+class SharedFrame:
+    """
+    A DataFrame's columns copied into one shared memory block.
+
+    The layout (column, dtype, offset) is small and picklable, so it is sent to
+    the workers once; attach() rebuilds a DataFrame whose columns are views of
+    the shared buffer.
+    """
+
+    def __init__(self, df):
+        arrays = [(col, np.ascontiguousarray(df[col].to_numpy())) for col in df.columns]
+        self.length = len(df)
+        self.layout = []
+        offset = 0
+        for col, arr in arrays:
+            self.layout.append((col, arr.dtype.str, offset))
+            offset += arr.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (col, dtype, offset), (_, arr) in zip(self.layout, arrays):
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=self.shm.buf, offset=offset)[:] = arr
+
+    @property
+    def spec(self):
+        return (self.shm.name, self.length, self.layout)
+
+    @staticmethod
+    def attach(spec):
+        """Rebuild the DataFrame from a spec; returns (df, shm) and shm must stay open while df is used."""
+        name, length, layout = spec
+        shm = shared_memory.SharedMemory(name=name)
+        columns = {}
+        for col, dtype, offset in layout:
+            arr = np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            arr.flags.writeable = False
+            columns[col] = arr
+        return pd.DataFrame(columns, copy=False), shm
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach_worker(spec, nan_ranges):
+    global _worker_df, _worker_nan_ranges, _worker_shm
+    _worker_df, _worker_shm = SharedFrame.attach(spec)
+    _worker_nan_ranges = nan_ranges
+
+
+def _run_job(breakeven, direction):
+    start = time.perf_counter()
+    breakeven_decimal = breakeven / 16
+    values = DIRECTIONS[direction](_worker_df, breakeven_decimal, breakeven_decimal, _worker_nan_ranges)
+    return breakeven, direction, values, time.perf_counter() - start
+
+
+def run_sweep(df, nan_ranges, breakevens=None, directions=('dip', 'rise'), max_workers=None):
+    """
+    Compute the dip/rise distributions for every breakeven in parallel.
+
+    Args:
+        df (pd.DataFrame): Bars from preprocess_data
+        nan_ranges (dict): NaN runs from preprocess_data
+        breakevens (list): Breakevens in 1/16ths (default_breakevens() if None)
+        directions (tuple): Any of 'dip' and 'rise'
+        max_workers (int): Pool size (default: one per job, capped at the CPU count);
+                           1 runs the jobs in this process
+
+    Returns:
+        dict: direction -> {breakeven: bps array}, breakevens in the order given
+    """
+    breakevens = default_breakevens() if breakevens is None else list(breakevens)
+    jobs = [(breakeven, direction) for breakeven in breakevens for direction in directions]
+    if max_workers is None:
+        max_workers = min(len(jobs), os.cpu_count() or 1)
+    max_workers = max(1, min(max_workers, len(jobs)))
+
+    results = {direction: {} for direction in directions}
+    start = time.perf_counter()
+
+    if max_workers == 1:
+        for breakeven, direction in jobs:
+            breakeven_decimal = breakeven / 16
+            results[direction][breakeven] = DIRECTIONS[direction](df, breakeven_decimal, breakeven_decimal, nan_ranges)
+            print(f"  {direction} breakeven {breakeven}/16: {len(results[direction][breakeven])} samples")
+    else:
+        shared = SharedFrame(df)
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_worker,
+                                     initargs=(shared.spec, nan_ranges)) as pool:
+                futures = [pool.submit(_run_job, breakeven, direction) for breakeven, direction in jobs]
+                for future in as_completed(futures):
+                    breakeven, direction, values, elapsed = future.result()
+                    results[direction][breakeven] = values
+                    print(f"  {direction} breakeven {breakeven}/16: {len(values)} samples ({elapsed:.2f} s)")
+        finally:
+            shared.close()
+
+    # Completion order is arbitrary; keep the breakevens in the order given
+    results = {direction: {b: results[direction][b] for b in breakevens} for direction in directions}
+    print(f"Sweep of {len(jobs)} jobs on {max_workers} worker(s) took {time.perf_counter() - start:.2f} s")
+    return results
+
+
+if __name__ == "__main__":
+    # Parity of the pooled sweep with the in-process run on the historical bars
+    from shared_functions import preprocess_data
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    df, nan_ranges, _ = preprocess_data(
+        os.path.join(script_dir, 'ZN_1h_events_tagged_target_tz_nonevents.csv'),
+        os.path.join(script_dir, 'Intraday_data_ZN_1h_2022-12-20_to_2025-06-11.csv'))
+
+    sequential = run_sweep(df, nan_ranges, max_workers=1)
+    pooled = run_sweep(df, nan_ranges, max_workers=4)
+    checks = [list(sequential[d]) == list(pooled[d]) and
+              all(np.array_equal(sequential[d][b], pooled[d][b]) for b in sequential[d])
+              for d in sequential]
+    print("PASSED" if all(checks) else f"FAILED: {checks}")
@@ -1,54 +1,66 @@
+import argparse
 import pickle
 import pandas as pd
 import numpy as np
-from shared_functions import preprocess_data, dip_distribution_data_only, rise_distribution_data_only
+from preprocess_cache import load_preprocessed
+from breakeven_sweep import run_sweep, parse_breakevens
+from percentile_store import store_path, write_percentile_store
 import os
 
-def generate_dip_distributions(df1_path, df2_path):
-    """Generate dip distributions from historical data"""
+def _non_empty(distributions, label):
+    """Keep the breakevens that produced samples"""
+    kept = {}
+    for breakeven, values in distributions.items():
+        if len(values) > 0:
+            kept[breakeven] = values
+            print(f"  breakeven {breakeven}/16: found {len(values)} {label}")
+    return kept
+
+def generate_distributions(df1_path, df2_path, breakevens=None, max_workers=None):
+    """
+    Generate the dip and rise distributions from historical data in one parallel sweep
+
+    Args:
+        df1_path: Event-tagged bars (times to keep)
+        df2_path: Intraday bars
+        breakevens: Breakevens in 1/16ths (breakeven_sweep.default_breakevens() if None)
+        max_workers: Process pool size (see breakeven_sweep.run_sweep)
+
+    Returns:
+        (dip distributions, rise distributions, df, nan_ranges)
+    """
     print("Preprocessing data...")
-    df, nan_ranges, cols_to_null = preprocess_data(df1_path, df2_path)
-
-    print("Generating dip distributions...")
-    distributions = {}
+    df, nan_ranges, cols_to_null = load_preprocessed(df1_path, df2_path)
 
     # Ensure the output directory exists
     os.makedirs('distributions', exist_ok=True)
 
-    for breakeven in [1, 1.5, 2, 2.5, 3, 4, 5]:
-        breakeven_decimal = breakeven / 16
+    print("Generating dip and rise distributions...")
+    sweep = run_sweep(df, nan_ranges, breakevens, max_workers=max_workers)
+
+    return _non_empty(sweep['dip'], "dips"), _non_empty(sweep['rise'], "rises"), df, nan_ranges
 
-        print(f"Processing max_rise = {breakeven}/16...")
-        dips_bps = dip_distribution_data_only(df, breakeven_decimal, breakeven_decimal, nan_ranges)
+def generate_dip_distributions(df1_path, df2_path, breakevens=None, max_workers=None):
+    """Generate dip distributions from historical data"""
+    print("Preprocessing data...")
+    df, nan_ranges, cols_to_null = load_preprocessed(df1_path, df2_path)
 
-        if len(dips_bps) > 0:
-            distributions[breakeven] = dips_bps
-            print(f"  Found {len(dips_bps)} dips")
+    print("Generating dip distributions...")
+    os.makedirs('distributions', exist_ok=True)
+    sweep = run_sweep(df, nan_ranges, breakevens, directions=('dip',), max_workers=max_workers)
 
-    return distributions, df, nan_ranges
+    return _non_empty(sweep['dip'], "dips"), df, nan_ranges
 
-def generate_rise_distributions(df1_path, df2_path):
+def generate_rise_distributions(df1_path, df2_path, breakevens=None, max_workers=None):
     """Generate rise distributions from historical data"""
     print("Preprocessing data...")
-    df, nan_ranges, cols_to_null = preprocess_data(df1_path, df2_path)
+    df, nan_ranges, cols_to_null = load_preprocessed(df1_path, df2_path)
 
     print("Generating rise distributions...")
-    distributions = {}
-
-    # Ensure the output directory exists
     os.makedirs('distributions', exist_ok=True)
+    sweep = run_sweep(df, nan_ranges, breakevens, directions=('rise',), max_workers=max_workers)
 
-    for breakeven in [1, 1.5, 2, 2.5, 3, 4, 5]:
-        breakeven_decimal = breakeven / 16
-
-        print(f"Processing max_rise = {breakeven}/16...")
-        rises_bps = rise_distribution_data_only(df, breakeven_decimal, breakeven_decimal, nan_ranges)
-
-        if len(rises_bps) > 0:
-            distributions[breakeven] = rises_bps
-            print(f"  Found {len(rises_bps)} rise")
-
-    return distributions, df, nan_ranges
+    return _non_empty(sweep['rise'], "rises"), df, nan_ranges
 
 
 def save_percentile_lookup_tables_NBM(distributions):
@@ -82,6 +94,8 @@ def save_percentile_lookup_tables_NBM(distributions):
     
     with open(output_path, 'wb') as f:
         pickle.dump(percentile_tables, f)
+    # Percentile store read by live_monitor
+    write_percentile_store(percentile_tables, store_path(output_path))
 
     print("NBM Percentile tables saved!")
     return percentile_tables
@@ -117,12 +131,21 @@ def save_percentile_lookup_tables_NAM(distributions):
     
     with open(output_path, 'wb') as f:
         pickle.dump(percentile_tables, f)
+    # Percentile store read by live_monitor
+    write_percentile_store(percentile_tables, store_path(output_path))
 
     print("NAM Percentile tables saved!")
     return percentile_tables
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Build the NBM/NAM percentile tables")
+    parser.add_argument('--breakevens', type=parse_breakevens, default=None,
+                        help="Comma-separated breakevens in 1/16ths (default: 1,1.5,2,2.5,3,4,5 or $BREAKEVEN_LEVELS)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: one per job up to the CPU count, 1 = no pool)")
+    args = parser.parse_args()
+
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
@@ -130,15 +153,15 @@ def main():
     df1_path = os.path.join(script_dir, 'ZN_1h_events_tagged_target_tz_nonevents.csv')
     df2_path = os.path.join(script_dir, 'Intraday_data_ZN_1h_2022-12-20_to_2025-06-11.csv')
 
-    # Generate DIP distributions
-    distributions, df, nan_ranges = generate_dip_distributions(df1_path, df2_path)
-    print(f"🔍 DEBUG: DIP distributions keys before saving: {list(distributions.keys())}")
-    percentile_tables = save_percentile_lookup_tables_NBM(distributions)
+    # Generate DIP and RISE distributions in one sweep
+    dip_distributions, rise_distributions, df, nan_ranges = generate_distributions(
+        df1_path, df2_path, args.breakevens, args.workers)
+
+    print(f"🔍 DEBUG: DIP distributions keys before saving: {list(dip_distributions.keys())}")
+    percentile_tables = save_percentile_lookup_tables_NBM(dip_distributions)
 
-    # Generate RISE distributions
-    distributions, df, nan_ranges = generate_rise_distributions(df1_path, df2_path)
-    print(f"🔍 DEBUG: RISE distributions keys before saving: {list(distributions.keys())}")
-    percentile_tables = save_percentile_lookup_tables_NAM(distributions)
+    print(f"🔍 DEBUG: RISE distributions keys before saving: {list(rise_distributions.keys())}")
+    percentile_tables = save_percentile_lookup_tables_NAM(rise_distributions)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
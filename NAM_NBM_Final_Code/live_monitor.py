@@ -3,6 +3,7 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 from shared_functions import preprocess_data, find_minimal_intervals
+from percentile_store import PercentileStore, store_path, write_percentile_store
 import matplotlib.pyplot as plt
 import time
 import os
@@ -148,12 +149,55 @@ def load_percentile_tables_NBM():
     with open(file_path, 'rb') as f:
         return pickle.load(f)
 
+def _load_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+class PercentileTableFile:
+    """Percentile tables from a file, re-read when the file is replaced (see percentile_updater.py)"""
+
+    def __init__(self, file_name, load=_load_pickle):
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.path = os.path.join(script_dir, 'distributions', file_name)
+        self._load = load
+        self._stamp = None
+        self._tables = None
+
+    def get(self):
+        """The current tables, reloading them if the file changed since the last call"""
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            if stamp != self._stamp:
+                tables = self._load(self.path)
+                if self._stamp is not None:
+                    print(f"Reloaded percentile tables from {self.path}")
+                self._tables, self._stamp = tables, stamp
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError) as e:
+            if self._tables is None:
+                raise
+            print(f"Keeping the loaded percentile tables, can't read {self.path}: {e}")
+        return self._tables
+
+def open_percentile_store(name):
+    """
+    Percentile store (see percentile_store.py) of percentile_tables_<name>.pkl, NBM or NAM.
+
+    The store is (re)built from the pickle if it is missing or older.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    pickle_path = os.path.join(script_dir, 'distributions', f'percentile_tables_{name}.pkl')
+    path = store_path(pickle_path)
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(pickle_path):
+        write_percentile_store(_load_pickle(pickle_path), path)
+    return PercentileTableFile(os.path.basename(path), load=PercentileStore)
+
 def lookup_dip_percentile(dip_bps, percentile_tables, breakeven_decimal):
     """Look up what percentile the current dip represents"""
     
-    # Historical tables are keyed by tick counts (e.g., 3, 4, 5) whereas here we receive
+    # Historical tables are keyed by tick counts (e.g., 1.5, 3, 4) whereas here we receive
     # the decimal value (3/16 = 0.1875). Convert to ticks so we can locate the correct entry.
-    breakeven_ticks = int(round(breakeven_decimal * 16))
+    breakeven_ticks = breakeven_decimal * 16
 
     if breakeven_ticks not in percentile_tables:
         print(f"No historical data found for breakeven ticks = {breakeven_ticks}")
@@ -177,9 +221,9 @@ def lookup_dip_percentile(dip_bps, percentile_tables, breakeven_decimal):
 def lookup_rise_percentile(rise_bps, percentile_tables, breakeven_decimal):
     """Look up what percentile the current dip represents"""
     
-    # Historical tables are keyed by tick counts (e.g., 3, 4, 5) whereas here we receive
+    # Historical tables are keyed by tick counts (e.g., 1.5, 3, 4) whereas here we receive
     # the decimal value (3/16 = 0.1875). Convert to ticks so we can locate the correct entry.
-    breakeven_ticks = int(round(breakeven_decimal * 16))
+    breakeven_ticks = breakeven_decimal * 16
 
     if breakeven_ticks not in percentile_tables:
         print(f"No historical data found for breakeven ticks = {breakeven_ticks}")
@@ -287,8 +331,9 @@ def live_NBM_NAM():
         5/16: 25.03,
     }
 
-    percentile_tables_NAM = load_percentile_tables_NAM()
-    percentile_tables_NBM = load_percentile_tables_NBM()
+    # Percentile stores, re-read when percentile_updater.py replaces them
+    store_NAM = open_percentile_store('NAM')
+    store_NBM = open_percentile_store('NBM')
 
     script_dir = os.path.dirname(os.path.abspath(__file__))
     df = pd.read_csv(os.path.join(script_dir, "Live_ZN_Prices.csv"))
@@ -312,7 +357,7 @@ def live_NBM_NAM():
             dip_bps[breakeven_decimal], anchor_point_NBM[breakeven_decimal], minima, anchor_time_NBM = result_dip
             dip_remaining[breakeven_decimal] = NBM_99th[breakeven_decimal] - dip_bps[breakeven_decimal]
             # Find percentile of this dip
-            percentile[breakeven_decimal] = lookup_dip_percentile(dip_bps[breakeven_decimal], percentile_tables_NBM, breakeven_decimal)
+            percentile[breakeven_decimal] = store_NBM.get().lookup(dip_bps[breakeven_decimal], [breakeven_decimal * 16])[0]
             print(f"Current dip: {dip_bps[breakeven_decimal]:.2f} bps")
             print(f"Anchor point: {anchor_point_NBM[breakeven_decimal]:.4f}")  
             print(f"Anchor time: {anchor_time_NBM}")
@@ -325,7 +370,7 @@ def live_NBM_NAM():
             rise_bps[breakeven_decimal], anchor_point_NAM[breakeven_decimal], maxima, anchor_time_NAM = result_rise
             rise_remaining[breakeven_decimal] = NAM_99th[breakeven_decimal] - rise_bps[breakeven_decimal]
             # Find percentile of this rise
-            percentile_NAM[breakeven_decimal] = lookup_rise_percentile(rise_bps[breakeven_decimal], percentile_tables_NAM, breakeven_decimal)
+            percentile_NAM[breakeven_decimal] = store_NAM.get().lookup(rise_bps[breakeven_decimal], [breakeven_decimal * 16])[0]
             print(f"Current rise: {rise_bps[breakeven_decimal]:.2f} bps")
             print(f"Anchor point: {anchor_point_NAM[breakeven_decimal]:.4f}")  
             print(f"Anchor time: {anchor_time_NAM}")
@@ -334,10 +379,13 @@ def live_NBM_NAM():
             print(f"Rise remaining: {rise_remaining[breakeven_decimal]:.2f} bps")
             print("--------------------------------")
 
+    breakevens_decimal = [1/16, 1.5/16, 2/16, 2.5/16, 3/16, 4/16, 5/16]
+    breakevens = [breakeven_decimal * 16 for breakeven_decimal in breakevens_decimal]
+
     while True:
         df = pd.read_csv(os.path.join(script_dir, "Live_ZN_Prices.csv"))
         current_price = df["Close"].iloc[-1]
-        for breakeven_decimal in [1/16, 1.5/16, 2/16, 2.5/16, 3/16, 4/16, 5/16]:
+        for breakeven_decimal in breakevens_decimal:
 
             if current_price - minima > breakeven_decimal:
                 if current_price > anchor_point_NBM[breakeven_decimal]:
@@ -349,7 +397,11 @@ def live_NBM_NAM():
             
             dip_bps[breakeven_decimal] = (anchor_point_NBM[breakeven_decimal] - current_price) * 16
             dip_remaining[breakeven_decimal] = NBM_99th[breakeven_decimal] - dip_bps[breakeven_decimal]
-            percentile[breakeven_decimal] = lookup_dip_percentile(dip_bps[breakeven_decimal], percentile_tables_NBM, breakeven_decimal)
+
+        # Every breakeven's percentile in one lookup
+        percentiles = store_NBM.get().lookup([dip_bps[b] for b in breakevens_decimal], breakevens)
+        percentile.update(zip(breakevens_decimal, percentiles))
+        for breakeven_decimal in breakevens_decimal:
             print(f"Current dip: {dip_bps[breakeven_decimal]:.2f} bps")
             print(f"Anchor point NBM: {anchor_point_NBM[breakeven_decimal]:.4f}")  
             print(f"Minima: {minima:.4f}")
@@ -358,7 +410,7 @@ def live_NBM_NAM():
             print(f"Anchor time: {anchor_time_NBM}")
             print("--------------------------------")
 
-        for breakeven_decimal in [1/16, 1.5/16, 2/16, 2.5/16, 3/16, 4/16, 5/16]:
+        for breakeven_decimal in breakevens_decimal:
 
             if maxima - current_price > breakeven_decimal:
                 if current_price < anchor_point_NAM[breakeven_decimal]:
@@ -370,7 +422,10 @@ def live_NBM_NAM():
             
             rise_bps[breakeven_decimal] = (current_price - anchor_point_NAM[breakeven_decimal]) * 16
             rise_remaining[breakeven_decimal] = NAM_99th[breakeven_decimal] - rise_bps[breakeven_decimal]
-            percentile_NAM[breakeven_decimal] = lookup_rise_percentile(rise_bps[breakeven_decimal], percentile_tables_NAM, breakeven_decimal)
+
+        percentiles = store_NAM.get().lookup([rise_bps[b] for b in breakevens_decimal], breakevens)
+        percentile_NAM.update(zip(breakevens_decimal, percentiles))
+        for breakeven_decimal in breakevens_decimal:
             print(f"Current rise: {rise_bps[breakeven_decimal]:.2f} bps")
             print(f"Anchor point NAM: {anchor_point_NAM[breakeven_decimal]:.4f}")  
             print(f"Maxima: {maxima:.4f}")
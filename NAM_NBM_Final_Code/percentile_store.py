@@ -0,0 +1,231 @@
+"""
+Compact percentile tables with a batched lookup.
+
+The pickled percentile tables hold one dict per breakeven (sorted values, a
+linspace of percentiles and stats), and live_monitor looks each breakeven up
+separately. A percentile store keeps one direction's tables in a single
+read-only file:
+
+    header    64 bytes: magic, number of breakevens n, number of values total
+    breakevens  float64[n]      breakevens in 1/16ths, ascending
+    offsets     int64[n + 1]    row i is keys[offsets[i]:offsets[i + 1]]
+    stats       float64[n, 3]   mean, p95, p99 of each row
+    keys        complex128[total]  row + 1j * value, every row sorted
+
+Keys pair the row number (real part) with the value (imaginary part). NumPy
+orders complex numbers by real part, then imaginary part, so the stacked
+array is sorted as a whole, and one np.searchsorted call finds the insert
+position of a value in every row. The percentiles are not stored;
+np.linspace(0, 100, count)[i] is i * (100 / (count - 1)), and that is what
+lookup computes. lookup returns exactly what lookup_dip_percentile and
+lookup_rise_percentile return for each table.
+
+Opening a store reads the whole file in one call and closes it; the arrays
+are views on those bytes, so nothing is parsed. No handle stays open, which
+Windows needs for write_percentile_store to rename a new file over the old
+one while live_monitor is running. Readers open the file again when it
+changes (live_monitor.PercentileTableFile).
+"""
+
+import os
+import struct
+import time
+
+import numpy as np
+
+_MAGIC = b'PCTSTOR1'
+_HEADER = struct.Struct('<8sqq')
+_HEADER_SIZE = 64
+
+# Value key of each direction in the pickled tables
+VALUE_KEYS = ('dips', 'rises')
+
+# os.replace fails on Windows while a reader has the target open; readers
+# only hold it for one read, so retry for a moment
+_REPLACE_ATTEMPTS = 20
+_REPLACE_RETRY_DELAY = 0.05
+
+
+def store_path(pickle_path):
+    """percentile_tables_NBM.pkl -> percentile_tables_NBM.pct"""
+    return os.path.splitext(pickle_path)[0] + '.pct'
+
+
+def _complex_keys(rows, values):
+    """rows + 1j * values, without 1j * inf turning the real part into NaN"""
+    keys = np.empty(len(rows), dtype=np.complex128)
+    keys.real = rows
+    keys.imag = values
+    return keys
+
+
+def replace_file(tmp_path, path):
+    """os.replace, retried while another process has the target open (Windows)."""
+    for attempt in range(_REPLACE_ATTEMPTS):
+        try:
+            os.replace(tmp_path, path)
+            return
+        except PermissionError:
+            if attempt == _REPLACE_ATTEMPTS - 1:
+                raise
+            time.sleep(_REPLACE_RETRY_DELAY)
+
+
+def write_percentile_store(percentile_tables, path):
+    """
+    Write pickled-format percentile tables to a store file, replacing it atomically.
+
+    Args:
+        percentile_tables: {breakeven: {'dips' or 'rises': sorted values, 'stats': {...}}}
+        path: Store file
+    """
+    breakevens = sorted(percentile_tables)
+    rows, stats = [], []
+    for breakeven in breakevens:
+        table = percentile_tables[breakeven]
+        key = next(k for k in VALUE_KEYS if k in table)
+        rows.append(np.asarray(table[key], dtype=np.float64))
+        stats.append([table['stats']['mean'], table['stats']['p95'], table['stats']['p99']])
+
+    offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(row) for row in rows])
+    keys = _complex_keys(np.repeat(np.arange(len(rows)), np.diff(offsets)),
+                         np.concatenate(rows) if rows else np.array([]))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, len(breakevens), len(keys)).ljust(_HEADER_SIZE, b'\0'))
+        f.write(np.asarray(breakevens, dtype='<f8').tobytes())
+        f.write(offsets.astype('<i8').tobytes())
+        f.write(np.asarray(stats, dtype='<f8').reshape(-1, 3).tobytes())
+        f.write(keys.astype('<c16').tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    replace_file(tmp_path, path)
+
+
+class PercentileStore:
+    """One direction's percentile tables, read from a store file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, n, total = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a percentile store")
+        pos = _HEADER_SIZE
+        self.breakevens = np.frombuffer(data, dtype='<f8', count=n, offset=pos)
+        pos += 8 * n
+        self.offsets = np.frombuffer(data, dtype='<i8', count=n + 1, offset=pos)
+        pos += 8 * (n + 1)
+        self.stats = np.frombuffer(data, dtype='<f8', count=3 * n, offset=pos).reshape(n, 3)
+        pos += 24 * n
+        self.keys = np.frombuffer(data, dtype='<c16', count=total, offset=pos)
+        if self.offsets[-1] != total or pos + 16 * total != len(data):
+            raise ValueError(f"{path} is truncated or inconsistent")
+        self.counts = np.diff(self.offsets)
+        self._rows = {float(b): i for i, b in enumerate(self.breakevens)}
+        # Query keys and percentile steps of the every-breakeven lookup, reused per call
+        self._query = _complex_keys(np.arange(n), np.zeros(n))
+        self._steps = 100 / np.maximum(self.counts - 1, 1)
+
+    def values(self, breakeven):
+        """Sorted values of one breakeven (a read-only view)."""
+        i = self._rows[float(breakeven)]
+        return self.keys[self.offsets[i]:self.offsets[i + 1]].imag
+
+    def lookup(self, values, breakevens=None):
+        """
+        Percentile of a value in each breakeven's table, in one searchsorted call.
+
+        Args:
+            values: One value per breakeven (or one value for all), in bps
+            breakevens: Breakevens in 1/16ths (default: every breakeven in the store)
+
+        Returns:
+            np.ndarray: Percentile per breakeven; 0 below the smallest value, 100 at or
+                        above the largest, NaN for breakevens that have no table
+        """
+        if breakevens is None:
+            return self._lookup_rows(self._query.copy(), values, self.offsets[:-1], self.counts, self._steps)
+
+        breakevens = np.atleast_1d(np.asarray(breakevens, dtype=float))
+        rows = np.array([self._rows.get(float(b), -1) for b in breakevens], dtype=np.int64)
+        values = np.broadcast_to(np.asarray(values, dtype=float), rows.shape)
+        known = rows >= 0
+        result = np.full(rows.shape, np.nan)
+        if not known.any():
+            return result
+
+        rows = rows[known]
+        query = _complex_keys(rows, np.zeros(len(rows)))
+        result[known] = self._lookup_rows(query, values[known], self.offsets[rows], self.counts[rows],
+                                          self._steps[rows])
+        return result
+
+    def _lookup_rows(self, query, values, offsets, counts, steps):
+        # lookup_dip_percentile: 0 before the first value, percentiles[idx] inside
+        # (the last one is exactly 100), 100 after the last value
+        query.imag = values
+        idx = np.searchsorted(self.keys, query, side='right') - offsets
+        percentiles = idx * steps
+        percentiles[idx >= counts - 1] = 100.0
+        percentiles[idx == 0] = 0.0
+        return percentiles
+
+
+if __name__ == "__main__":
+    # Convert the pickled tables, check the batched lookup against the
+    # per-breakeven lookups of live_monitor and time both
+    import pickle
+    from live_monitor import lookup_dip_percentile, lookup_rise_percentile
+
+    distributions_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'distributions')
+    checks = []
+    for name, lookup_one in (('NBM', lookup_dip_percentile), ('NAM', lookup_rise_percentile)):
+        pickle_path = os.path.join(distributions_dir, f'percentile_tables_{name}.pkl')
+        with open(pickle_path, 'rb') as f:
+            tables = pickle.load(f)
+
+        path = store_path(pickle_path)
+        write_percentile_store(tables, path)
+        start = time.perf_counter()
+        for _ in range(1000):
+            with open(pickle_path, 'rb') as f:
+                pickle.load(f)
+        pickle_load = (time.perf_counter() - start) / 1000
+        start = time.perf_counter()
+        for _ in range(1000):
+            store = PercentileStore(path)
+        store_load = (time.perf_counter() - start) / 1000
+
+        # Every breakeven live_monitor tracks, 1.5 and 2.5 included
+        breakevens = sorted(tables)
+        rng = np.random.default_rng(0)
+        samples = np.concatenate([np.arange(0, 30, 0.25), rng.uniform(0, 30, 200), [np.inf, -1.0]])
+        for b in tables:
+            samples = np.concatenate([samples, tables[b]['dips' if name == 'NBM' else 'rises']])
+        for value in samples:
+            expected = [lookup_one(value, tables, b / 16) for b in breakevens]
+            checks.append(np.array_equal(store.lookup(value, breakevens), expected))
+        checks.append(all(np.array_equal(store.values(b), tables[b]['dips' if name == 'NBM' else 'rises'])
+                          for b in tables))
+        checks.append(np.isnan(store.lookup(10.0, [7])[0]))
+
+        n = 20000
+        values = np.full(len(tables), 10.0)
+        start = time.perf_counter()
+        for _ in range(n):
+            for b in tables:
+                lookup_one(10.0, tables, b / 16)
+        one_by_one = (time.perf_counter() - start) / n
+        start = time.perf_counter()
+        for _ in range(n):
+            store.lookup(values)
+        batched = (time.perf_counter() - start) / n
+        print(f"{name}: {len(tables)} breakevens, {int(store.counts.sum())} values -> {path} "
+              f"({os.path.getsize(path)} bytes)")
+        print(f"  load: pickle {pickle_load * 1e6:.0f} us, store {store_load * 1e6:.0f} us; "
+              f"lookup of all breakevens: one by one {one_by_one * 1e6:.1f} us, batched {batched * 1e6:.1f} us")
+    print("PASSED" if all(checks) else f"FAILED: {checks.count(False)} of {len(checks)} checks")
@@ -0,0 +1,416 @@
+"""
+Incremental update of the NBM/NAM percentile tables from new price bars.
+
+historical_analysis.py builds percentile_tables_NBM.pkl (dips) and
+percentile_tables_NAM.pkl (rises) in one batch run over the historical
+hourly bars. This updater keeps the tables current: it turns a live price
+log (Live_ZN_Prices.csv or a TT price log, both read on US/Eastern time like
+the historical bars, see lib/trading/price_log.py) into completed hourly bars,
+appends them to the bar history kept in its state file, finds the dip/rise
+episodes that completed since the last run, sorted-inserts their sizes into
+the tables and atomically replaces the table files and their percentile
+stores, so a running live_monitor picks them up on its next reload.
+
+Episodes are found exactly like dip_distribution_data_only and
+rise_distribution_data_only: the left-to-right walk over minimal intervals
+resumes where the previous run stopped, and stops at the first start whose
+interval could still change with more bars (its forward scan reaches the end
+of the data). The forward scans only cover the bars from that position on;
+the backward scan of each new episode runs on the prefix sums of the whole
+history. Appending bars in any number of batches gives the same episodes as
+one run over all of them.
+
+The state file (distributions/percentile_update_state.pkl) holds the bar
+history and the walk position per (direction, breakeven). It is created on
+the first run from the cached historical data; the tables are rebuilt from
+the same walk at that point, so nothing is counted twice. Live bars carry no
+event tags, so they are never masked like event hours; a gap longer than
+max_gap between bars is stored as a NaN bar so no episode spans it.
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Standalone scripts in this folder: make the workspace root (lib/) importable
+workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if workspace_root not in sys.path:
+    sys.path.insert(0, workspace_root)
+
+from lib.trading.price_log import load_price_log
+from shared_functions import _minimal_interval_ends, _max_moves_before
+from preprocess_cache import load_preprocessed
+from breakeven_sweep import default_breakevens, parse_breakevens
+from percentile_store import replace_file, store_path, write_percentile_store
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DISTRIBUTIONS_DIR = os.path.join(SCRIPT_DIR, 'distributions')
+NBM_TABLES_PATH = os.path.join(DISTRIBUTIONS_DIR, 'percentile_tables_NBM.pkl')
+NAM_TABLES_PATH = os.path.join(DISTRIBUTIONS_DIR, 'percentile_tables_NAM.pkl')
+STATE_PATH = os.path.join(DISTRIBUTIONS_DIR, 'percentile_update_state.pkl')
+
+HISTORICAL_EVENTS_CSV = os.path.join(SCRIPT_DIR, 'ZN_1h_events_tagged_target_tz_nonevents.csv')
+HISTORICAL_BARS_CSV = os.path.join(SCRIPT_DIR, 'Intraday_data_ZN_1h_2022-12-20_to_2025-06-11.csv')
+
+STATE_VERSION = 1
+MAX_INTERVAL_LENGTH = 300     # max_length of find_minimal_intervals
+THRESHOLD_BPS = 6             # threshold_for_NBM of the distribution functions
+
+# direction -> (sign of the minimal intervals, sign of the move before them, table value key)
+DIRECTIONS = {
+    'dip': (1, -1, 'dips'),
+    'rise': (-1, 1, 'rises'),
+}
+
+_BAR_COLUMNS = ['Adj Close', 'Close', 'High', 'Low', 'Open', 'Volume']
+
+
+def load_price_bars(csv_path, freq='1h'):
+    """
+    Resample a price log into completed OHLC bars.
+
+    Args:
+        csv_path: Price log (Live_ZN_Prices.csv or TT price log, see lib.trading.price_log)
+        freq: Bar size (the historical tables use hourly bars)
+
+    Returns:
+        DataFrame with the columns of preprocess_data (timestamp, Adj Close, Close,
+        High, Low, Open, Volume) on US/Eastern time; the bar of the last tick is still
+        open and left out.
+        Volume is 0, the price logs don't record it.
+    """
+    prices = load_price_log(csv_path)
+    if prices.empty:
+        return _empty_bars()
+
+    ohlc = prices.resample(freq).ohlc().dropna()
+    ohlc = ohlc[ohlc.index < prices.index[-1].floor(freq)]
+    bars = pd.DataFrame({
+        'timestamp': ohlc.index,
+        'Adj Close': ohlc['close'].to_numpy(),
+        'Close': ohlc['close'].to_numpy(),
+        'High': ohlc['high'].to_numpy(),
+        'Low': ohlc['low'].to_numpy(),
+        'Open': ohlc['open'].to_numpy(),
+        'Volume': 0.0,
+    })
+    return bars.reset_index(drop=True)
+
+
+def _empty_bars():
+    bars = pd.DataFrame({col: pd.Series(dtype=float) for col in _BAR_COLUMNS})
+    bars.insert(0, 'timestamp', pd.Series(dtype='datetime64[us]'))
+    return bars
+
+
+def compute_nan_ranges(bars):
+    """Runs of all-NaN bars as {first row: last row}, like preprocess_data's nan_ranges."""
+    mask = bars[_BAR_COLUMNS].isna().all(axis=1).to_numpy()
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    # preprocess_data never closes a run that starts on the last row
+    if len(mask) and mask[-1] and (len(mask) == 1 or not mask[-2]):
+        starts, ends = starts[:-1], ends[:-1]
+    return dict(zip(starts.tolist(), ends.tolist()))
+
+
+def _walk_decided(ends, undecided_from, nan_ranges, last_row, position):
+    """
+    The walk of _walk_minimal_intervals from position, stopping at the first
+    interval that ends at or after undecided_from or NaN run that ends on
+    last_row (either could still change with more bars).
+
+    Returns:
+        (list of recorded starts, position to resume from)
+    """
+    N = len(ends)
+    candidates = np.flatnonzero(ends >= 0)
+    range_starts = np.array(sorted(k for k in nan_ranges if k < N), dtype=np.int64)
+    recorded = []
+    i = position
+    while i < undecided_from:
+        c = np.searchsorted(candidates, i)
+        k = np.searchsorted(range_starts, i)
+        next_start = candidates[c] if c < len(candidates) else N
+        next_range = range_starts[k] if k < len(range_starts) else N
+        if next_range <= next_start and next_range < N:
+            if nan_ranges[int(next_range)] >= last_row:
+                # The NaN run reaches the last bar and may grow with the next bars
+                break
+            i = nan_ranges[int(next_range)] + 1
+        elif next_start < N and ends[next_start] < undecided_from:
+            recorded.append(int(next_start))
+            i = int(ends[next_start]) + 1
+        else:
+            # The next interval reaches the end of the data: wait for more bars
+            i = min(int(next_start), undecided_from) if next_start < N else undecided_from
+            break
+    return recorded, i
+
+
+def detect_episodes(bars, nan_ranges, position, breakeven, direction):
+    """
+    Dip or rise episodes completed after a walk position.
+
+    Args:
+        bars: Bar history (preprocess_data layout, sorted by timestamp)
+        nan_ranges: compute_nan_ranges(bars)
+        position: Walk position returned by the previous call (0 for a full run)
+        breakeven: Breakeven in 1/16ths
+        direction: 'dip' or 'rise'
+
+    Returns:
+        (sizes in bps that pass the NBM threshold, new walk position)
+    """
+    interval_sign, move_sign, _ = DIRECTIONS[direction]
+    breakeven_decimal = breakeven / 16
+
+    # The distribution functions scan the bars after the first one
+    close = bars['Close'].to_numpy()
+    body = bars.iloc[1:]
+    N = len(body)
+    if N < 2:
+        return np.array([]), position
+
+    delta = interval_sign * np.append(np.nan, np.diff(close[1:]))
+    row_has_nan = body.isna().any(axis=1).to_numpy()
+    # Two extra bars, the first one reaching any breakeven: a start whose scan
+    # is still open at the end of the data gets an interval ending at bar N.
+    # An interval ending on the last bar N-1 is open too (the next bar may be NaN)
+    delta = np.append(delta, [np.inf, 0.0])
+    row_has_nan = np.append(row_has_nan, [False, False])
+
+    # Forward scans from the walk position on (a scan never looks back)
+    offset = max(position - 1, 0)
+    ends = np.full(len(delta), -1, dtype=np.int64)
+    window_ends = _minimal_interval_ends(delta[offset:], row_has_nan[offset:], breakeven_decimal,
+                                         MAX_INTERVAL_LENGTH)
+    ends[offset:] = np.where(window_ends >= 0, window_ends + offset, -1)
+
+    starts, position = _walk_decided(ends, N - 1, nan_ranges, len(bars) - 1, position)
+    if not starts:
+        return np.array([]), position
+
+    times = body['timestamp'].iloc[np.asarray(starts, dtype=np.int64) + 1].tolist()
+    indexed = body.set_index('timestamp')
+    delta_close = np.append(np.nan, np.diff(close))
+    moves = np.array(_max_moves_before(indexed, delta_close, times, breakeven_decimal, move_sign), dtype=float)
+
+    moves_bps = moves * 16
+    moves_bps = moves_bps[~np.isnan(moves_bps)]
+    return moves_bps[moves_bps >= THRESHOLD_BPS], position
+
+
+def merge_into_table(table, values, key):
+    """
+    Sorted-insert new values into one percentile table entry.
+
+    Args:
+        table: {key: sorted values, 'percentiles', 'stats'} or None for a new entry
+        values: New sizes in bps
+        key: 'dips' or 'rises'
+
+    Returns:
+        dict: The merged entry (a new dict, the input is not modified)
+    """
+    current = np.asarray(table[key], dtype=float) if table is not None else np.array([])
+    values = np.sort(np.asarray(values, dtype=float))
+    merged = np.insert(current, np.searchsorted(current, values, side='right'), values)
+    return {
+        key: merged,
+        'percentiles': np.linspace(0, 100, len(merged)),
+        'stats': {
+            'count': len(merged),
+            'mean': np.mean(merged),
+            'p95': np.percentile(merged, 95),
+            'p99': np.percentile(merged, 99)
+        }
+    }
+
+
+def _atomic_pickle(obj, path):
+    """Pickle to a temporary file next to path, then rename it over path."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    replace_file(tmp_path, path)
+
+
+def _load_pickle(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def append_bars(bars, new_bars, max_gap=pd.Timedelta(days=4)):
+    """
+    Append the bars newer than the history's last bar.
+
+    A gap longer than max_gap between the history and the new bars is stored
+    as one NaN bar, which the episode search treats like an event hour.
+
+    Returns:
+        (DataFrame, number of bars appended)
+    """
+    if len(bars):
+        new_bars = new_bars[new_bars['timestamp'] > bars['timestamp'].iloc[-1]]
+    if new_bars.empty:
+        return bars, 0
+
+    pieces = [bars]
+    if len(bars) and new_bars['timestamp'].iloc[0] - bars['timestamp'].iloc[-1] > max_gap:
+        gap = pd.DataFrame({'timestamp': [bars['timestamp'].iloc[-1] + pd.Timedelta(hours=1)]})
+        pieces.append(gap.reindex(columns=bars.columns))
+    pieces.append(new_bars[bars.columns])
+    bars = pd.concat(pieces, ignore_index=True)
+    bars['timestamp'] = bars['timestamp'].astype(pieces[0]['timestamp'].dtype)
+    return bars, len(new_bars)
+
+
+def init_state(breakevens=None, df1_path=HISTORICAL_EVENTS_CSV, df2_path=HISTORICAL_BARS_CSV):
+    """
+    Start the updater from the historical data.
+
+    Returns:
+        (state, {direction: {breakeven: table entry}}) with the tables of the full walk
+    """
+    breakevens = default_breakevens() if breakevens is None else list(breakevens)
+    df, _, _ = load_preprocessed(df1_path, df2_path)
+    bars = df.copy()
+    state = {'version': STATE_VERSION, 'bars': bars, 'positions': {}}
+    tables = {direction: {} for direction in DIRECTIONS}
+    nan_ranges = compute_nan_ranges(bars)
+    for direction, (_, _, key) in DIRECTIONS.items():
+        for breakeven in breakevens:
+            values, position = detect_episodes(bars, nan_ranges, 0, breakeven, direction)
+            state['positions'][(direction, breakeven)] = position
+            if len(values) > 0:
+                tables[direction][breakeven] = merge_into_table(None, values, key)
+    return state, tables
+
+
+def update_percentile_tables(price_csv, state_path=STATE_PATH, nbm_path=NBM_TABLES_PATH,
+                             nam_path=NAM_TABLES_PATH, breakevens=None, reset=False):
+    """
+    Merge the episodes completed by new bars of a price log into the percentile tables.
+
+    Args:
+        price_csv: Price log to read the new bars from (None to only initialize)
+        state_path: Updater state file
+        nbm_path / nam_path: Dip / rise percentile tables, replaced atomically
+        breakevens: Breakevens in 1/16ths to track (used when the state is created)
+        reset: Rebuild the state and tables from the historical data first
+
+    Returns:
+        dict: direction -> {breakeven: number of new episodes}
+    """
+    start = time.perf_counter()
+    state = None if reset else _load_pickle(state_path)
+    paths = {'dip': nbm_path, 'rise': nam_path}
+
+    if state is None or state.get('version') != STATE_VERSION:
+        print("Initializing percentile updater state from the historical data...")
+        state, tables = init_state(breakevens)
+        for direction, path in paths.items():
+            _atomic_pickle(tables[direction], path)
+            write_percentile_store(tables[direction], store_path(path))
+        _atomic_pickle(state, state_path)
+        pending = max(len(state['bars']) - 1 - position for position in state['positions'].values())
+        print(f"  {len(state['bars'])} bars, tables rebuilt, up to {max(pending, 0)} trailing bars pending")
+
+    added = {direction: {} for direction in DIRECTIONS}
+    if price_csv is None:
+        return added
+
+    new_bars = load_price_bars(price_csv)
+    bars, appended = append_bars(state['bars'], new_bars)
+    print(f"{appended} new bars from {price_csv} (history: {len(bars)} bars, last {bars['timestamp'].iloc[-1]})")
+    if appended == 0:
+        return added
+
+    nan_ranges = compute_nan_ranges(bars)
+    positions = dict(state['positions'])
+    new_tables = {}
+    for direction, (_, _, key) in DIRECTIONS.items():
+        tables = _load_pickle(paths[direction], default={})
+        changed = False
+        for (d, breakeven), position in sorted(state['positions'].items(), key=lambda kv: (kv[0][0], kv[0][1])):
+            if d != direction:
+                continue
+            values, positions[(d, breakeven)] = detect_episodes(bars, nan_ranges, position, breakeven, direction)
+            added[direction][breakeven] = len(values)
+            if len(values) > 0:
+                tables[breakeven] = merge_into_table(tables.get(breakeven), values, key)
+                changed = True
+            print(f"  {direction} breakeven {breakeven}/16: {len(values)} new episodes")
+        if changed:
+            new_tables[direction] = tables
+
+    # Tables first, then the state: a crash in between makes the next run
+    # merge this run's episodes a second time, it never loses any
+    for direction, tables in new_tables.items():
+        _atomic_pickle(tables, paths[direction])
+        write_percentile_store(tables, store_path(paths[direction]))
+    _atomic_pickle({'version': STATE_VERSION, 'bars': bars, 'positions': positions}, state_path)
+    print(f"Percentile tables updated in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return added
+
+
+def _self_check():
+    """Bars appended in batches give the same episodes as one walk over all of them."""
+    from shared_functions import dip_distribution_data_only, rise_distribution_data_only
+
+    df, nan_ranges, _ = load_preprocessed(HISTORICAL_EVENTS_CSV, HISTORICAL_BARS_CSV)
+    bars = df.copy()
+    checks = [compute_nan_ranges(bars) == nan_ranges]
+    functions = {'dip': dip_distribution_data_only, 'rise': rise_distribution_data_only}
+    split = len(bars) - 2500
+    for direction in DIRECTIONS:
+        for breakeven in [1, 2.5, 5]:
+            full, position = detect_episodes(bars, nan_ranges, 0, breakeven, direction)
+            batch = functions[direction](df, breakeven / 16, breakeven / 16, nan_ranges)
+            # The batch run also records the intervals the walk is still waiting on
+            checks.append(np.array_equal(full, batch[:len(full)]))
+
+            history = bars.iloc[:split].reset_index(drop=True)
+            values, position = detect_episodes(history, compute_nan_ranges(history), 0, breakeven, direction)
+            pieces = [values]
+            for end in range(split + 37, len(bars) + 37, 37):
+                history = bars.iloc[:min(end, len(bars))].reset_index(drop=True)
+                values, position = detect_episodes(history, compute_nan_ranges(history), position,
+                                                   breakeven, direction)
+                pieces.append(values)
+            checks.append(np.array_equal(np.concatenate(pieces), full))
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge newly completed dips/rises into the percentile tables")
+    parser.add_argument('--prices', default=os.path.join(SCRIPT_DIR, 'Live_ZN_Prices.csv'),
+                        help="Price log to read new bars from (default: Live_ZN_Prices.csv)")
+    parser.add_argument('--breakevens', type=parse_breakevens, default=None,
+                        help="Breakevens in 1/16ths to track when the state is created")
+    parser.add_argument('--reset', action='store_true',
+                        help="Rebuild the state and tables from the historical data first")
+    parser.add_argument('--check', action='store_true',
+                        help="Check incremental vs one-pass episode detection and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        checks = _self_check()
+        print("PASSED" if all(checks) else f"FAILED: {checks}")
+        return
+    update_percentile_tables(args.prices, breakevens=args.breakevens, reset=args.reset)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,23 @@ Low-level helpers shared by the back-testing and live-trading scripts.
 
 This file is deliberately dependency-light (only the standard library and
 NumPy) so that it can be reused in environments where Pandas is not
-available.
+available. Price strings are converted through the integer-tick tables in
+lib/trading/price_ticks.py (standard library only).
 """
 
-from typing import List
-import re
+from bisect import bisect_left, bisect_right
+from typing import List, Tuple
 import numpy as np
+import os
+import sys
+
+# Standalone scripts in this folder: make the workspace root (lib/) importable
+workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if workspace_root not in sys.path:
+    sys.path.insert(0, workspace_root)
+
+from lib.trading.price_ticks import TICKS_PER_POINT, _ZN_SUFFIXES, zn_to_price, zn_string_for_price
+from lib.trading.level_store import TechnicalLevelStore, get_level_store
 
 # ---------------------------------------------------------------------------
 # Constants / technical levels
@@ -20,26 +31,14 @@ import numpy as np
 _TICK32: float = 1.0 / 32.0       # one 32nd = 0.03125
 _HALF32: float = 1.0 / 64.0       # "+"  = half-tick = 0.015625
 
-# CBOT 10-year T-Note technical levels that we want the strategy to respect.
-# Feel free to load this list from an external source (database, CSV, etc.).
-TECHNICAL_LEVELS: list[str] = [
-    "108'15", "108'23", "108'29",
-    "109'02", "109'07", "109'11", "109'19", "109'21", "109'28",
-    "110'02", "110'06", "110'09", "110'15", "110'20", "110'24", "110'31",
-    "111'01", "111'05", "111'08", "111'14", "111'18", "111'26",
-    "112'07", "112'11", "112'16", "112'19", "112'26",
-    "113'01", "113'08", "113'11", "113'18", "113'25", "113'31",
-    "114'06", "114'12", "114'18", "114'23", "114'30",
-]
-
-# Pre-compute the decimal representations once at import-time so that every
-# consumer of this module shares the same NumPy array instance (cheap).
+# CBOT 10-year T-Note technical levels that we want the strategy to respect,
+# loaded from data/input/technical_levels.csv by the shared level store
+# (lib/trading/level_store.py), which reloads the file when it changes.
+LEVEL_STORE: TechnicalLevelStore = get_level_store()
 
-def _init_levels() -> None:
-    """Populate the global TECH_LEVELS_DEC array lazily."""
-    global TECH_LEVELS_DEC
-    if TECH_LEVELS_DEC[0] is None:  # un-initialised sentinel
-        TECH_LEVELS_DEC = np.array([zn_to_decimal(s) for s in TECHNICAL_LEVELS], dtype=float)
+# Import-time copy of the levels; use current_levels()/get_level_index() to
+# follow reloads of the levels file.
+TECHNICAL_LEVELS: list[str] = list(LEVEL_STORE.snapshot().strings)
 
 
 # ---------------------------------------------------------------------------
@@ -48,38 +47,133 @@ def _init_levels() -> None:
 
 def zn_to_decimal(s: str) -> float:
     """Convert CBOT price strings (e.g. "111-04+" or "110'18+") to decimals."""
-    m = re.fullmatch(r"\s*(\d+)[\-\' ]?(\d{2})(\+?)\s*", s)
-    if not m:
-        raise ValueError(f"Can't parse ZN price '{s}'")
-    pts = int(m.group(1))           # whole points
-    frac = int(m.group(2))          # 0–31 (32nds)
-    half = 1 if m.group(3) else 0   # "+": adds one half-tick
-    return pts + frac * _TICK32 + half * _HALF32
+    # Precomputed table lookup for 100'00-130'31+, otherwise parsed to an
+    # integer count of 1/64ths; tick / 64 is exact, so either way this equals
+    # pts + frac * _TICK32 + half * _HALF32 bit for bit.
+    return zn_to_price(s)
 
-TECH_LEVELS_DEC: np.ndarray = np.array([zn_to_decimal(s) for s in TECHNICAL_LEVELS], dtype=float)
+# Every consumer shares the store's read-only, sorted arrays
+TECH_LEVELS_DEC: np.ndarray = LEVEL_STORE.snapshot().levels
+# Same levels as integer ticks (1/64ths) for exact comparisons
+TECH_LEVELS_TICKS: np.ndarray = LEVEL_STORE.snapshot().ticks
 
 
 def decimal_to_zn(x: float) -> str:
     """Convert decimal prices back to the CBOT 32nds string format."""
+    table_str = zn_string_for_price(x)  # O(1) for exact 1/64 prices in 100'00-130'31+
+    if table_str is not None:
+        return table_str
     pts = int(x)
     # Multiply by 32 **before** taking int to avoid FP rounding surprises
     remainder = round((x - pts) * 32, 3)  # keep three decimals, good enough
+    # Half-ticks within the point: floor(2 * remainder) is the same frac/half split
+    sub = int(remainder * 2)
+    if 0 <= sub < TICKS_PER_POINT:
+        return f"{pts}'{_ZN_SUFFIXES[sub]}"
+    # Negative prices (and remainders that round up to 32) keep the old formatting
     frac = int(remainder)
     half = 1 if (remainder - frac) >= 0.5 else 0
     return f"{pts}'{frac:02d}{'+' if half else ''}"
 
 
-def levels_crossed(p0: float, p1: float, levels: np.ndarray | List[float]) -> List[float]:
+class LevelIndex:
+    """Sorted, read-only technical levels answering range queries in O(log L).
+
+    ``crossed(p0, p1)`` returns the same levels as ``levels_crossed`` (those
+    between p0 and p1, inclusive, in the direction of travel) as a NumPy view
+    found with two binary searches instead of a mask over every level.
+    ``searchsorted`` answers many ranges at once for array inputs.
+    """
+
+    def __init__(self, levels: np.ndarray | List[float]) -> None:
+        self.levels = np.sort(np.asarray(levels, dtype=float))
+        self.levels.flags.writeable = False
+        # Plain-float copy: bisect on it has no NumPy per-call overhead for scalar queries
+        self._sorted = self.levels.tolist()
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    @property
+    def lowest(self) -> float:
+        return self.levels[0]
+
+    @property
+    def highest(self) -> float:
+        return self.levels[-1]
+
+    def crossed(self, p0: float, p1: float) -> np.ndarray:
+        """Levels between p0 and p1 (inclusive), ascending if p1 > p0, otherwise descending."""
+        lo, hi = (p0, p1) if p0 <= p1 else (p1, p0)
+        if lo != lo or hi != hi:  # NaN bound: nothing compares inside the range
+            return self.levels[:0]
+        start = bisect_left(self._sorted, lo)
+        stop = bisect_right(self._sorted, hi)
+        crossed = self.levels[start:max(start, stop)]
+        return crossed if p1 > p0 else crossed[::-1]
+
+    def bucket(self, price: float) -> int:
+        """Number of levels at or below price, i.e. the index of its interval between adjacent levels."""
+        return bisect_right(self._sorted, price)
+
+    def searchsorted(self, lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized bounds: levels[start[k]:stop[k]] are the levels in [lo[k], hi[k]]."""
+        start = np.searchsorted(self.levels, lo, side='left')
+        stop = np.searchsorted(self.levels, hi, side='right')
+        return start, np.maximum(start, stop)
+
+
+_LAST_LEVEL_INDEX: list = [None, None]  # [levels object, LevelIndex] of the last lookup
+_STORE_LEVEL_INDEX: list = [None, None]  # [LevelSnapshot, LevelIndex] of the store's current levels
+
+
+def current_levels() -> np.ndarray:
+    """The level store's current levels (sorted, read-only), reloading the file if it changed."""
+    return LEVEL_STORE.snapshot().levels
+
+
+def current_level_index() -> LevelIndex:
+    """LevelIndex over the level store's current levels, rebuilt when the store reloads."""
+    snapshot = LEVEL_STORE.snapshot()
+    if _STORE_LEVEL_INDEX[0] is not snapshot:
+        _STORE_LEVEL_INDEX[:] = [snapshot, LevelIndex(snapshot.levels)]
+    return _STORE_LEVEL_INDEX[1]
+
+
+def get_level_index(levels: np.ndarray | List[float] | LevelIndex = None) -> LevelIndex:
+    """Return a LevelIndex for a set of levels (defaults to the level store's current levels).
+
+    The module levels (None, TECH_LEVELS_DEC or TECH_LEVEL_INDEX) always
+    resolve to the store's current version, so callers using the defaults pick
+    up a reloaded levels file. Indexes are also reused for the last array
+    seen, so callers passing the same array every time only pay for the sort
+    once.
+    """
+    if levels is None or levels is TECH_LEVELS_DEC or levels is TECH_LEVEL_INDEX:
+        return current_level_index()
+    if isinstance(levels, LevelIndex):
+        return levels
+    if _LAST_LEVEL_INDEX[0] is levels and isinstance(levels, np.ndarray):
+        return _LAST_LEVEL_INDEX[1]
+    index = LevelIndex(levels)
+    _LAST_LEVEL_INDEX[:] = [levels, index]
+    return index
+
+
+def levels_crossed(p0: float, p1: float, levels: np.ndarray | List[float] | LevelIndex) -> List[float]:
     """Return the technical levels *strictly* between p0 and p1, inclusive.
 
     The order of the returned list reflects the direction of travel: if p1 > p0
     the list is ascending, otherwise descending.  This is useful when you want
     to replay the path chronologically.
     """
+    if isinstance(levels, LevelIndex) or levels is TECH_LEVELS_DEC:
+        return get_level_index(levels).crossed(p0, p1).tolist()
     lvls = np.asarray(levels)
     lo, hi = sorted((p0, p1))
     crossed = lvls[(lvls >= lo) & (lvls <= hi)]
     return crossed.tolist() if p1 > p0 else crossed[::-1].tolist()
 
-# Ensure TECH_LEVELS_DEC is available as soon as the module is imported
-_init_levels() 
+# Sorted index over the import-time levels (get_level_index() maps it to the current version)
+TECH_LEVEL_INDEX: LevelIndex = current_level_index()
+
@@ -52,10 +52,85 @@ def preprocess_data(df1_path, df2_path):
     
     return df, nan_ranges, cols_to_null
 
-def find_minimal_intervals(df, breakeven_decimal, nan_ranges, max_length=300):
+def _minimal_interval_ends(delta_close, row_has_nan, lower, max_length):
     """
-    Your exact function from notebook with nan_ranges parameter
+    End bar of the minimal interval starting at every bar, or -1 (vectorized over starts).
+
+    Mirrors the forward scan of find_minimal_intervals for each start i: skip if
+    delta_close[i] < 0, then walk j = i, i+1, ... (at most max_length bars) and
+    stop at a NaN row (row_has_nan[j+1], the scan reads the frame shifted by one
+    bar), at a window sum <= 0, or record j once the sum reaches lower. A window
+    containing a NaN delta can never record, so it counts as stopped.
+
+    Window sums are prefix-sum differences; on the 1/64 price grid they are
+    exact, so every comparison matches the per-window sums bit for bit. The
+    scan steps all pending starts one bar at a time, so the cost is
+    O(N * typical interval length) in NumPy rather than O(N * max_length) in
+    pandas row access.
+
+    Returns:
+        np.ndarray: For each start i, the end bar j of its interval, or -1
+    """
+    N = len(delta_close)
+    ends = np.full(N, -1, dtype=np.int64)
+    if N < 2:
+        return ends
+
+    is_nan = np.isnan(delta_close)
+    prefix = np.cumsum(np.where(is_nan, 0.0, delta_close))
+    # First NaN delta at or after each bar (N if none)
+    nan_at = np.where(is_nan, np.arange(N), N)
+    first_nan = np.minimum.accumulate(nan_at[::-1])[::-1]
+    # The scan stops at j when row j+1 has a NaN; the last bar has no row j+1
+    stop_at = np.append(row_has_nan[1:], True)
+
+    # Bar 0 has no previous close (NaN delta), so starts run from 1 to N-2
+    starts = np.arange(1, N - 1)
+    active = starts[~(delta_close[starts] < 0)]
+    base = prefix[active - 1]
+    for L in range(max_length):
+        if active.size == 0:
+            break
+        j = active + L
+        window_sum = prefix[j] - base
+        stopped = stop_at[j] | (j >= first_nan[active])
+        broken = ~stopped & (window_sum <= 0)
+        reached = ~stopped & ~broken & (lower <= window_sum)
+        ends[active[reached]] = j[reached]
+        keep = ~(stopped | broken | reached)
+        active, base = active[keep], base[keep]
+    return ends
+
+
+def _walk_minimal_intervals(ends, nan_ranges, N):
     """
+    Replay the left-to-right walk over interval ends: jump over nan_ranges
+    met on the way, take the next start with an interval and resume after its end.
+
+    Returns:
+        list: Start bars of the recorded intervals
+    """
+    candidates = np.flatnonzero(ends >= 0)
+    range_starts = np.array(sorted(k for k in nan_ranges if k < N), dtype=np.int64)
+    recorded = []
+    i = 0
+    while i < N:
+        c = np.searchsorted(candidates, i)
+        k = np.searchsorted(range_starts, i)
+        next_start = candidates[c] if c < len(candidates) else N
+        next_range = range_starts[k] if k < len(range_starts) else N
+        if next_range <= next_start and next_range < N:
+            i = nan_ranges[int(next_range)] + 1
+        elif next_start < N:
+            recorded.append(int(next_start))
+            i = int(ends[next_start]) + 1
+        else:
+            break
+    return recorded
+
+
+def _find_minimal_intervals(df, threshold, nan_ranges, max_length, sign):
+    """Shared body of find_minimal_intervals (sign 1) and find_minimal_intervals_NAM (sign -1)."""
     df = df.copy()
     if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
         df['timestamp'] = pd.to_datetime(df['timestamp'])
@@ -63,48 +138,86 @@ def find_minimal_intervals(df, breakeven_decimal, nan_ranges, max_length=300):
 
     N = len(df)
     delta_close = df['Close'].values - df['Close'].shift(1).values
-    df = df.iloc[1:]
-    lower = breakeven_decimal
-    
-    results = []
-    i = 0
-    while i < N:
-        if i in nan_ranges:
-            i = nan_ranges[i]+1
-            continue
-        
-        t_start = df['timestamp'].iloc[i]
-        found = False
-
-        if delta_close[i]<0:
-            i+=1
-            continue    
-
-        for L in range(0, max_length):
-            j = i + L
-            if j >= N:
-                break
-            
-            # Condition 1: Check for NaN
-            if df.iloc[j].isna().any():
-                break
-            
-            # Condition 2: Check window sum
-            window_sum = delta_close[i:j+1].sum()
-            if window_sum<=0:
-                break
-            
-            # Condition 3: Check if threshold reached
-            if lower <= window_sum:
-                results.append(t_start)
-                i = i + L +1
-                found = True
-                break
-            
-        if not found:
-            i += 1
-
-    return results
+    # Falls are rises of the negated series, so the NAM search reuses the same scan
+    ends = _minimal_interval_ends(sign * delta_close, df.isna().any(axis=1).to_numpy(), threshold, max_length)
+    starts = _walk_minimal_intervals(ends, nan_ranges, N)
+    # Interval start i is reported with the timestamp of bar i+1 (the scan reads df.iloc[1:])
+    return df['timestamp'].iloc[np.asarray(starts, dtype=np.int64) + 1].tolist()
+
+
+def find_minimal_intervals(df, breakeven_decimal, nan_ranges, max_length=300):
+    """
+    Your exact function from notebook with nan_ranges parameter
+
+    Start times of the minimal rising intervals: from each bar that did not
+    fall, the shortest window (up to max_length bars, without NaN rows and
+    without the running sum of close-to-close changes dropping to 0 or below)
+    whose sum reaches breakeven_decimal. The search resumes after each
+    interval's end and skips the bars of nan_ranges.
+    """
+    return _find_minimal_intervals(df, breakeven_decimal, nan_ranges, max_length, 1)
+
+def _max_moves_before(df, delta_close, times, max_reversal, sign):
+    """
+    Largest move into each start time, scanning backward with early termination.
+
+    Mirrors the backward loop of dip_distribution_data_only (sign -1, drops)
+    and rise_distribution_data_only (sign 1, rises) for every start at once:
+    from the bar before the start, walk back keeping the best move
+    sign * sum(delta_close[j:i_prev+1]) until it reverses by max_reversal,
+    the first bar is reached, or an OHLCV NaN row aborts the start. A window
+    containing a NaN delta no longer updates the best move, so such a start
+    is settled by whether a NaN row follows further back.
+
+    Window sums are prefix-sum differences (exact on the 1/64 price grid).
+
+    Args:
+        df (pd.DataFrame): Bars indexed by sorted timestamp (row positions used for the NaN check)
+        delta_close (np.ndarray): Close-to-close changes, indexed like the scan (delta_close[j:i_prev+1])
+        times (list): Start times
+        max_reversal (float): Reversal from the best move that ends the scan
+        sign (int): -1 for drops, 1 for rises
+
+    Returns:
+        list: One value per start that was not aborted, in order (NaN if the time is not in df, 0.0 at the first bar)
+    """
+    positions = df.index.get_indexer(times) if len(times) else np.array([], dtype=np.int64)
+    row_has_nan = df[["Open", "High", "Low", "Close", "Volume"]].isna().any(axis=1).to_numpy()
+    is_nan = np.isnan(delta_close)
+    prefix = np.concatenate(([0.0], np.cumsum(np.where(is_nan, 0.0, delta_close))))
+    nan_prefix = np.concatenate(([0], np.cumsum(is_nan)))
+    # Latest NaN row at or before each bar (-1 if none)
+    last_nan_row = np.maximum.accumulate(np.where(row_has_nan, np.arange(len(row_has_nan)), -1))
+
+    values = np.full(len(positions), np.nan)
+    kept = np.ones(len(positions), dtype=bool)
+    values[positions == 0] = 0.0
+
+    active = np.flatnonzero(positions > 0)
+    i_prev = positions[active] - 1
+    j = i_prev.copy()
+    best = np.full(len(active), -np.inf)
+    while active.size:
+        aborted = row_has_nan[j]
+        window_nan = nan_prefix[i_prev + 1] - nan_prefix[j] > 0
+        move = sign * (prefix[i_prev + 1] - prefix[j])
+        live = ~aborted & ~window_nan
+        best = np.where(live & (move > best), move, best)
+        reversed_ = live & (best - move >= max_reversal)
+        # NaN window: the scan runs on until a NaN row (abort) or the first bar
+        nan_row_below = (j > 0) & (last_nan_row[np.maximum(j - 1, 0)] >= 0)
+        dead = ~aborted & window_nan
+        done = aborted | dead | reversed_ | (j == 0)
+
+        skipped = aborted | (dead & nan_row_below)
+        kept[active[done & skipped]] = False
+        finished = done & ~skipped
+        values[active[finished]] = best[finished]
+
+        pending = ~done
+        active, i_prev, j, best = active[pending], i_prev[pending], j[pending] - 1, best[pending]
+    return values[kept].tolist()
+
 
 def dip_distribution_data_only(df, breakeven_decimal, max_rise, nan_ranges, threshold_for_NBM=6):
     """
@@ -112,7 +225,6 @@ def dip_distribution_data_only(df, breakeven_decimal, max_rise, nan_ranges, thre
     """
     delta_close = df["Close"].values - df["Close"].shift(1).values
     df = df.iloc[1:]
-    max_drops_decimal = []
 
     results = find_minimal_intervals(df, breakeven_decimal, nan_ranges)
 
@@ -121,41 +233,8 @@ def dip_distribution_data_only(df, breakeven_decimal, max_rise, nan_ranges, thre
         df['timestamp'] = pd.to_datetime(df['timestamp'])
     df = df.sort_values('timestamp')
     df = df.set_index('timestamp')  
-    index_list = df.index
-
-    for t in results:
-        try:
-            i_curr = index_list.get_loc(t)
-        except KeyError:
-            max_drops_decimal.append(np.nan)
-            continue
-
-        if i_curr == 0:
-            max_drops_decimal.append(0.0)
-            continue
-
-        i_prev = i_curr - 1
-        max_drop_for_t = -float('inf')
-        aborted_due_to_nan = False
-
-        for j in range(i_prev, -1, -1):
-            row_j = df.iloc[j]
-
-            if row_j[["Open", "High", "Low", "Close", "Volume"]].isna().any():
-                aborted_due_to_nan = True
-                break
-
-            drop_j = -1*float(delta_close[j:i_prev+1].sum())
-            if drop_j > max_drop_for_t:
-                max_drop_for_t = drop_j
-
-            if max_drop_for_t-drop_j >= max_rise:
-                break
-            
-        if aborted_due_to_nan:
-            continue
-        else:
-            max_drops_decimal.append(max_drop_for_t)
+
+    max_drops_decimal = _max_moves_before(df, delta_close, results, max_rise, sign=-1)
 
     max_drops_decimal = np.array(max_drops_decimal, dtype=float)
     max_drops_bps = max_drops_decimal * 16
@@ -167,56 +246,11 @@ def dip_distribution_data_only(df, breakeven_decimal, max_rise, nan_ranges, thre
 def find_minimal_intervals_NAM(df, breakeven_decimal, nan_ranges, max_length=300):
     """
     Your exact function from notebook with nan_ranges parameter
-    """
-    df = df.copy()
-    if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df = df.sort_values('timestamp').reset_index(drop=True)
 
-    N = len(df)
-    delta_close = df['Close'].values - df['Close'].shift(1).values
-    df = df.iloc[1:]
-    lower = -1*breakeven_decimal
-    
-    results = []
-    i = 0
-    while i < N:
-        if i in nan_ranges:
-            i = nan_ranges[i]+1
-            continue
-        
-        t_start = df['timestamp'].iloc[i]
-        found = False
-
-        if delta_close[i]>0:
-            i+=1
-            continue    
-
-        for L in range(0, max_length):
-            j = i + L
-            if j >= N:
-                break
-            
-            # Condition 1: Check for NaN
-            if df.iloc[j].isna().any():
-                break
-            
-            # Condition 2: Check window sum
-            window_sum = delta_close[i:j+1].sum()
-            if window_sum>=0:
-                break
-            
-            # Condition 3: Check if threshold reached
-            if window_sum <= lower:
-                results.append(t_start)
-                i = i + L +1
-                found = True
-                break
-            
-        if not found:
-            i += 1
-
-    return results
+    Falling counterpart of find_minimal_intervals: the shortest windows whose
+    running sum stays below 0 until it reaches -breakeven_decimal.
+    """
+    return _find_minimal_intervals(df, breakeven_decimal, nan_ranges, max_length, -1)
 
 def rise_distribution_data_only(df, breakeven_decimal, max_dip, nan_ranges, threshold_for_NBM=6):
     """
@@ -224,7 +258,6 @@ def rise_distribution_data_only(df, breakeven_decimal, max_dip, nan_ranges, thre
     """
     delta_close = df["Close"].values - df["Close"].shift(1).values
     df = df.iloc[1:]
-    max_rise_decimal = []
 
     results = find_minimal_intervals_NAM(df, breakeven_decimal, nan_ranges)
 
@@ -233,45 +266,8 @@ def rise_distribution_data_only(df, breakeven_decimal, max_dip, nan_ranges, thre
         df['timestamp'] = pd.to_datetime(df['timestamp'])
     df = df.sort_values('timestamp')
     df = df.set_index('timestamp')  
-    index_list = df.index
-
-    for t in results:
-        try:
-            i_curr = index_list.get_loc(t)
-        except KeyError:
-            max_rise_decimal.append(np.nan)
-            continue
-
-        if i_curr == 0:
-            max_rise_decimal.append(0.0)
-            continue
-
-        i_prev = i_curr - 1
-        max_rise_for_t = -float('inf')
-        aborted_due_to_nan = False
-
-        # Loop backwards to find max rise
-        for j in range(i_prev, -1, -1):
-            row_j = df.iloc[j]
-
-            # Check for NaN
-            if row_j[["Open", "High", "Low", "Close", "Volume"]].isna().any():
-                aborted_due_to_nan = True
-                break
-
-            # Compute rise
-            rise_j = float(delta_close[j:i_prev+1].sum())
-            if rise_j > max_rise_for_t:
-                max_rise_for_t = rise_j
-
-            # Check if threshold reached
-            if max_rise_for_t-rise_j >= max_dip:
-                break
-            
-        if aborted_due_to_nan:
-            continue
-        else:
-            max_rise_decimal.append(max_rise_for_t)
+
+    max_rise_decimal = _max_moves_before(df, delta_close, results, max_dip, sign=1)
 
     # Filter out NaNs and convert to bps
     max_rise_decimal = np.array(max_rise_decimal, dtype=float)
@@ -279,4 +275,102 @@ def rise_distribution_data_only(df, breakeven_decimal, max_dip, nan_ranges, thre
     valid_rise_bps = max_rise_bps[~np.isnan(max_rise_bps)]
     filtered_rise_bps = valid_rise_bps[valid_rise_bps >= threshold_for_NBM]
 
-    return filtered_rise_bps
\ No newline at end of file
+    return filtered_rise_bps
+
+if __name__ == "__main__":
+    # Parity with the original row-by-row scan on synthetic bars with NaN gaps,
+    # then the vectorized scan on three years of minute bars
+    import time
+
+    def find_minimal_intervals_loop(df, breakeven_decimal, nan_ranges, max_length=300, sign=1):
+        df = df.copy()
+        df = df.sort_values('timestamp').reset_index(drop=True)
+        N = len(df)
+        delta_close = sign * (df['Close'].values - df['Close'].shift(1).values)
+        df = df.iloc[1:]
+        results = []
+        i = 0
+        while i < N - 1:
+            if i in nan_ranges:
+                i = nan_ranges[i] + 1
+                continue
+            t_start = df['timestamp'].iloc[i]
+            found = False
+            if delta_close[i] < 0:
+                i += 1
+                continue
+            for L in range(0, max_length):
+                j = i + L
+                if j >= N - 1 or df.iloc[j].isna().any():
+                    break
+                window_sum = delta_close[i:j+1].sum()
+                if window_sum <= 0:
+                    break
+                if breakeven_decimal <= window_sum:
+                    results.append(t_start)
+                    i = i + L + 1
+                    found = True
+                    break
+            if not found:
+                i += 1
+        return results
+
+    def max_moves_before_loop(df, delta_close, times, max_reversal, sign):
+        values = []
+        for t in times:
+            i_curr = df.index.get_loc(t)
+            if i_curr == 0:
+                values.append(0.0)
+                continue
+            i_prev = i_curr - 1
+            best = -float('inf')
+            aborted = False
+            for j in range(i_prev, -1, -1):
+                if df.iloc[j][["Open", "High", "Low", "Close", "Volume"]].isna().any():
+                    aborted = True
+                    break
+                move = sign * float(delta_close[j:i_prev+1].sum())
+                if move > best:
+                    best = move
+                if best - move >= max_reversal:
+                    break
+            if not aborted:
+                values.append(best)
+        return values
+
+    def synthetic_bars(n, seed):
+        rng = np.random.default_rng(seed)
+        close = 110 + np.cumsum(rng.integers(-3, 4, n)) / 64
+        df = pd.DataFrame({'timestamp': pd.date_range('2024-01-01', periods=n, freq='min'),
+                           'Close': close, 'Volume': rng.integers(0, 1000, n).astype(float)})
+        df['Open'] = df['High'] = df['Low'] = df['Close']
+        gaps = rng.choice(n, n // 200, replace=False)
+        df.loc[gaps, 'Close'] = np.nan
+        df.loc[rng.choice(n, n // 500, replace=False), 'Volume'] = np.nan
+        nan_ranges = {int(g): int(g) + int(rng.integers(0, 3)) for g in gaps[:len(gaps) // 2]}
+        return df, nan_ranges
+
+    df, nan_ranges = synthetic_bars(4000, 0)
+    checks = []
+    for breakeven in [1, 2, 5]:
+        checks.append(find_minimal_intervals(df, breakeven / 16, nan_ranges) ==
+                      find_minimal_intervals_loop(df, breakeven / 16, nan_ranges))
+        checks.append(find_minimal_intervals_NAM(df, breakeven / 16, nan_ranges) ==
+                      find_minimal_intervals_loop(df, breakeven / 16, nan_ranges, sign=-1))
+        times = find_minimal_intervals(df, breakeven / 16, nan_ranges)
+        bars = df.set_index('timestamp')
+        delta_close = df['Close'].values - df['Close'].shift(1).values
+        for sign in (-1, 1):
+            checks.append(_max_moves_before(bars, delta_close, times, breakeven / 16, sign) ==
+                          max_moves_before_loop(bars, delta_close, times, breakeven / 16, sign))
+    print("PASSED" if all(checks) else f"FAILED: {checks}")
+
+    df, nan_ranges = synthetic_bars(3 * 252 * 23 * 60, 1)
+    start = time.perf_counter()
+    rises = find_minimal_intervals(df, 2 / 16, nan_ranges)
+    falls = find_minimal_intervals_NAM(df, 2 / 16, nan_ranges)
+    print(f"{len(df):,} minute bars: {len(rises)} rising / {len(falls)} falling intervals "
+          f"in {time.perf_counter() - start:.2f} s")
+    start = time.perf_counter()
+    dips = dip_distribution_data_only(df, 2 / 16, 2 / 16, nan_ranges)
+    print(f"Dip distribution over {len(df):,} minute bars: {len(dips)} dips in {time.perf_counter() - start:.2f} s")
@@ -1,9 +1,25 @@
 """Sumo_Curve package for advanced risk survival calculations."""
 
 from .risk_curve import R_dict
-from .breakeven_curve import breakeven
+from .breakeven_curve import (
+    breakeven,
+    BreakevenCurve,
+    get_breakeven_curve,
+    breakeven_values,
+    BreakevenBands,
+)
+from .risk_surface import RiskSurfaceCache
+from .risk_tracker import RiskInputTracker
+from .survival_monte_carlo import run_monte_carlo
 
 __all__ = [
     "R_dict",
     "breakeven",
-] 
\ No newline at end of file
+    "BreakevenCurve",
+    "get_breakeven_curve",
+    "breakeven_values",
+    "BreakevenBands",
+    "RiskSurfaceCache",
+    "RiskInputTracker",
+    "run_monte_carlo",
+] 
@@ -1,7 +1,9 @@
+import functools
 import matplotlib.pyplot as plt
 import numpy as np
 import os
 import sys
+import time
 
 # Add the workspace root to Python path
 workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -18,42 +20,245 @@ from Optimizer.risk_utils import (
 BE_low = 4
 BE_high = 6
 
-def breakeven(price, technical_dict):
+# Technical dict fields that define the curve, in knot order (low to high price)
+BREAKEVEN_FIELDS = ("Strong Support", "Size Up Long Price", "Size Up Short Price", "Strong Resistance")
+
+
+def _level_price(value):
+    """Technical dict level as a decimal price (floats are used as is, strings are ZN prices)."""
+    return value if isinstance(value, float) else zn_to_decimal(value)
+
+
+class BreakevenCurve:
+    """
+    Piecewise linear breakeven curve compiled from one technical dict.
+
+    The four technical levels are parsed once and the curve is held as NumPy
+    arrays of knots (strong support, size up long, size up short, strong
+    resistance), knot values and segment slopes. Calling the curve evaluates a
+    scalar price or a whole price array; every branch uses the same float
+    operations as the original breakeven() so results match it exactly.
+    Prices between the size up long and size up short prices have no
+    breakeven (None for scalars, NaN for arrays).
+
+    When the size up short price equals strong resistance, the original
+    divides by zero at that price: a scalar evaluation raises
+    ZeroDivisionError there as it did (or returns NaN when a level was given
+    as a NumPy float, which divided to inf). evaluate() and values_at()
+    return NaN there instead of raising.
+    """
+
+    def __init__(self, strong_support, size_up_long_price, size_up_short_price, strong_resistance,
+                 be_low=BE_low, be_high=BE_high):
+        """
+        Compile the curve.
+
+        Args:
+            strong_support (float): Below this the breakeven is -be_low
+            size_up_long_price (float): Breakeven is -be_high here, rising linearly from strong support
+            size_up_short_price (float): Breakeven is be_high here, falling linearly to strong resistance
+            strong_resistance (float): Above this the breakeven is be_low
+            be_low (float): Breakeven magnitude (16ths) beyond strong support/resistance
+            be_high (float): Breakeven magnitude (16ths) at the size up prices
+        """
+        self.be_low = be_low
+        self.be_high = be_high
+        self.knots = np.array([strong_support, size_up_long_price, size_up_short_price, strong_resistance], dtype=float)
+        self.knot_values = np.array([-be_low, -be_high, be_high, be_low], dtype=float)
+
+        # Slopes of the long and short ramps, as breakeven() computes them.
+        # A zero-width ramp is never evaluated on the long side; on the short side it raises.
+        long_width = strong_support - size_up_long_price
+        short_width = strong_resistance - size_up_short_price
+        self.slopes = np.array([
+            (-be_low + be_high) / long_width if long_width != 0 else np.nan,
+            (-be_low + be_high) / short_width if short_width != 0 else np.nan,
+        ])
+        self._ss, self._sul, self._sus, self._sr = self.knots.tolist()
+        self._short_ramp_raises = short_width == 0 and not isinstance(short_width, np.floating)
+        self._slope_long, self._slope_short = self.slopes.tolist()
+
+    def __call__(self, price, technical_dict=None):
+        """
+        Evaluate the curve.
+
+        technical_dict is accepted (and ignored) so a compiled curve can be
+        passed wherever a breakeven(price, technical_dict) function is expected.
+
+        Args:
+            price (float or array-like): Price(s) to evaluate
+
+        Returns:
+            float or None for a scalar price; np.ndarray (NaN where undefined) for arrays
+        """
+        if np.ndim(price) == 0:
+            return self._evaluate_scalar(price)
+        return self.evaluate(price)
+
+    def _evaluate_scalar(self, price):
+        if price <= self._ss:
+            return -self.be_low
+        if (price <= self._sul) and (price >= self._ss):
+            return -self.be_high + self._slope_long * (price - self._sul)
+        if (price <= self._sr) and (price >= self._sus):
+            if self._short_ramp_raises:
+                raise ZeroDivisionError("float division by zero")
+            return (-self.be_high + self._slope_short * (price - self._sus))*(-1)
+        if price >= self._sr:
+            return self.be_low
+        return None
+
+    def _branches(self, prices):
+        """Branch conditions and values in breakeven()'s order (the first matching branch wins)."""
+        ss, sul, sus, sr = self.knots
+        conditions = [
+            prices <= ss,
+            (prices <= sul) & (prices >= ss),
+            (prices <= sr) & (prices >= sus),
+            prices >= sr,
+        ]
+        with np.errstate(invalid='ignore'):
+            choices = [
+                self.knot_values[0],
+                -self.be_high + self.slopes[0] * (prices - sul),
+                (-self.be_high + self.slopes[1] * (prices - sus))*(-1),
+                self.knot_values[3],
+            ]
+        return conditions, choices
+
+    def evaluate(self, prices):
+        """
+        Evaluate the curve over an array of prices.
+
+        Args:
+            prices (array-like): Prices to evaluate
+
+        Returns:
+            np.ndarray: Breakeven values, NaN between the size up prices
+        """
+        conditions, choices = self._branches(np.asarray(prices, dtype=float))
+        return np.select(conditions, choices, default=np.nan)
+
+    def values_at(self, prices):
+        """Evaluate a list of prices, returning Python floats (None between the size up prices) like breakeven()."""
+        conditions, choices = self._branches(np.asarray(prices, dtype=float))
+        values = np.select(conditions, choices, default=np.nan).tolist()
+        defined = np.logical_or.reduce(conditions).tolist() if len(values) else []
+        return [value if is_defined else None for value, is_defined in zip(values, defined)]
+
+
+@functools.lru_cache(maxsize=128, typed=True)
+def _compile_breakeven(strong_support, size_up_long_price, size_up_short_price, strong_resistance, be_low, be_high):
+    return BreakevenCurve(
+        _level_price(strong_support), _level_price(size_up_long_price),
+        _level_price(size_up_short_price), _level_price(strong_resistance),
+        be_low=be_low, be_high=be_high,
+    )
+
+
+def get_breakeven_curve(technical_dict, be_low=None, be_high=None):
+    """
+    Return the compiled breakeven curve for a technical dict.
+
+    Curves are cached on the four raw technical-dict values (and their types,
+    which decide the zero-width ramp case) together with
+    be_low/be_high, so a curve is only compiled when one of them changes.
+
+    Args:
+        technical_dict (dict): Must have the BREAKEVEN_FIELDS keys (ZN strings or decimal floats)
+        be_low (float): Defaults to the module's BE_low
+        be_high (float): Defaults to the module's BE_high
+
+    Returns:
+        BreakevenCurve: The compiled curve
+    """
+    return _compile_breakeven(
+        *(technical_dict[field] for field in BREAKEVEN_FIELDS),
+        BE_low if be_low is None else be_low,
+        BE_high if be_high is None else be_high,
+    )
+
+
+def breakeven_values(breakeven_curve, prices, technical_dict):
+    """
+    Evaluate a breakeven curve at several prices.
+
+    The standard breakeven function (or a compiled curve) is evaluated with
+    one vectorized call; any other curve function is called per price.
+
+    Args:
+        breakeven_curve (callable): breakeven, a BreakevenCurve, or any f(price, technical_dict)
+        prices (list): Prices to evaluate
+        technical_dict (dict): Technical dict passed to the curve
+
+    Returns:
+        list: Breakeven values (None where undefined)
+    """
+    if breakeven_curve is breakeven:
+        breakeven_curve = get_breakeven_curve(technical_dict)
+    elif isinstance(breakeven_curve, BreakevenBands):
+        breakeven_curve = get_breakeven_curve(technical_dict, breakeven_curve.be_low, breakeven_curve.be_high)
+    if isinstance(breakeven_curve, BreakevenCurve):
+        return breakeven_curve.values_at(prices)
+    return [breakeven_curve(price, technical_dict) for price in prices]
+
+
+def breakeven(price, technical_dict, be_low=None, be_high=None):
     """
     Piecewise linear breakeven function.
     
+    Evaluates the compiled curve for technical_dict (see get_breakeven_curve),
+    so the technical levels are only parsed when they change.
+    
     Args:
         price: The price to evaluate breakeven at
-        current_price: Current market price (starting point)
-        technical_dict: Dictionary containing technical levels, must have "Strong Support" and "Strong Resistance" keys
+        technical_dict: Dictionary containing technical levels, must have "Strong Support", "Strong Resistance",
+                        "Size Up Long Price" and "Size Up Short Price" keys
+        be_low: Breakeven beyond strong support/resistance (defaults to BE_low)
+        be_high: Breakeven at the size up prices (defaults to BE_high)
     
     Returns:
-        Breakeven value as a float
+        Breakeven value as a float, or None between the size up prices
     """
-    strong_support = technical_dict["Strong Support"] if isinstance(technical_dict["Strong Support"], float) else zn_to_decimal(technical_dict["Strong Support"])
-    strong_resistance = technical_dict["Strong Resistance"] if isinstance(technical_dict["Strong Resistance"], float) else zn_to_decimal(technical_dict["Strong Resistance"])
-    size_up_long_price = technical_dict["Size Up Long Price"] if isinstance(technical_dict["Size Up Long Price"], float) else zn_to_decimal(technical_dict["Size Up Long Price"])
-    size_up_short_price = technical_dict["Size Up Short Price"] if isinstance(technical_dict["Size Up Short Price"], float) else zn_to_decimal(technical_dict["Size Up Short Price"])
-    
-    # If price is at or below strong support, return constant value of 3
+    return get_breakeven_curve(technical_dict, be_low, be_high)._evaluate_scalar(price)
+
+
+class BreakevenBands:
+    """
+    breakeven() with fixed be_low/be_high.
+
+    Can be passed (and pickled to worker processes) wherever a
+    breakeven(price, technical_dict) function is expected, e.g. to evaluate
+    R_dict/R_survival under other breakeven bands.
+    """
+
+    def __init__(self, be_low=BE_low, be_high=BE_high):
+        self.be_low = be_low
+        self.be_high = be_high
+
+    def __call__(self, price, technical_dict):
+        return breakeven(price, technical_dict, self.be_low, self.be_high)
+
+    def __repr__(self):
+        return f"BreakevenBands(be_low={self.be_low}, be_high={self.be_high})"
+
+
+def _breakeven_reference(price, technical_dict):
+    """Original branch-by-branch implementation, kept for the parity check below."""
+    strong_support = _level_price(technical_dict["Strong Support"])
+    strong_resistance = _level_price(technical_dict["Strong Resistance"])
+    size_up_long_price = _level_price(technical_dict["Size Up Long Price"])
+    size_up_short_price = _level_price(technical_dict["Size Up Short Price"])
     if price <= strong_support:
         return -BE_low
-    
-    # If price is between current price and strong support, interpolate linearly
     if (price <= size_up_long_price) and (price >= strong_support):
         slope = (-BE_low + BE_high) / (strong_support - size_up_long_price)
         return -BE_high + slope * (price - size_up_long_price)
-    
-    # If price is between current price and strong resistance, interpolate linearly
     if (price <= strong_resistance) and (price >= size_up_short_price):
         slope = (-BE_low + BE_high) / (strong_resistance - size_up_short_price)
         return (-BE_high + slope * (price - size_up_short_price))*(-1)
-    
-    # If price is at or above strong resistance, return constant value of -3
     if price >= strong_resistance:
         return BE_low
-    
-    # If price is exactly at current price, return 5
     return None
 
 
@@ -65,12 +270,42 @@ if __name__ == "__main__":
     # Create price range for plotting
     price_range = np.linspace(110, 112, 200)
     
+    # Parity check against the original branch-by-branch implementation, then timing
+    check_prices = np.concatenate([price_range, TECH_LEVELS_DEC, get_breakeven_curve(technical_dict).knots])
+    reference = [_breakeven_reference(p, technical_dict) for p in check_prices.tolist()]
+    compiled = get_breakeven_curve(technical_dict).values_at(check_prices)
+    scalar = [breakeven(p, technical_dict) for p in check_prices.tolist()]
+    print("Parity PASSED" if reference == compiled == scalar else "Parity FAILED")
+    # Size Up Short Price on Strong Resistance: the original divides by zero at that price
+    flat_checks = []
+    for flat_short in ("111'10", 111.3125, np.float64(111.3125)):
+        flat_dict = dict(technical_dict, **{"Size Up Short Price": flat_short})
+        outcomes = []
+        for evaluate_flat in (_breakeven_reference, breakeven):
+            try:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    outcomes.append(evaluate_flat(111.3125, flat_dict))
+            except ZeroDivisionError:
+                outcomes.append('ZeroDivisionError')
+        flat_checks.append(str(outcomes[0]) == str(outcomes[1]))
+        print(f"  Size Up Short Price {flat_short!r}: {outcomes[1]}")
+    print("Zero-width ramp PASSED" if all(flat_checks) else "Zero-width ramp FAILED")
+    start = time.perf_counter()
+    for _ in range(100):
+        [_breakeven_reference(p, technical_dict) for p in check_prices.tolist()]
+    reference_ms = (time.perf_counter() - start) * 10
+    start = time.perf_counter()
+    for _ in range(100):
+        get_breakeven_curve(technical_dict).evaluate(check_prices)
+    compiled_ms = (time.perf_counter() - start) * 10
+    print(f"{len(check_prices)} prices: reference {reference_ms:.3f} ms, compiled {compiled_ms:.3f} ms")
+    
     # Calculate breakeven values
-    breakeven_values = [breakeven(p, technical_dict) for p in price_range]
+    curve_values = get_breakeven_curve(technical_dict).evaluate(price_range)
     
     # Create the plot
     plt.figure(figsize=(10, 6))
-    plt.plot(price_range, breakeven_values, 'b-', linewidth=2, label='Breakeven Curve')
+    plt.plot(price_range, curve_values, 'b-', linewidth=2, label='Breakeven Curve')
     
     # Mark key points
     """
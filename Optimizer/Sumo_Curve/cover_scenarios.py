@@ -13,7 +13,6 @@ import logging
 import numpy as np
 import sys
 import os
-import pandas as pd
 import time
 import csv
 import math
@@ -23,6 +22,7 @@ workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '
 sys.path.insert(0, workspace_root)
 
 from config import TRADE_STATE_EVENTS_CSV, NET_POSITION_STREAMING_CSV, TECHNICAL_DICT_CSV
+from lib.trading.csv_tail import get_latest_row
 
 from Optimizer.risk_utils import (
     zn_to_decimal,
@@ -41,16 +41,9 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 def get_last_trade_state_event(file_path: str) -> dict:
-    """Get the last row of the trade state events CSV as a dictionary."""
+    """Get the last row of the trade state events CSV as a dictionary (cached until the file changes)."""
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
-        
-        # Get the last row
-        last_row = df.iloc[-1]
-        
-        # Convert the last row to a dictionary
-        trade_dict = last_row.to_dict()
+        trade_dict = get_latest_row(file_path)
         
         return trade_dict
     except Exception as e:
@@ -59,16 +52,9 @@ def get_last_trade_state_event(file_path: str) -> dict:
 
 
 def get_technical_dict(file_path: str) -> dict:
-    """Get the last row of the technical dict CSV as a dictionary."""
+    """Get the last row of the technical dict CSV as a dictionary (cached until the file changes)."""
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
-        
-        # Get the last row
-        last_row = df.iloc[-1]
-        
-        # Convert the last row to a dictionary
-        technical_dict = last_row.to_dict()
+        technical_dict = get_latest_row(file_path)
         
         return technical_dict
     except Exception as e:
@@ -77,16 +63,9 @@ def get_technical_dict(file_path: str) -> dict:
 
 
 def get_last_net_position(file_path: str) -> dict:
-    """Get the last row of the net position streaming CSV as a dictionary."""
+    """Get the last row of the net position streaming CSV as a dictionary (cached until the file changes)."""
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
-        
-        # Get the last row
-        last_row = df.iloc[-1]
-        
-        # Convert the last row to a dictionary
-        net_position_dict = last_row.to_dict()
+        net_position_dict = get_latest_row(file_path)
         
         return net_position_dict
     except Exception as e:
@@ -95,16 +74,9 @@ def get_last_net_position(file_path: str) -> dict:
 
 
 def get_current_price(file_path: str) -> float:
-    """Get the current price from the price streaming CSV."""
+    """Get the current price from the price streaming CSV (bid/ask mid of the last row, cached until the file changes)."""
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
-        
-        # Get the last row
-        last_row = df.iloc[-1]
-        
-        # Convert the last row to a dictionary
-        last_row_dict = last_row.to_dict()
+        last_row_dict = get_latest_row(file_path)
         
         current_price = 0.5*(last_row_dict["Bid Price"] + last_row_dict["Ask Price"])
         
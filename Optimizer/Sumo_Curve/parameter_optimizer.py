@@ -0,0 +1,442 @@
+"""
+Parallel parameter optimizer for the Sumo risk policy.
+
+risk_stream.risk() runs with fixed parameters: the stop loss (-5000), the
+NBM range R_dict sizes the first lot over (25), and the breakeven bands of
+breakeven_curve.py (BE_low=4, BE_high=6). This module scores parameter sets
+on a historical backtest and ranks them.
+
+Backtest: every `step` hours of the ZN hourly history starts a window,
+rebased to the current price so today's technical levels apply. With no
+trade on, R_dict gives the first level and whole-lot size on each side;
+the first close through level_below_0 (long) or level_above_0 (short)
+within entry_hours opens the trade at that level. The R_survival schedule,
+up to the set's stop loss, is then run along the next `horizon` hours of
+history (apply_policy from survival_monte_carlo). PnL is continuous in the
+price and its slope is at most the largest size held before the stop, so no
+trade can end further below the stop loss than one bar's move at that size;
+worst_pnl_floor records that bound and the report flags sets that break it.
+
+Search: a grid, then random samples over the bounds, then refinement rounds
+that sample around the best sets found so far with a shrinking radius.
+be_low is kept at or below be_high (sampled pairs are swapped). Sets are
+ranked by Sharpe ratio by default: mean P&L grows with the stop loss, which
+scales every position, so ranking on it favors the largest sizing.
+Evaluations run on a process pool. Results are cached per (backtest setup,
+parameter set) in PARAM_OPTIMIZER_CACHE_PKL, so reruns only evaluate new
+sets. The ranked report is written to PARAM_OPTIMIZER_REPORT_CSV.
+
+R_survival does not use NBM, so the active-trade NBM (19.5) is not searched.
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Add the workspace root to Python path
+workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, workspace_root)
+
+from config import ZN_INTRADAY_1H_CSV, TECHNICAL_DICT_CSV, PARAM_OPTIMIZER_CACHE_PKL, PARAM_OPTIMIZER_REPORT_CSV
+from Optimizer.risk_utils import zn_to_decimal
+from Optimizer.Sumo_Curve.breakeven_curve import BreakevenBands, BE_low, BE_high
+from Optimizer.Sumo_Curve.risk_surface import idle_entry_sizes, technical_dict_key, STOP_LOSS, IDLE_NBM
+from Optimizer.Sumo_Curve.survival_monte_carlo import (
+    policy_schedule,
+    apply_policy,
+    OUTCOME_STOPPED,
+    OUTCOME_SURVIVED,
+    OUTCOME_OPEN,
+)
+
+logger = logging.getLogger('parameter_optimizer')
+
+PARAM_NAMES = ('stop_loss', 'nbm', 'be_low', 'be_high')
+CURRENT_PARAMS = {'stop_loss': STOP_LOSS, 'nbm': IDLE_NBM, 'be_low': BE_low, 'be_high': BE_high}
+
+DEFAULT_GRID = {
+    'stop_loss': [-2500, -5000, -7500, -10000],
+    'nbm': [15, 19.5, 25, 32],
+    'be_low': [3, 4, 5],
+    'be_high': [5, 6, 7, 8],
+}
+# Random/refinement bounds and the step each parameter is rounded to;
+# be_low <= be_high is enforced on top of these
+DEFAULT_BOUNDS = {
+    'stop_loss': (-12000, -2000, 250),
+    'nbm': (10, 40, 0.5),
+    'be_low': (2, 8, 0.25),
+    'be_high': (3, 12, 0.25),
+}
+
+RANK_METRICS = ('mean_pnl', 'total_pnl', 'sharpe', 'survival_rate')
+
+# Part of the setup fingerprint; bump when evaluate_parameters changes so cached results are not reused
+BACKTEST_VERSION = 2
+
+
+def params_key(params):
+    """Hashable key of a parameter set (PARAM_NAMES order)."""
+    return tuple(float(params[name]) for name in PARAM_NAMES)
+
+
+def build_backtest_setup(current_price, technical_dict, csv_path=ZN_INTRADAY_1H_CSV, *,
+                         step=4, entry_hours=24, horizon=120, take_profit=0.0):
+    """
+    Historical windows and inputs shared by every evaluation.
+
+    Args:
+        current_price (float): Decimal price the windows are rebased to
+        technical_dict (dict): Technical dict (missing size up prices default to current_price)
+        csv_path (str): ZN hourly data
+        step (int): Hours between window starts
+        entry_hours (int): Hours a window waits for the first level to be reached
+        horizon (int): Hours a trade is followed after entry
+        take_profit (float): PnL counted as survival (0 = back to breakeven)
+
+    Returns:
+        dict: Setup passed to evaluate_parameters, with a 'fingerprint' for the cache
+    """
+    closes = pd.read_csv(csv_path, usecols=['Close'])['Close'].to_numpy(dtype=float)
+    closes = closes[np.isfinite(closes) & (closes > 0)]
+    starts = np.arange(0, len(closes) - entry_hours - horizon - 1, step)
+
+    technical_dict = dict(technical_dict)
+    for field in ("Size Up Long Price", "Size Up Short Price"):
+        if pd.isna(technical_dict[field]):
+            technical_dict[field] = current_price
+
+    stat = os.stat(csv_path)
+    fingerprint = hashlib.sha256(repr((
+        float(current_price), technical_dict_key(technical_dict), os.path.abspath(csv_path),
+        stat.st_mtime_ns, stat.st_size, step, entry_hours, horizon, float(take_profit), BACKTEST_VERSION,
+    )).encode()).hexdigest()[:16]
+    return {
+        'current_price': float(current_price),
+        'technical_dict': technical_dict,
+        'closes': closes,
+        'starts': starts,
+        'entry_hours': entry_hours,
+        'horizon': horizon,
+        'take_profit': take_profit,
+        'fingerprint': fingerprint,
+    }
+
+
+def _entries(setup, level_below_0, level_above_0):
+    """Entry bar (-1 if none) and side (+1 long, -1 short) of every window."""
+    closes, starts, cp = setup['closes'], setup['starts'], setup['current_price']
+    bars = np.arange(1, setup['entry_hours'] + 1)
+    # Window prices rebased so each window starts at the current price
+    prices = closes[starts[:, None] + bars] * (cp / closes[starts])[:, None]
+    long_hit = prices <= level_below_0
+    short_hit = prices >= level_above_0
+    width = len(bars)
+    first_long = np.where(long_hit.any(axis=1), long_hit.argmax(axis=1), width)
+    first_short = np.where(short_hit.any(axis=1), short_hit.argmax(axis=1), width)
+    # Both levels on the same close (current price on a level): the direction of the move decides
+    entry = np.minimum(first_long, first_short)
+    went_down = prices[np.arange(len(starts)), np.minimum(entry, width - 1)] < cp
+    side = np.where(first_long < first_short, 1, np.where(first_short < first_long, -1, np.where(went_down, 1, -1)))
+    has_entry = entry < width
+    return np.where(has_entry, bars[np.minimum(entry, width - 1)], -1), np.where(has_entry, side, 0)
+
+
+def evaluate_parameters(params, setup):
+    """
+    Backtest one parameter set.
+
+    Args:
+        params (dict): 'stop_loss', 'nbm', 'be_low', 'be_high'
+        setup (dict): From build_backtest_setup
+
+    Returns:
+        dict: params plus trades, outcome rates, PnL statistics, max drawdown / size and
+              worst_pnl_floor, or params plus 'error' if the policy can't be evaluated with them
+    """
+    result = dict(zip(PARAM_NAMES, params_key(params)))
+    try:
+        curve = BreakevenBands(result['be_low'], result['be_high'])
+        cp = setup['current_price']
+        level_below_0, R0_below, level_above_0, R0_above = idle_entry_sizes(
+            cp, dict(setup['technical_dict']), result['stop_loss'], result['nbm'], breakeven_curve=curve)
+        entry_bar, side = _entries(setup, level_below_0, level_above_0)
+
+        closes, starts, horizon = setup['closes'], setup['starts'], setup['horizon']
+        outcomes, pnls, drawdowns, lots = [], [], [], []
+        worst_pnl_floor = result['stop_loss']
+        for trade_side, level_0, R0 in ((1, level_below_0, R0_below), (-1, level_above_0, R0_above)):
+            rows = np.flatnonzero(side == trade_side)
+            if not len(rows):
+                continue
+            schedule = policy_schedule(level_0, R0, setup['technical_dict'], cp,
+                                       stop_loss=result['stop_loss'], breakeven_curve=curve)
+            idx = (starts[rows] + entry_bar[rows])[:, None] + np.arange(horizon + 1)
+            prices = closes[idx] * (cp / closes[starts[rows]])[:, None]
+            trades = apply_policy(prices, schedule, result['stop_loss'], setup['take_profit'])
+            # One bar's move at the largest size held before the stop
+            max_bar_move = float(np.abs(np.diff(prices, axis=1)).max()) if horizon else 0.0
+            worst_pnl_floor = min(worst_pnl_floor,
+                                  result['stop_loss'] - np.abs(schedule['risk']).max() * max_bar_move)
+            outcomes.append(trades['outcome'])
+            pnls.append(trades['pnl'])
+            drawdowns.append(trades['max_drawdown'])
+            lots.append(trades['max_lots'])
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+
+    outcome = np.concatenate(outcomes) if outcomes else np.zeros(0, dtype=np.int8)
+    pnl = np.concatenate(pnls) if pnls else np.zeros(0)
+    n = len(pnl)
+    pnl_std = float(pnl.std()) if n else 0.0
+    result.update({
+        'windows': len(starts),
+        'trades': n,
+        'long_trades': int((side == 1).sum()),
+        'short_trades': int((side == -1).sum()),
+        'survival_rate': float(np.mean(outcome == OUTCOME_SURVIVED)) if n else np.nan,
+        'stop_rate': float(np.mean(outcome == OUTCOME_STOPPED)) if n else np.nan,
+        'open_rate': float(np.mean(outcome == OUTCOME_OPEN)) if n else np.nan,
+        'total_pnl': float(pnl.sum()),
+        'mean_pnl': float(pnl.mean()) if n else np.nan,
+        'pnl_std': pnl_std,
+        'sharpe': float(pnl.mean() / pnl_std) if n and pnl_std > 0 else np.nan,
+        'worst_pnl': float(pnl.min()) if n else np.nan,
+        'worst_pnl_floor': float(worst_pnl_floor),
+        'p95_max_drawdown': float(np.quantile(np.concatenate(drawdowns), 0.95)) if n else np.nan,
+        'max_lots': float(np.concatenate(lots).max()) if n else np.nan,
+        'R0_long_lots': R0_below / 1000,
+        'R0_short_lots': R0_above / 1000,
+    })
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Search spaces
+# ---------------------------------------------------------------------------
+
+def _snap(value, name, bounds):
+    low, high, step = bounds[name]
+    return float(np.clip(np.round(value / step) * step, low, high))
+
+
+def _ordered_bands(params):
+    """Swap be_low and be_high if be_low came out above be_high."""
+    if params['be_low'] > params['be_high']:
+        params['be_low'], params['be_high'] = params['be_high'], params['be_low']
+    return params
+
+
+def grid_candidates(grid=DEFAULT_GRID):
+    """Every combination of the grid values with be_low <= be_high."""
+    mesh = np.meshgrid(*(grid[name] for name in PARAM_NAMES), indexing='ij')
+    candidates = [dict(zip(PARAM_NAMES, values)) for values in zip(*(axis.ravel().tolist() for axis in mesh))]
+    return [params for params in candidates if params['be_low'] <= params['be_high']]
+
+
+def random_candidates(n, rng, bounds=DEFAULT_BOUNDS):
+    """n parameter sets drawn uniformly within bounds (be_low <= be_high)."""
+    return [_ordered_bands({name: _snap(rng.uniform(bounds[name][0], bounds[name][1]), name, bounds)
+                            for name in PARAM_NAMES})
+            for _ in range(n)]
+
+
+def refine_candidates(best, n, radius, rng, bounds=DEFAULT_BOUNDS):
+    """n parameter sets sampled around the best sets, radius as a fraction of each bound's width (be_low <= be_high)."""
+    candidates = []
+    for i in range(n):
+        center = best[i % len(best)]
+        candidates.append(_ordered_bands({
+            name: _snap(center[name] + rng.normal(0, radius * (bounds[name][1] - bounds[name][0])), name, bounds)
+            for name in PARAM_NAMES
+        }))
+    return candidates
+
+
+# ---------------------------------------------------------------------------
+# Parallel evaluation with a persistent cache
+# ---------------------------------------------------------------------------
+
+_WORKER_SETUP = None
+
+
+def _init_worker(setup):
+    global _WORKER_SETUP
+    _WORKER_SETUP = setup
+
+
+def _evaluate_in_worker(params):
+    return evaluate_parameters(params, _WORKER_SETUP)
+
+
+class ParameterOptimizer:
+    """Evaluate parameter sets on a process pool, caching results per setup and parameter set."""
+
+    def __init__(self, setup, cache_path=PARAM_OPTIMIZER_CACHE_PKL, workers=None, rank_by='sharpe'):
+        """
+        Initialize the optimizer.
+
+        Args:
+            setup (dict): From build_backtest_setup
+            cache_path (str): Pickle file of cached results (None to keep them in memory only)
+            workers (int): Worker processes (None = CPU count, 1 = evaluate in this process)
+            rank_by (str): Metric to maximize, one of RANK_METRICS
+        """
+        if rank_by not in RANK_METRICS:
+            raise ValueError(f"rank_by must be one of {RANK_METRICS}")
+        self.setup = setup
+        self.cache_path = cache_path
+        self.workers = workers or os.cpu_count() or 1
+        self.rank_by = rank_by
+        self._cache = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                self._cache = pickle.load(f)
+        self._pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.setup,))
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self.save()
+
+    def save(self):
+        """Write the result cache."""
+        if self.cache_path:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            with open(self.cache_path, 'wb') as f:
+                pickle.dump(self._cache, f)
+
+    def evaluate(self, candidates):
+        """
+        Evaluate parameter sets, skipping those already cached.
+
+        Returns:
+            list: Result dicts in candidate order
+        """
+        fingerprint = self.setup['fingerprint']
+        keys = [(fingerprint, params_key(params)) for params in candidates]
+        todo = list(dict.fromkeys(key for key in keys if key not in self._cache))
+        if todo:
+            start = time.perf_counter()
+            params_list = [dict(zip(PARAM_NAMES, key[1])) for key in todo]
+            if self._pool is not None:
+                results = list(self._pool.map(_evaluate_in_worker, params_list, chunksize=max(1, len(todo) // (4 * self.workers))))
+            else:
+                results = [evaluate_parameters(params, self.setup) for params in params_list]
+            self._cache.update(zip(todo, results))
+            logger.info(f"Evaluated {len(todo)} parameter sets in {time.perf_counter() - start:.2f} s "
+                        f"({len(set(keys)) - len(todo)} cached)")
+        return [self._cache[key] for key in keys]
+
+    def results(self):
+        """All cached results for this setup as a DataFrame, best first."""
+        fingerprint = self.setup['fingerprint']
+        rows = [result for (fp, _), result in self._cache.items() if fp == fingerprint]
+        report = pd.DataFrame(rows)
+        if report.empty:
+            return report
+        if 'error' not in report.columns:
+            report['error'] = None
+        report = report.sort_values(self.rank_by, ascending=False, na_position='last').reset_index(drop=True)
+        report.insert(0, 'rank', np.arange(1, len(report) + 1))
+        return report
+
+    def best(self, k):
+        """Top k parameter sets evaluated so far."""
+        report = self.results()
+        report = report[report['error'].isna()]
+        return [dict(zip(PARAM_NAMES, row)) for row in report[list(PARAM_NAMES)].head(k).itertuples(index=False)]
+
+    def search(self, grid=DEFAULT_GRID, n_random=200, refine_rounds=3, refine_samples=100, top_k=5, seed=0):
+        """
+        Grid, random and refinement search.
+
+        Returns:
+            pandas.DataFrame: Ranked report (see results)
+        """
+        rng = np.random.default_rng(seed)
+        self.evaluate([CURRENT_PARAMS] + (grid_candidates(grid) if grid else []))
+        if n_random:
+            self.evaluate(random_candidates(n_random, rng))
+        radius = 0.1
+        for _ in range(refine_rounds):
+            self.evaluate(refine_candidates(self.best(top_k), refine_samples, radius, rng))
+            radius /= 2
+        self.save()
+        return self.results()
+
+
+def print_report(report, rank_by, top=15):
+    """Print the top of a ranked report, where the current parameters rank and any set whose worst PnL breaks its floor."""
+    columns = ['rank', *PARAM_NAMES, 'trades', 'survival_rate', 'stop_rate', 'mean_pnl', 'total_pnl',
+               'sharpe', 'worst_pnl', 'worst_pnl_floor', 'p95_max_drawdown', 'max_lots']
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.float_format', '{:.3f}'.format):
+        print(report[columns].head(top).to_string(index=False))
+    current = report
+    for name in PARAM_NAMES:
+        current = current[current[name] == float(CURRENT_PARAMS[name])]
+    if len(current):
+        row = current.iloc[0]
+        print(f"Current parameters {CURRENT_PARAMS}: rank {row['rank']} of {len(report)} ({rank_by} {row[rank_by]:.3f})")
+    below_floor = report[report['worst_pnl'] < report['worst_pnl_floor']]
+    if len(below_floor):
+        print(f"WARNING: {len(below_floor)} parameter sets lose more than one bar's gap past their stop loss "
+              f"(ranks {below_floor['rank'].tolist()[:10]})")
+    errors = report['error'].notna().sum()
+    if errors:
+        print(f"{errors} parameter sets could not be evaluated (e.g. no technical level within the NBM range)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Search stop loss, NBM and breakeven bands on a historical backtest')
+    parser.add_argument('--price', default=None, help="Current price, ZN format (default: midway between support and resistance)")
+    parser.add_argument('--step', type=int, default=4, help='Hours between backtest windows')
+    parser.add_argument('--entry-hours', type=int, default=24)
+    parser.add_argument('--horizon', type=int, default=120)
+    parser.add_argument('--take-profit', type=float, default=0.0)
+    parser.add_argument('--random', type=int, default=200, help='Random parameter sets')
+    parser.add_argument('--refine-rounds', type=int, default=3)
+    parser.add_argument('--refine-samples', type=int, default=100)
+    parser.add_argument('--rank-by', default='sharpe', choices=RANK_METRICS)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the result cache')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    technical_dict = pd.read_csv(TECHNICAL_DICT_CSV).iloc[-1].to_dict()
+    technical_dict = {k: v.strip() if isinstance(v, str) else v for k, v in technical_dict.items()}
+    if args.price:
+        current_price = zn_to_decimal(args.price)
+    else:
+        midpoint = (zn_to_decimal(technical_dict["Strong Support"]) + zn_to_decimal(technical_dict["Strong Resistance"])) / 2
+        current_price = round(midpoint * 64) / 64
+    print(f"Technical dict: {technical_dict}, current price {current_price}")
+
+    start = time.perf_counter()
+    setup = build_backtest_setup(current_price, technical_dict, step=args.step, entry_hours=args.entry_hours,
+                                 horizon=args.horizon, take_profit=args.take_profit)
+    print(f"{len(setup['starts'])} historical windows (setup {setup['fingerprint']})")
+    with ParameterOptimizer(setup, cache_path=None if args.no_cache else PARAM_OPTIMIZER_CACHE_PKL,
+                            workers=args.workers, rank_by=args.rank_by) as optimizer:
+        report = optimizer.search(n_random=args.random, refine_rounds=args.refine_rounds,
+                                  refine_samples=args.refine_samples, seed=args.seed)
+    print(f"Search finished in {time.perf_counter() - start:.1f} s, {len(report)} parameter sets evaluated")
+    report.to_csv(PARAM_OPTIMIZER_REPORT_CSV, index=False)
+    print(f"Report written to {PARAM_OPTIMIZER_REPORT_CSV}")
+    print_report(report, args.rank_by)
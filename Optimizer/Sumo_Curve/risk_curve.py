@@ -25,12 +25,13 @@ sys.path.insert(0, workspace_root)
 from Optimizer.risk_utils import (
     zn_to_decimal,
     decimal_to_zn, 
-    levels_crossed,
+    get_level_index,
     TECH_LEVELS_DEC,
 )
 from config import TECHNICAL_DICT_CSV
+from lib.trading.csv_tail import get_latest_row
 
-from Optimizer.Sumo_Curve.breakeven_curve import breakeven
+from Optimizer.Sumo_Curve.breakeven_curve import breakeven, breakeven_values
 
 logger = logging.getLogger(__name__)
 
@@ -59,31 +60,34 @@ def R_dict(breakeven_curve, current_price, technical_dict, tech_levels_dec=TECH_
         size_up_short_price = current_price_dec
         technical_dict["Size Up Short Price"] = size_up_short_price
     
-    # Calculate the NBM levels above and below the current price.
-    NBM_levels_above_dec = levels_crossed(size_up_short_price-0.01, current_price_dec + NBM/16, tech_levels_dec)  # 0.01 is a small buffer to include the size_up_short_price price in the levels_above.
-    NBM_levels_below_dec = levels_crossed(size_up_long_price+0.01, current_price_dec - NBM/16, tech_levels_dec)  # 0.01 is a small buffer to include the size_up_long_price price in the levels_below.
+    # Calculate the NBM levels above and below the current price (array views in the direction of travel).
+    level_index = get_level_index(tech_levels_dec)
+    NBM_levels_above_dec = level_index.crossed(size_up_short_price-0.01, current_price_dec + NBM/16)  # 0.01 is a small buffer to include the size_up_short_price price in the levels_above.
+    NBM_levels_below_dec = level_index.crossed(size_up_long_price+0.01, current_price_dec - NBM/16)  # 0.01 is a small buffer to include the size_up_long_price price in the levels_below.
 
-    levels_above = NBM_levels_above_dec
-    levels_below = NBM_levels_below_dec
-    #print("levels_above: ", levels_above)
-    #print("levels_below: ", levels_below)
+    #print("levels_above: ", NBM_levels_above_dec)
+    #print("levels_below: ", NBM_levels_below_dec)
 
     # Calculate the deltaL for the levels_above and levels_below.
-    deltaL_above = np.array(levels_above[1:]) - np.array(levels_above[:-1])
-    deltaL_below = np.array(levels_below[1:]) - np.array(levels_below[:-1])
-    deltaL_above = deltaL_above.tolist()
-    deltaL_below = deltaL_below.tolist()
+    deltaL_above = np.diff(NBM_levels_above_dec).tolist()
+    deltaL_below = np.diff(NBM_levels_below_dec).tolist()
+    levels_above = NBM_levels_above_dec.tolist()
+    levels_below = NBM_levels_below_dec.tolist()
 
     # Calculate the product coefficient for the levels_above and levels_below.
     # coeff_above looks like the following: deltaL_above[0] * (1 + (deltaL_above[1] / breakeven(levels_above[0])) ) * (1 + (deltaL_above[2] / breakeven(levels_above[1])) ) * ...
 
     R_dict_result = {}
 
+    # Breakeven at every level past the first, in one (vectorized) evaluation
+    be_below = breakeven_values(breakeven_curve, NBM_levels_below_dec[1:], technical_dict)
+    be_above = breakeven_values(breakeven_curve, NBM_levels_above_dec[1:], technical_dict)
+
     r_below = [1.0]
     pnl_below = [0]
     for i in range(1, len(levels_below)):
         pnl_below.append(pnl_below[i-1] + deltaL_below[i-1] * r_below[i-1])
-        r_below.append(pnl_below[i]/(breakeven_curve(levels_below[i], technical_dict)/16)) 
+        r_below.append(pnl_below[i]/(be_below[i-1]/16)) 
         r_below[i] = max(r_below[i], r_below[i-1])
     #print("r_below: ", r_below)
 
@@ -95,7 +99,7 @@ def R_dict(breakeven_curve, current_price, technical_dict, tech_levels_dec=TECH_
     pnl_above = [0]
     for i in range(1, len(levels_above)):
         pnl_above.append(pnl_above[i-1] + deltaL_above[i-1] * r_above[i-1])
-        r_above.append(pnl_above[i]/(breakeven_curve(levels_above[i], technical_dict)/16))
+        r_above.append(pnl_above[i]/(be_above[i-1]/16))
         r_above[i] = min(r_above[i], r_above[i-1])
     #print("r_above: ", r_above)
 
@@ -106,16 +110,9 @@ def R_dict(breakeven_curve, current_price, technical_dict, tech_levels_dec=TECH_
     return R_dict_result, R0_above, R0_below, levels_above[0], levels_below[0]
 
 def get_technical_dict(file_path: str) -> dict:
-    """Get the last row of the technical dict CSV as a dictionary."""
+    """Get the last row of the technical dict CSV as a dictionary (cached until the file changes)."""
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
-        
-        # Get the last row
-        last_row = df.iloc[-1]
-        
-        # Convert the last row to a dictionary
-        technical_dict = last_row.to_dict()
+        technical_dict = get_latest_row(file_path)
         
         return technical_dict
     except Exception as e:
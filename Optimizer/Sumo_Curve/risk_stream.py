@@ -1,9 +1,7 @@
-import pandas as pd
 import sys
 import os
 from datetime import datetime, timedelta
 import time
-import math
 import pickle
 import requests
 import argparse
@@ -14,18 +12,18 @@ from utils import *
 # Add lib directory for TT API imports
 sys.path.insert(0, os.path.join(workspace_root, 'lib'))
 
-from Optimizer.risk_utils import (
-    zn_to_decimal,
-    decimal_to_zn,  # noqa: F401 – exposed for convenience
-    levels_crossed,
-    TECH_LEVELS_DEC,
-)
 from config import TRADE_STATE_EVENTS_CSV, NET_POSITION_STREAMING_CSV, TECHNICAL_DICT_CSV, LIVE_PRICE_PATH, RISK_STREAMING_PKL
 
 # Import risk functions
-from Optimizer.Sumo_Curve.risk_curve import R_dict
-from Optimizer.Sumo_Curve.risk_update import R_survival
-from Optimizer.Sumo_Curve.breakeven_curve import breakeven
+from Optimizer.Sumo_Curve.risk_surface import (
+    RiskSurfaceCache,
+    idle_combined_dict,
+    active_combined_dict,
+    STOP_LOSS,
+    IDLE_NBM,
+    ACTIVE_NBM,
+)
+from Optimizer.Sumo_Curve.risk_tracker import RiskInputTracker
 
 # TT API imports for live P&L
 try:
@@ -47,8 +45,15 @@ If we have an active trade, we will use the R_survival function to calculate the
 """
 
 
-def risk():
-    """Calculate the risk for the current price."""
+# Precomputed risk surfaces (see risk_surface.py); set to False to always compute risk directly
+USE_RISK_SURFACE = True
+RISK_SURFACE = RiskSurfaceCache(stop_loss=STOP_LOSS, idle_nbm=IDLE_NBM, active_nbm=ACTIVE_NBM)
+# Inputs of the last risk computation written to the pickle (see risk_tracker.py)
+RISK_TRACKER = RiskInputTracker()
+
+
+def read_risk_inputs():
+    """Read the live inputs of risk(): trade state event, technical dict, net position and current price."""
     trade_dict = get_last_trade_state_event(TRADE_STATE_EVENTS_CSV)
     technical_dict = get_technical_dict(TECHNICAL_DICT_CSV)
     net_position_dict = get_last_net_position(NET_POSITION_STREAMING_CSV)
@@ -62,67 +67,29 @@ def risk():
     current_price = get_current_price(live_prices_path)
     #current_price = "111'01"
     #print("current_price: ", current_price)
+    return trade_dict, technical_dict, net_position_dict, current_price
 
-    SL = -5000
 
-    if trade_dict["TradeState"] == 0: # No Active Trade
+def risk(inputs=None):
+    """Calculate the risk for the current price (inputs as returned by read_risk_inputs, read if omitted)."""
+    trade_dict, technical_dict, net_position_dict, current_price = inputs if inputs is not None else read_risk_inputs()
 
-        if pd.isna(technical_dict["Size Up Long Price"]):
-            technical_dict["Size Up Long Price"] = current_price
-        if pd.isna(technical_dict["Size Up Short Price"]):
-            technical_dict["Size Up Short Price"] = current_price
-            
-        risk_data = R_dict(breakeven, current_price, technical_dict, TECH_LEVELS_DEC, stop_loss = SL, NBM=25, pnl_0=0)
-        #risk_dict = risk_data[0]
-        R0_above = risk_data[1]
-        R0_below = risk_data[2]
-        level_above_0 = risk_data[3]
-        level_below_0 = risk_data[4]
-        #print("R0_above: ", R0_above)
-        #print("R0_below: ", R0_below)
-
-        """
-        # Get the minimum long quantity and the maximum short quantity to see if we need to start with 1 lot or -1 lot
-        min_long_quantity = min([value for key, value in risk_dict.items() if value > 0])
-        max_short_quantity = max([value for key, value in risk_dict.items() if value < 0])
-        """
-
-        R0_below = max(R0_below, 1000)
-        R0_below = math.floor(R0_below/1000)*1000
-        R0_above = min(R0_above, -1000)
-        R0_above = math.ceil(R0_above/1000)*1000
-    
-        delta_risk_long, risk_curve_long, pnl_curve_long, be_curve_long, extreme_level_below, ticks_to_extreme_below = R_survival(breakeven, level_below_0, R0_below, technical_dict, current_price, tech_levels_dec=TECH_LEVELS_DEC, stop_loss = SL, NBM=25, pnl_0=0)
-        delta_risk_short, risk_curve_short, pnl_curve_short, be_curve_short, extreme_level_above, ticks_to_extreme_above = R_survival(breakeven, level_above_0, R0_above, technical_dict, current_price, tech_levels_dec=TECH_LEVELS_DEC, stop_loss = SL, NBM=25, pnl_0=0)
-        #print("risk_curve_long: ", risk_curve_long)
-
-        #print("risk_curve_short: ", risk_curve_short)
-        delta_risk_dict = {**delta_risk_long, **delta_risk_short}
-        risk_dict = {**risk_curve_long, **risk_curve_short}
-        pnl_dict = {**pnl_curve_long, **pnl_curve_short}
-        be_dict = {**be_curve_long, **be_curve_short}
-        #print("delta_risk_dict: ", delta_risk_dict)
-        #print("risk_dict: ", risk_dict)
-        #print("pnl_dict: ", pnl_dict)
-        #print("be_dict: ", be_dict)
-        combined_dict = {decimal_to_zn(key): (delta_risk_dict[key]/1000, risk_dict[key]/1000, risk_dict[key]/16, pnl_dict[key], be_dict[key]) for key in sorted(risk_dict.keys(), reverse=True)}
+    SL = STOP_LOSS
+
+    if trade_dict["TradeState"] == 0: # No Active Trade
+        # R_dict sizes the first lot on each side, then R_survival walks the levels from there
+        combined_dict = RISK_SURFACE.lookup(0, current_price, technical_dict) if USE_RISK_SURFACE else None
+        if combined_dict is None:
+            combined_dict = idle_combined_dict(current_price, technical_dict, stop_loss=SL, NBM=IDLE_NBM)
         #print("combined_dict: ", combined_dict)
         return combined_dict
 
     elif trade_dict["TradeState"] == 1: # Active Trade
-        #print("trade_dict: ", trade_dict)
-        #print("net_position_dict: ", net_position_dict)
-        #print("technical_dict: ", technical_dict)
-        #print("current_price: ", current_price)
         starting_price = trade_dict["Price"]
         #print("starting_price: ", starting_price)
-        #delta_risk_dict, risk_dict, pnl_dict, be_dict, extreme_level_above, ticks_to_extreme_above = R_survival(breakeven, current_price, net_position_dict["NetPosition"]*1000, technical_dict, starting_price, tech_levels_dec=TECH_LEVELS_DEC, stop_loss = SL, NBM=25, pnl_0=-46.8)
-        delta_risk_dict, risk_dict, pnl_dict, be_dict, extreme_level_above, ticks_to_extreme_above = R_survival(breakeven, current_price, net_position_dict["NetPosition"]*1000, technical_dict, starting_price, tech_levels_dec=TECH_LEVELS_DEC, stop_loss = SL, NBM=19.5, pnl_0=0)
-        #print("delta_risk_dict: ", delta_risk_dict)
-        #print("risk_dict: ", risk_dict)
-        #print("pnl_dict: ", pnl_dict)
-        #print("be_dict: ", be_dict)
-        combined_dict = {decimal_to_zn(key): (delta_risk_dict[key]/1000, risk_dict[key]/1000, risk_dict[key]/16, pnl_dict[key], be_dict[key]) for key in sorted(risk_dict.keys(), reverse=True)}
+        combined_dict = RISK_SURFACE.lookup(1, current_price, technical_dict, net_position_dict["NetPosition"], starting_price) if USE_RISK_SURFACE else None
+        if combined_dict is None:
+            combined_dict = active_combined_dict(current_price, net_position_dict["NetPosition"], technical_dict, starting_price, stop_loss=SL, NBM=ACTIVE_NBM)
         #print("combined_dict: ", combined_dict)
         return combined_dict
 
@@ -132,11 +99,27 @@ def risk():
 
 
 def stream_risk_to_pickle(file_path: str = RISK_STREAMING_PKL):
-    """Stream risk() dictionary to pickle with timestamp."""
+    """
+    Stream risk() dictionary to pickle with timestamp.
+
+    Skips the risk calculation and the pickle write when the inputs risk()
+    depends on are unchanged since the last write (see RISK_TRACKER).
+
+    Returns:
+        bool: True if risk was recomputed and written, False if unchanged or on error
+    """
     try:
         #print("Good till 0")
+        inputs = read_risk_inputs()
+        trade_dict, technical_dict, net_position_dict, current_price = inputs
+        # Key before risk(): it fills missing size up prices in technical_dict
+        input_key = RISK_TRACKER.key(trade_dict.get("TradeState"), current_price, technical_dict,
+                                     net_position_dict.get("NetPosition"), trade_dict.get("Price"))
+        if RISK_TRACKER.is_current(input_key) and os.path.exists(file_path):
+            return False
+
         # Get risk data
-        combined_dict = risk()
+        combined_dict = risk(inputs)
         #print("Good till 1")
         #print("combined_dict: ", combined_dict)
         current_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -165,17 +148,20 @@ def stream_risk_to_pickle(file_path: str = RISK_STREAMING_PKL):
             pickle.dump(history, f)
             
         #print("Good till 3")
+        RISK_TRACKER.record(input_key)
+        return True
     except Exception as e:
         print(f"Error streaming risk to pickle: {e}")
+        return False
 
 
 def run_risk_once():
-    """Run risk streaming once and return immediately."""
+    """Run risk streaming once; returns True if the risk pickle was updated."""
     try:
         print("🔄 Running risk stream once...")
-        stream_risk_to_pickle()
-        print("✅ Risk stream completed")
-        return True
+        updated = stream_risk_to_pickle()
+        print("✅ Risk stream completed" if updated else "✅ Risk inputs unchanged, skipped")
+        return updated
     except Exception as e:
         print(f"❌ Error in risk stream: {e}")
         return False
@@ -198,6 +184,8 @@ if __name__ == "__main__":
     args = parser.parse_args()
     
     if args.run_once:
+        # A one-shot process would pay for building a surface it never reuses
+        USE_RISK_SURFACE = False
         run_risk_once()
     else:
         print("Running risk streaming...")
@@ -0,0 +1,342 @@
+"""
+Precomputed risk surface for the live risk stream.
+
+risk_stream.risk() only depends on the price tick, the net position, the
+trade state (plus the trade's starting price while a trade is active) and the
+technical dict. RiskSurfaceCache precomputes the combined risk dictionary for
+every tick within tick_radius of the current price (and, for an active trade,
+every position up to max_position_lots) whenever the technical dict changes,
+so serving risk is a dictionary/array lookup keyed by
+(tick, position, trade state, tech-dict version). Surfaces are also dropped
+when the level store (lib/trading/level_store.py) reloads a new version of
+the technical levels.
+
+- Idle (TradeState 0) entries run the same R_dict + R_survival pipeline as
+  risk() for each tick.
+- Active (TradeState 1) entries for a starting price come from one
+  R_survival_batch sweep over ticks x positions; each combined dict is built
+  from its row on first use.
+
+Prices off the 1/64 grid, positions outside the surface, and cases where
+R_survival would fail are not cached. For those, lookup() returns None and
+the caller computes risk directly. By default a missing surface is built in
+a worker thread, and lookup() also returns None until it is ready, so a
+tech-dict change or a price leaving the surface never delays a tick.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from Optimizer.risk_utils import decimal_to_zn, TECH_LEVELS_DEC, LEVEL_STORE
+from Optimizer.Sumo_Curve.breakeven_curve import breakeven, BREAKEVEN_FIELDS
+from Optimizer.Sumo_Curve.risk_curve import R_dict
+from Optimizer.Sumo_Curve.risk_update import R_survival, R_survival_batch, SWEEP_OK
+from lib.trading.price_ticks import TICKS_PER_POINT, price_to_tick_exact, tick_to_price
+
+logger = logging.getLogger('risk_surface')
+
+# Parameters used by risk_stream.risk()
+STOP_LOSS = -5000
+IDLE_NBM = 25
+ACTIVE_NBM = 19.5
+
+
+def combined_risk_dict(*curve_sets):
+    """
+    Merge (delta_risk, risk, pnl, be) curve dicts into risk()'s combined dict.
+
+    Later curve sets override earlier ones on shared levels, as {**a, **b} does.
+
+    Returns:
+        dict: ZN price string -> (delta risk lots, risk lots, risk /16, PnL, breakeven),
+              highest price first
+    """
+    delta_risk_dict, risk_dict, pnl_dict, be_dict = {}, {}, {}, {}
+    for delta_risk, risk_curve, pnl_curve, be_curve in curve_sets:
+        delta_risk_dict.update(delta_risk)
+        risk_dict.update(risk_curve)
+        pnl_dict.update(pnl_curve)
+        be_dict.update(be_curve)
+    return {decimal_to_zn(key): (delta_risk_dict[key]/1000, risk_dict[key]/1000, risk_dict[key]/16, pnl_dict[key], be_dict[key]) for key in sorted(risk_dict.keys(), reverse=True)}
+
+
+def idle_entry_sizes(current_price, technical_dict, stop_loss=STOP_LOSS, NBM=IDLE_NBM, breakeven_curve=breakeven):
+    """
+    First level and whole-lot starting risk on each side with no active trade.
+
+    Missing size up prices default to the current price; technical_dict is
+    updated in place like risk() does.
+
+    Returns:
+        tuple: (level_below_0, R0_below, level_above_0, R0_above); R0 in decimal (1 lot = 1000)
+    """
+    if pd.isna(technical_dict["Size Up Long Price"]):
+        technical_dict["Size Up Long Price"] = current_price
+    if pd.isna(technical_dict["Size Up Short Price"]):
+        technical_dict["Size Up Short Price"] = current_price
+
+    risk_data = R_dict(breakeven_curve, current_price, technical_dict, TECH_LEVELS_DEC, stop_loss = stop_loss, NBM=NBM, pnl_0=0)
+    R0_above = risk_data[1]
+    R0_below = risk_data[2]
+    level_above_0 = risk_data[3]
+    level_below_0 = risk_data[4]
+
+    R0_below = max(R0_below, 1000)
+    R0_below = math.floor(R0_below/1000)*1000
+    R0_above = min(R0_above, -1000)
+    R0_above = math.ceil(R0_above/1000)*1000
+    return level_below_0, R0_below, level_above_0, R0_above
+
+
+def idle_combined_dict(current_price, technical_dict, stop_loss=STOP_LOSS, NBM=IDLE_NBM):
+    """
+    Combined risk dict with no active trade (risk() with TradeState 0).
+
+    Missing size up prices default to the current price; technical_dict is
+    updated in place like risk() does.
+    """
+    level_below_0, R0_below, level_above_0, R0_above = idle_entry_sizes(current_price, technical_dict, stop_loss, NBM)
+
+    long_curves = R_survival(breakeven, level_below_0, R0_below, technical_dict, current_price, tech_levels_dec=TECH_LEVELS_DEC, stop_loss = stop_loss, NBM=NBM, pnl_0=0)
+    short_curves = R_survival(breakeven, level_above_0, R0_above, technical_dict, current_price, tech_levels_dec=TECH_LEVELS_DEC, stop_loss = stop_loss, NBM=NBM, pnl_0=0)
+    return combined_risk_dict(long_curves[:4], short_curves[:4])
+
+
+def active_combined_dict(current_price, net_position, technical_dict, starting_price, stop_loss=STOP_LOSS, NBM=ACTIVE_NBM):
+    """Combined risk dict for an active trade (risk() with TradeState 1)."""
+    curves = R_survival(breakeven, current_price, net_position*1000, technical_dict, starting_price, tech_levels_dec=TECH_LEVELS_DEC, stop_loss = stop_loss, NBM=NBM, pnl_0=0)
+    return combined_risk_dict(curves[:4])
+
+
+def technical_dict_key(technical_dict):
+    """Hashable key of the technical-dict fields the risk calculation reads (NaN-safe)."""
+    return tuple(None if pd.isna(technical_dict[field]) else technical_dict[field] for field in BREAKEVEN_FIELDS)
+
+
+class RiskSurfaceCache:
+    """
+    Risk surfaces keyed by (tick, position, trade state, tech-dict version).
+
+    The tech-dict version is bumped whenever the technical dict's content or
+    the technical levels change, which drops every surface built for the
+    previous version.
+    """
+
+    def __init__(self, tick_radius=64, max_position_lots=50, stop_loss=STOP_LOSS,
+                 idle_nbm=IDLE_NBM, active_nbm=ACTIVE_NBM, max_active_surfaces=4, background=True):
+        """
+        Initialize the cache.
+
+        Args:
+            tick_radius (int): Ticks (1/64ths) precomputed on each side of the current price
+            max_position_lots (int): Active-trade positions precomputed, from -N to N lots
+            stop_loss (float): Stop loss used by risk()
+            idle_nbm (float): NBM with no active trade
+            active_nbm (float): NBM during an active trade
+            max_active_surfaces (int): Active-trade surfaces (one per starting price) kept
+            background (bool): Build missing surfaces in a worker thread instead of inside lookup()
+        """
+        self.tick_radius = tick_radius
+        self.max_position_lots = max_position_lots
+        self.stop_loss = stop_loss
+        self.idle_nbm = idle_nbm
+        self.active_nbm = active_nbm
+        self.max_active_surfaces = max_active_surfaces
+        self.background = background
+
+        self.version = 0
+        self._tech_key = None
+        self._idle = None                   # (min_tick, max_tick, {tick: combined dict or None})
+        self._active = OrderedDict()        # starting price -> surface dict
+        self.hits = 0
+        self.misses = 0
+        # Guards the surfaces and the version against the build thread
+        self._lock = threading.Lock()
+        self._builder = None
+
+    def _check_version(self, technical_dict):
+        tech_key = (technical_dict_key(technical_dict), LEVEL_STORE.snapshot().version)
+        if tech_key != self._tech_key:
+            if self._tech_key is not None:
+                changed = "Technical levels" if tech_key[0] == self._tech_key[0] else "Technical dict"
+                logger.info(f"{changed} changed, dropping risk surfaces (v{self.version} -> v{self.version + 1})")
+            with self._lock:
+                self._tech_key = tech_key
+                self.version += 1
+                self._idle = None
+                self._active.clear()
+
+    def _start_build(self, build, *args):
+        """
+        Build a surface for the current version.
+
+        Returns:
+            bool: True if the surface was built here, False if it is being built
+                  in the worker thread (or another build is still running)
+        """
+        if not self.background:
+            build(self.version, *args)
+            return True
+        if self._builder is None or not self._builder.is_alive():
+            self._builder = threading.Thread(target=self._run_build, args=(build, self.version) + args,
+                                             name='risk-surface-build', daemon=True)
+            self._builder.start()
+        return False
+
+    @staticmethod
+    def _run_build(build, *args):
+        try:
+            build(*args)
+        except Exception as e:
+            logger.warning(f"Risk surface build failed: {e}")
+
+    def wait_for_build(self, timeout=None):
+        """Wait for the worker thread's current build (if any) to finish."""
+        builder = self._builder
+        if builder is not None:
+            builder.join(timeout)
+
+    def lookup(self, trade_state, current_price, technical_dict, net_position=None, starting_price=None):
+        """
+        Return the precomputed combined risk dict, starting a surface build if needed.
+
+        Args:
+            trade_state (int): 0 (no active trade) or 1 (active trade)
+            current_price (float): Current decimal price
+            technical_dict (dict): Current technical dict (not modified)
+            net_position (float): Net position in lots (active trade)
+            starting_price (float): Trade starting price (active trade)
+
+        Returns:
+            dict or None: The combined dict, or None if this input is not cacheable or its
+                          surface is still being built
+        """
+        self._check_version(technical_dict)
+        tick = price_to_tick_exact(current_price) if isinstance(current_price, (int, float)) else None
+        if tick is None or tick_to_price(tick) != current_price:
+            return None
+
+        if trade_state == 0:
+            result = self._lookup_idle(tick, technical_dict)
+        elif trade_state == 1:
+            result = self._lookup_active(tick, net_position, starting_price, technical_dict)
+        else:
+            result = None
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    # -- idle --------------------------------------------------------------
+
+    def _lookup_idle(self, tick, technical_dict):
+        idle = self._idle
+        if idle is None or not (idle[0] <= tick <= idle[1]):
+            if not self._start_build(self._build_idle, tick, dict(technical_dict)):
+                return None
+            idle = self._idle
+        return idle[2].get(tick)
+
+    def _build_idle(self, version, center_tick, technical_dict):
+        start = time.perf_counter()
+        min_tick, max_tick = center_tick - self.tick_radius, center_tick + self.tick_radius
+        entries = {}
+        for tick in range(min_tick, max_tick + 1):
+            try:
+                entries[tick] = idle_combined_dict(tick_to_price(tick), dict(technical_dict), self.stop_loss, self.idle_nbm)
+            except Exception as e:
+                logger.debug(f"Idle risk at tick {tick} not cached: {e}")
+                entries[tick] = None
+        with self._lock:
+            if version != self.version:
+                logger.info(f"Discarding idle risk surface v{version}, now at v{self.version}")
+                return
+            self._idle = (min_tick, max_tick, entries)
+        logger.info(f"Built idle risk surface v{version}: {len(entries)} ticks around "
+                    f"{decimal_to_zn(tick_to_price(center_tick))} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # -- active ------------------------------------------------------------
+
+    def _lookup_active(self, tick, net_position, starting_price, technical_dict):
+        try:
+            lots = float(net_position)
+            starting_price = float(starting_price)
+        except (TypeError, ValueError):
+            return None
+        if not lots.is_integer() or lots == 0 or abs(lots) > self.max_position_lots or starting_price != starting_price:
+            return None
+
+        with self._lock:
+            surface = self._active.get(starting_price)
+            if surface is not None and surface['min_tick'] <= tick <= surface['max_tick']:
+                self._active.move_to_end(starting_price)
+            else:
+                surface = None
+        if surface is None:
+            if not self._start_build(self._build_active, tick, starting_price, dict(technical_dict)):
+                return None
+            surface = self._active[starting_price]
+
+        row = (tick - surface['min_tick']) * surface['num_positions'] + (int(lots) + self.max_position_lots)
+        entries = surface['entries']
+        if row not in entries:
+            entries[row] = self._active_entry(surface['sweep'], row)
+        return entries[row]
+
+    def _build_active(self, version, center_tick, starting_price, technical_dict):
+        start = time.perf_counter()
+        min_tick, max_tick = center_tick - self.tick_radius, center_tick + self.tick_radius
+        ticks = np.arange(min_tick, max_tick + 1)
+        lots = np.arange(-self.max_position_lots, self.max_position_lots + 1)
+        # Row-major scenarios: row = tick index * num_positions + lot index
+        prices = np.repeat(ticks / TICKS_PER_POINT, len(lots))
+        R0 = np.tile(lots * 1000, len(ticks))
+        sweep = R_survival_batch(breakeven, prices, R0, technical_dict, starting_price,
+                                 stop_loss=self.stop_loss, NBM=self.active_nbm, pnl_0=0)
+        surface = {
+            'min_tick': min_tick,
+            'max_tick': max_tick,
+            'num_positions': len(lots),
+            'sweep': sweep,
+            'entries': {},
+        }
+        with self._lock:
+            if version != self.version:
+                logger.info(f"Discarding active risk surface v{version}, now at v{self.version}")
+                return
+            self._active[starting_price] = surface
+            self._active.move_to_end(starting_price)
+            while len(self._active) > self.max_active_surfaces:
+                self._active.popitem(last=False)
+        logger.info(f"Built active risk surface v{version} (start {starting_price}): {len(ticks)} ticks x "
+                    f"{len(lots)} positions in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    @staticmethod
+    def _active_entry(sweep, row):
+        """Combined dict for one sweep row, or None where R_survival would not return curves."""
+        if sweep['status'][row] != SWEEP_OK:
+            return None
+        length = sweep['length'][row]
+        levels = sweep['levels'][row, :length].tolist()
+        curves = tuple(
+            dict(zip(levels, sweep[name][row, :length].tolist()))
+            for name in ('delta_risk', 'risk', 'pnl', 'be')
+        )
+        return combined_risk_dict(curves)
+
+    def stats(self):
+        """Hit/miss counters and the current tech-dict version."""
+        total = self.hits + self.misses
+        return {
+            'version': self.version,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,118 @@
+"""
+Dependency tracker for the live risk stream.
+
+risk_stream.risk() only depends on a handful of inputs: the trade state, the
+current price, the net position and starting price of an active trade, the
+technical dict and the version of the technical levels. RiskInputTracker
+remembers those inputs from the last computation so the stream can skip the
+R_dict/R_survival pipeline, and the pickle/HTML writes after it, when none
+of them changed.
+
+The price is tracked both as its bucket between adjacent technical levels and
+as the exact price: the combined dict starts at the current price and every
+level's PnL is measured from it, so a move inside a bucket still changes the
+output. The bucket is used to attribute misses to level crossings.
+"""
+
+import logging
+
+from Optimizer.risk_utils import TECH_LEVEL_INDEX, LEVEL_STORE, get_level_index
+from Optimizer.Sumo_Curve.risk_surface import technical_dict_key
+
+logger = logging.getLogger('risk_tracker')
+
+# Fields of the key, in order, used to name the reason for a miss
+_KEY_FIELDS = ('trade_state', 'net_position', 'starting_price', 'technical_dict', 'levels', 'level_crossing', 'price')
+
+
+class RiskInputTracker:
+    """Remember risk()'s last inputs and count hits (unchanged) and misses (recompute)."""
+
+    def __init__(self, level_index=TECH_LEVEL_INDEX, log_every=100):
+        """
+        Initialize the tracker.
+
+        Args:
+            level_index (LevelIndex): Technical levels defining the price buckets
+                (TECH_LEVEL_INDEX follows the level store's current version)
+            log_every (int): Log the hit/miss ratio every this many checks (0 disables)
+        """
+        self.level_index = level_index
+        self.log_every = log_every
+        self._last_key = None
+        self.hits = 0
+        self.misses = 0
+        self.miss_reasons = {}
+
+    def price_bucket(self, price):
+        """Index of the interval between adjacent technical levels that holds price."""
+        return get_level_index(self.level_index).bucket(price)
+
+    def key(self, trade_state, current_price, technical_dict, net_position=None, starting_price=None):
+        """
+        Build the dependency key of one risk() call.
+
+        Net position and starting price only matter while a trade is active.
+        Call this before risk(), which fills missing size up prices in place.
+
+        Returns:
+            tuple or None: The key, or None if the inputs can't be keyed (always recompute)
+        """
+        try:
+            active = trade_state == 1
+            return (
+                trade_state,
+                net_position if active else None,
+                starting_price if active else None,
+                technical_dict_key(technical_dict),
+                LEVEL_STORE.snapshot().version,
+                self.price_bucket(current_price),
+                current_price,
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def is_current(self, key):
+        """
+        Check whether key matches the last recorded computation, counting a hit or a miss.
+
+        Returns:
+            bool: True if risk() would return the same result as last time
+        """
+        if key is not None and key == self._last_key:
+            self.hits += 1
+        else:
+            self.misses += 1
+            reason = self._miss_reason(key)
+            self.miss_reasons[reason] = self.miss_reasons.get(reason, 0) + 1
+            logger.debug(f"Risk inputs changed ({reason}), recomputing")
+
+        if self.log_every and (self.hits + self.misses) % self.log_every == 0:
+            stats = self.stats()
+            logger.info(f"Risk tracker: {stats['hits']} hits / {stats['misses']} misses "
+                        f"({stats['hit_ratio']:.1%} skipped), misses by cause {stats['miss_reasons']}")
+        return key is not None and key == self._last_key
+
+    def record(self, key):
+        """Remember key as the inputs of the latest successful computation."""
+        self._last_key = key
+
+    def _miss_reason(self, key):
+        if key is None:
+            return 'unkeyed'
+        if self._last_key is None:
+            return 'first'
+        for field, new, old in zip(_KEY_FIELDS, key, self._last_key):
+            if new != old:
+                return field
+        return 'other'
+
+    def stats(self):
+        """Hit/miss counters, hit ratio and misses broken down by the first changed input."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'miss_reasons': dict(self.miss_reasons),
+        }
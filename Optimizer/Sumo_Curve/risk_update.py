@@ -14,7 +14,6 @@ import logging
 import numpy as np
 import sys
 import os
-import pandas as pd
 import time
 import csv
 import math
@@ -25,12 +24,13 @@ sys.path.insert(0, workspace_root)
 from Optimizer.risk_utils import (
     zn_to_decimal,
     decimal_to_zn,  # noqa: F401 – exposed for convenience
-    levels_crossed,
+    get_level_index,
     TECH_LEVELS_DEC,
 )
 from config import TRADE_STATE_EVENTS_CSV, NET_POSITION_STREAMING_CSV, TECHNICAL_DICT_CSV, LIVE_PRICE_PATH
+from lib.trading.csv_tail import get_latest_row
 
-from Optimizer.Sumo_Curve.breakeven_curve import breakeven
+from Optimizer.Sumo_Curve.breakeven_curve import breakeven, breakeven_values
 
 logger = logging.getLogger(__name__)
 
@@ -64,46 +64,47 @@ def R_survival(breakeven_curve, current_price: Union[str, float],
     # ------------------------------------------------------------------
 
     cp_dec = zn_to_decimal(current_price) if isinstance(current_price, str) else current_price
+    level_index = get_level_index(tech_levels_dec)
 
     # Update the technical_dict with the starting price if the trade has started already
     if R0 > 0:
         technical_dict["Size Up Long Price"] = starting_price
 
         if current_price > starting_price:
-            lvls_below = levels_crossed(starting_price+0.001, tech_levels_dec[0],  tech_levels_dec)
+            lvls_below = level_index.crossed(starting_price+0.001, level_index.lowest)
         else:
-            lvls_below = levels_crossed(cp_dec+0.001, tech_levels_dec[0],  tech_levels_dec)
+            lvls_below = level_index.crossed(cp_dec+0.001, level_index.lowest)
 
-        if not lvls_below or lvls_below[0] != cp_dec:
-            lvls_below.insert(0, cp_dec)
+        if not len(lvls_below) or lvls_below[0] != cp_dec:
+            lvls_below = np.concatenate(([cp_dec], lvls_below))
 
-        d_below = np.diff(lvls_below)
-        d_below = d_below.tolist()
+        d_below = np.diff(lvls_below).tolist()
+        lvls_below = lvls_below.tolist()
 
     elif R0 < 0:
         technical_dict["Size Up Short Price"] = starting_price
 
         if current_price < starting_price:
-            lvls_above = levels_crossed(starting_price-0.001, tech_levels_dec[-1], tech_levels_dec)
+            lvls_above = level_index.crossed(starting_price-0.001, level_index.highest)
         else:
-            lvls_above = levels_crossed(cp_dec-0.001, tech_levels_dec[-1], tech_levels_dec)
+            lvls_above = level_index.crossed(cp_dec-0.001, level_index.highest)
 
         # Make sure *current price* is present at index 0 in both lists
-        if not lvls_above or lvls_above[0] != cp_dec:
-            lvls_above.insert(0, cp_dec)
+        if not len(lvls_above) or lvls_above[0] != cp_dec:
+            lvls_above = np.concatenate(([cp_dec], lvls_above))
 
-        d_above = np.diff(lvls_above)
-        d_above = d_above.tolist()
+        d_above = np.diff(lvls_above).tolist()
+        lvls_above = lvls_above.tolist()
 
     else:
         print("No trade started yet")
         return None
 
-    tech_levels_dec = sorted(tech_levels_dec)
-
     trade_pnl = pnl_0
 
     if R0 > 0:
+        # Breakeven at every level past the current price, in one (vectorized) evaluation
+        be_below = breakeven_values(breakeven_curve, lvls_below[1:], technical_dict)
         Risk_curve = {}
         PnL_curve = {}
         BE_curve = {}
@@ -119,7 +120,7 @@ def R_survival(breakeven_curve, current_price: Union[str, float],
             if trade_pnl <= stop_loss:
                 break
             R_prev = R_current
-            R_current = max(trade_pnl/(breakeven_curve(lvls_below[i+1], technical_dict) / 16), R_current)
+            R_current = max(trade_pnl/(be_below[i] / 16), R_current)
             R_current = math.ceil(R_current/1000)*1000  # This assumes that Risk is quantized and is in decimal format. So 1 lot is 1000 in decimal and 62.5 in 16th of a point.
             Risk_curve[lvls_below[i+1]] = R_current
             delta_risk[lvls_below[i+1]] = R_current - R_prev
@@ -132,6 +133,7 @@ def R_survival(breakeven_curve, current_price: Union[str, float],
         return delta_risk, Risk_curve, PnL_curve, BE_curve, extreme_level_below, ticks_to_extreme
 
     elif R0 < 0:
+        be_above = breakeven_values(breakeven_curve, lvls_above[1:], technical_dict)
         Risk_curve = {}
         PnL_curve = {}
         BE_curve = {}
@@ -147,9 +149,9 @@ def R_survival(breakeven_curve, current_price: Union[str, float],
             if trade_pnl <= stop_loss:
                 break
             R_prev = R_current
-            print("lvls_above[i+1]: ", lvls_above[i+1])
-            R_current = min(trade_pnl/(breakeven_curve(lvls_above[i+1], technical_dict) / 16), R_current)
-            print("breakeven_curve(lvls_above[i+1], technical_dict): ", breakeven_curve(lvls_above[i+1], technical_dict))
+            logger.debug("lvls_above[i+1]: %s", lvls_above[i+1])
+            R_current = min(trade_pnl/(be_above[i] / 16), R_current)
+            logger.debug("breakeven_curve(lvls_above[i+1], technical_dict): %s", be_above[i])
             R_current = math.floor(R_current/1000)*1000  # This assumes that Risk is in decimal format. So 1 lot is 1000 in decimal and 62.5 in 16th of a point.
             Risk_curve[lvls_above[i+1]] = R_current
             delta_risk[lvls_above[i+1]] = R_current - R_prev
@@ -166,17 +168,172 @@ def R_survival(breakeven_curve, current_price: Union[str, float],
         return None, None, None, None, None
     
 
+# Batch status codes returned by R_survival_batch
+SWEEP_OK = 0            # walk ended at the stop loss
+SWEEP_NO_TRADE = 1      # R0 == 0 (R_survival returns None)
+SWEEP_OUT_OF_LEVELS = 2 # ran past the last technical level (R_survival raises IndexError)
+SWEEP_NO_BREAKEVEN = 3  # breakeven undefined at a level (R_survival raises TypeError/ValueError)
+
+
+def R_survival_batch(breakeven_curve, current_price, R0, technical_dict, starting_price=None,
+    *,
+    tech_levels_dec: np.ndarray | List[float] = TECH_LEVELS_DEC,
+    stop_loss=-10_0000.0,
+    NBM=25.0,
+    pnl_0=0.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized R_survival over many scenarios at once.
+
+    current_price, R0, starting_price, stop_loss, NBM and pnl_0 are broadcast
+    against each other; every scenario walks its own technical levels (down
+    for R0 > 0, up for R0 < 0) and all walks advance one level per step in
+    lockstep. The arithmetic is the same as R_survival's, element-wise, so
+    row k reproduces R_survival(..., current_price[k], R0[k], ...) exactly
+    when it is called with a fresh copy of technical_dict. technical_dict
+    itself is not modified. NBM is accepted for symmetry with R_survival,
+    which does not use it either.
+
+    Args:
+        breakeven_curve: breakeven function (or a compiled BreakevenCurve / any f(price, technical_dict))
+        current_price (array-like): Decimal current prices
+        R0 (array-like): Initial risk (decimal, 1 lot = 1000), sign gives the side
+        technical_dict (dict): Technical dict shared by all scenarios
+        starting_price (array-like): Trade starting prices (defaults to current_price)
+        tech_levels_dec: Technical levels (array or LevelIndex)
+        stop_loss (array-like): Stop loss per scenario
+        NBM (array-like): Unused, see above
+        pnl_0 (array-like): Starting P&L per scenario
+
+    Returns:
+        dict: Arrays padded with NaN to the longest walk, one row per scenario:
+              'levels', 'delta_risk', 'risk', 'pnl', 'be' (n x K), plus
+              'length' (levels recorded), 'extreme_level', 'ticks_to_extreme'
+              and 'status' (SWEEP_* codes) of shape (n,)
+    """
+    if starting_price is None:
+        starting_price = current_price
+    cp, R0, sp, sl, _, pnl0 = np.broadcast_arrays(*(
+        np.atleast_1d(np.asarray(value, dtype=float))
+        for value in (current_price, R0, starting_price, stop_loss, NBM, pnl_0)
+    ))
+    n = len(cp)
+    level_index = get_level_index(tech_levels_dec)
+    levels = level_index.levels
+    long_side = R0 > 0
+    short_side = R0 < 0
+
+    # Walk start (same choice between starting and current price as R_survival)
+    long_from = np.where(cp > sp, sp + 0.001, cp + 0.001)
+    short_from = np.where(cp < sp, sp - 0.001, cp - 0.001)
+    long_stop = np.searchsorted(levels, long_from, side='right')    # levels[:stop] descending
+    short_start = np.searchsorted(levels, short_from, side='left')  # levels[start:] ascending
+    counts = np.where(long_side, long_stop, np.where(short_side, len(levels) - short_start, 0))
+    # Position 0 is always the current price: either it is the first crossed level or it is prepended
+    first_level = np.where(long_side, levels[np.maximum(long_stop - 1, 0)], levels[np.minimum(short_start, len(levels) - 1)])
+    skip_first = (counts > 0) & (first_level == cp)
+    lengths = np.where(long_side | short_side, counts + 1 - skip_first, 0)
+
+    width = max(int(lengths.max(initial=0)), 1)
+    lvls = np.full((n, width), np.nan)
+    lvls[:, 0] = cp
+    j = np.arange(1, width)
+    crossed_pos = j[None, :] - 1 + skip_first[:, None]  # position within the crossed levels
+    in_row = j[None, :] < lengths[:, None]
+    level_idx = np.where(long_side[:, None], long_stop[:, None] - 1 - crossed_pos, short_start[:, None] + crossed_pos)
+    lvls[:, 1:] = np.where(in_row, levels[np.clip(level_idx, 0, len(levels) - 1)], np.nan)
+
+    # Breakeven at every level; the curve depends on the starting price via the size up price
+    be_levels = np.full((n, width), np.nan)
+    defined = np.zeros((n, width), dtype=bool)
+    for side_mask, field in ((long_side, "Size Up Long Price"), (short_side, "Size Up Short Price")):
+        for price in np.unique(sp[side_mask]):
+            rows = np.flatnonzero(side_mask & (sp == price))
+            scenario_dict = dict(technical_dict)
+            scenario_dict[field] = float(price)
+            cells = in_row[rows]
+            values = breakeven_values(breakeven_curve, lvls[rows, 1:][cells], scenario_dict)
+            block = np.full(cells.shape, np.nan)
+            block[cells] = [np.nan if v is None else v for v in values]
+            defined_block = np.zeros(cells.shape, dtype=bool)
+            defined_block[cells] = [v is not None for v in values]
+            be_levels[rows, 1:] = block
+            defined[rows, 1:] = defined_block
+
+    risk = np.full((n, width), np.nan)
+    pnl = np.full((n, width), np.nan)
+    be = np.full((n, width), np.nan)
+    delta_risk = np.full((n, width), np.nan)
+    status = np.where(long_side | short_side, SWEEP_OK, SWEEP_NO_TRADE)
+    active = status == SWEEP_OK
+    with np.errstate(divide='ignore', invalid='ignore'):
+        risk[active, 0] = R0[active]
+        delta_risk[active, 0] = 0
+        pnl[active, 0] = pnl0[active]
+        be[active, 0] = 16*pnl0[active]/R0[active]
+
+        R_current = R0.copy()
+        trade_pnl = pnl0.copy()
+        end = np.zeros(n, dtype=np.int64)
+        d = np.diff(lvls, axis=1)
+        for i in range(width):
+            if not active.any():
+                break
+            out_of_levels = active & (i >= lengths - 1)
+            status[out_of_levels] = SWEEP_OUT_OF_LEVELS
+            end[out_of_levels] = i
+            active &= ~out_of_levels
+            if i >= width - 1:
+                break
+
+            next_pnl = trade_pnl + R_current*d[:, i]
+            stopped = active & (next_pnl <= sl)
+            end[stopped] = i
+            active &= ~stopped
+
+            undefined = active & ~defined[:, i+1]
+            status[undefined] = SWEEP_NO_BREAKEVEN
+            end[undefined] = i
+            active &= ~undefined
+
+            trade_pnl = np.where(active, next_pnl, trade_pnl)
+            candidate = trade_pnl/(be_levels[:, i+1] / 16)
+            next_risk = np.where(
+                long_side,
+                np.ceil(np.where(R_current > candidate, R_current, candidate)/1000)*1000,
+                np.floor(np.where(R_current < candidate, R_current, candidate)/1000)*1000,
+            )
+            nan_risk = active & np.isnan(next_risk)
+            status[nan_risk] = SWEEP_NO_BREAKEVEN
+            end[nan_risk] = i
+            active &= ~nan_risk
+
+            risk[active, i+1] = next_risk[active]
+            delta_risk[active, i+1] = next_risk[active] - R_current[active]
+            pnl[active, i+1] = trade_pnl[active]
+            be[active, i+1] = 16*trade_pnl[active]/next_risk[active]
+            R_current = np.where(active, next_risk, R_current)
+
+    traded = status != SWEEP_NO_TRADE
+    extreme_level = np.where(traded, lvls[np.arange(n), end], np.nan)
+    recorded = np.where(traded, end + 1, 0)
+    return {
+        'levels': np.where(np.arange(width)[None, :] < recorded[:, None], lvls, np.nan),
+        'delta_risk': delta_risk,
+        'risk': risk,
+        'pnl': pnl,
+        'be': be,
+        'length': recorded,
+        'extreme_level': extreme_level,
+        'ticks_to_extreme': np.abs(extreme_level - cp) * 16,
+        'status': status,
+    }
+
+
 def get_last_trade_state_event(file_path: str) -> dict:
-    """Get the last row of the trade state events CSV as a dictionary."""
+    """Get the last row of the trade state events CSV as a dictionary (cached until the file changes)."""
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path).tail(1)
-        
-        # Get the last row
-        last_row = df.iloc[-1]
-        
-        # Convert the last row to a dictionary
-        trade_dict = last_row.to_dict()
+        trade_dict = get_latest_row(file_path)
         
         return trade_dict
     except Exception as e:
@@ -185,16 +342,9 @@ def get_last_trade_state_event(file_path: str) -> dict:
 
 
 def get_technical_dict(file_path: str) -> dict:
-    """Get the last row of the technical dict CSV as a dictionary."""
+    """Get the last row of the technical dict CSV as a dictionary (cached until the file changes)."""
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path).tail(1)
-        
-        # Get the last row
-        last_row = df.iloc[-1]
-        
-        # Convert the last row to a dictionary
-        technical_dict = last_row.to_dict()
+        technical_dict = get_latest_row(file_path)
         
         return technical_dict
     except Exception as e:
@@ -203,16 +353,9 @@ def get_technical_dict(file_path: str) -> dict:
 
 
 def get_last_net_position(file_path: str) -> dict:
-    """Get the last row of the net position streaming CSV as a dictionary."""
+    """Get the last row of the net position streaming CSV as a dictionary (cached until the file changes)."""
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path).tail(1)
-        
-        # Get the last row
-        last_row = df.iloc[-1]
-        
-        # Convert the last row to a dictionary
-        net_position_dict = last_row.to_dict()
+        net_position_dict = get_latest_row(file_path)
         
         return net_position_dict
     except Exception as e:
@@ -221,16 +364,9 @@ def get_last_net_position(file_path: str) -> dict:
 
 
 def get_current_price(file_path: str) -> float:
-    """Get the current price from the price streaming CSV."""
+    """Get the current price from the price streaming CSV (last row with a price, cached until the file changes)."""
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path).tail(1)
-        
-        # Get the last row
-        last_row = df.iloc[-1]
-        
-        # Convert the last row to a dictionary
-        last_row_dict = last_row.to_dict()
+        last_row_dict = get_latest_row(file_path, required="price")
         
         current_price = last_row_dict["price"]
 
@@ -0,0 +1,330 @@
+"""
+Monte Carlo survival simulator for the Sumo risk policy.
+
+R_survival gives one deterministic walk down (long) or up (short) the
+technical levels. This module estimates how likely the policy is to get back
+to breakeven before the stop loss, by running it along many price paths
+bootstrapped from the historical ZN hourly closes.
+
+- Paths: moving-block bootstrap of hourly log returns (blocks keep intraday
+  volatility clustering), started at the current price.
+- Policy: the R_survival sizing schedule. Position only changes the first
+  time a level is crossed, so the risk held at any price is fixed by the
+  deepest level reached so far, and the schedule is computed once
+  (R_survival_batch with the stop loss) and applied to every path with
+  array ops. The schedule ends at the last level R_survival adds at before
+  its stop; a close that gaps through the stop keeps that size.
+- Exit: stopped when the mark-to-market PnL at a close is at or below the
+  stop loss, survived when it is at or above take_profit (breakeven by
+  default), otherwise still open at the horizon.
+
+Paths are simulated in chunks on a process pool. Each chunk gets its own
+child of one SeedSequence, so results only depend on the seed and the chunk
+size, not on the number of workers.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Add the workspace root to Python path
+workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, workspace_root)
+
+from config import ZN_INTRADAY_1H_CSV, TECHNICAL_DICT_CSV
+from Optimizer.risk_utils import zn_to_decimal, TECH_LEVELS_DEC
+from Optimizer.Sumo_Curve.breakeven_curve import breakeven
+from Optimizer.Sumo_Curve.risk_update import R_survival_batch
+from Optimizer.Sumo_Curve.risk_surface import STOP_LOSS
+
+logger = logging.getLogger('survival_monte_carlo')
+
+# Path outcomes
+OUTCOME_STOPPED = 0
+OUTCOME_SURVIVED = 1
+OUTCOME_OPEN = 2
+
+
+def load_hourly_log_returns(csv_path=ZN_INTRADAY_1H_CSV, column='Close'):
+    """
+    Load close-to-close log returns from the ZN hourly data.
+
+    Args:
+        csv_path (str): Intraday_data_ZN_1h_*.csv file
+        column (str): Price column
+
+    Returns:
+        np.ndarray: float64 log returns in file order
+    """
+    closes = pd.read_csv(csv_path, usecols=[column])[column].to_numpy(dtype=float)
+    closes = closes[np.isfinite(closes) & (closes > 0)]
+    return np.diff(np.log(closes))
+
+
+def policy_schedule(current_price, R0, technical_dict, starting_price=None, *, stop_loss=STOP_LOSS,
+                    pnl_0=0.0, breakeven_curve=breakeven, tech_levels_dec=TECH_LEVELS_DEC):
+    """
+    Sizing schedule of the R_survival policy, walked through the levels up to its stop.
+
+    Args:
+        current_price (float): Decimal price the paths start from
+        R0 (float): Current risk (decimal, 1 lot = 1000); the sign gives the side
+        technical_dict (dict): Technical dict (not modified)
+        starting_price (float): Trade starting price (defaults to current_price)
+        stop_loss (float): Stop loss; the walk ends at the last level before it
+        pnl_0 (float): PnL at the current price
+        breakeven_curve: Breakeven function passed to R_survival_batch
+        tech_levels_dec: Technical levels
+
+    Returns:
+        dict: 'levels', 'risk', 'pnl' arrays (index 0 is the current price), 'side' (+1/-1)
+              and 'stop_loss'. Past the last entry (stop loss next, no more levels, or
+              breakeven undefined) the risk is held.
+    """
+    if R0 == 0:
+        raise ValueError("R0 is 0: no position to simulate")
+    sweep = R_survival_batch(breakeven_curve, current_price, R0, technical_dict, starting_price,
+                             tech_levels_dec=tech_levels_dec, stop_loss=stop_loss, pnl_0=pnl_0)
+    length = int(sweep['length'][0])
+    return {
+        'levels': sweep['levels'][0, :length],
+        'risk': sweep['risk'][0, :length],
+        'pnl': sweep['pnl'][0, :length],
+        'side': 1 if R0 > 0 else -1,
+        'stop_loss': float(stop_loss),
+    }
+
+
+def block_bootstrap_paths(returns, current_price, n_paths, horizon, block_length, rng):
+    """
+    Price paths from a moving-block bootstrap of log returns.
+
+    Returns:
+        np.ndarray: (n_paths, horizon + 1) prices, column 0 is current_price
+    """
+    block_length = max(1, min(block_length, len(returns)))
+    n_blocks = -(-horizon // block_length)
+    starts = rng.integers(0, len(returns) - block_length + 1, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_length)).reshape(n_paths, -1)[:, :horizon]
+    log_paths = np.cumsum(returns[idx], axis=1)
+    prices = np.empty((n_paths, horizon + 1))
+    prices[:, 0] = current_price
+    prices[:, 1:] = current_price * np.exp(log_paths)
+    return prices
+
+
+def apply_policy(prices, schedule, stop_loss=STOP_LOSS, take_profit=0.0):
+    """
+    Run the sizing schedule along price paths.
+
+    Args:
+        prices (np.ndarray): (n, T + 1) price paths starting at the schedule's first level
+        schedule (dict): From policy_schedule
+        stop_loss (float): Exit when PnL <= stop_loss
+        take_profit (float): Exit (survived) when PnL >= take_profit after the start
+
+    Returns:
+        dict: Per-path 'outcome' (OUTCOME_*), 'pnl' at exit, 'max_drawdown' (>= 0),
+              'bars' to exit and 'max_lots' held
+    """
+    side = schedule['side']
+    levels, risk, level_pnl = schedule['levels'], schedule['risk'], schedule['pnl']
+    n, width = prices.shape
+
+    # Deepest adverse price so far, in the side's frame where adverse is down
+    adverse_extreme = np.minimum.accumulate(side * prices, axis=1)
+    # Levels 1.. are strictly adverse and monotone in that frame; count those reached.
+    # The schedule ends at the last level before the stop loss, so reached is at most
+    # that level and a close gapping through the stop keeps its size
+    crossed_frame = (side * levels[1:])[::-1]
+    reached = len(crossed_frame) - np.searchsorted(crossed_frame, adverse_extreme, side='left')
+    pnl = level_pnl[reached] + risk[reached] * (prices - levels[reached])
+
+    stop_hit = pnl <= stop_loss
+    target_hit = pnl >= take_profit
+    target_hit[:, 0] = False
+    first_stop = np.where(stop_hit.any(axis=1), stop_hit.argmax(axis=1), width)
+    first_target = np.where(target_hit.any(axis=1), target_hit.argmax(axis=1), width)
+    exit_bar = np.minimum(np.minimum(first_stop, first_target), width - 1)
+    outcome = np.where(first_stop <= first_target,
+                       np.where(first_stop < width, OUTCOME_STOPPED, OUTCOME_OPEN),
+                       OUTCOME_SURVIVED)
+
+    live = np.arange(width)[None, :] <= exit_bar[:, None]
+    drawdown = np.maximum.accumulate(pnl, axis=1) - pnl
+    rows = np.arange(n)
+    return {
+        'outcome': outcome.astype(np.int8),
+        'pnl': pnl[rows, exit_bar],
+        'max_drawdown': np.where(live, drawdown, 0.0).max(axis=1),
+        'bars': exit_bar,
+        'max_lots': np.abs(np.where(live, risk[reached], 0.0)).max(axis=1) / 1000,
+    }
+
+
+def _simulate_chunk(returns, schedule, n_paths, horizon, block_length, stop_loss, take_profit, seed_seq):
+    """Process-pool task: bootstrap one chunk of paths and apply the policy."""
+    rng = np.random.default_rng(seed_seq)
+    prices = block_bootstrap_paths(returns, schedule['levels'][0], n_paths, horizon, block_length, rng)
+    return apply_policy(prices, schedule, stop_loss, take_profit)
+
+
+def run_monte_carlo(current_price, R0, technical_dict, starting_price=None, *,
+                    n_paths=100_000, horizon=120, block_length=24,
+                    stop_loss=STOP_LOSS, take_profit=0.0, pnl_0=0.0,
+                    seed=0, workers=None, chunk_size=10_000, returns=None):
+    """
+    Simulate the R_survival policy along bootstrapped price paths.
+
+    Args:
+        current_price (float): Decimal price the paths start from
+        R0 (float): Current risk (decimal, 1 lot = 1000); the sign gives the side
+        technical_dict (dict): Technical dict (not modified)
+        starting_price (float): Trade starting price (defaults to current_price)
+        n_paths (int): Number of paths
+        horizon (int): Path length in hours
+        block_length (int): Bootstrap block length in hours
+        stop_loss (float): Stop loss in dollars
+        take_profit (float): PnL counted as survival (0 = back to breakeven)
+        pnl_0 (float): PnL at the current price
+        seed (int): Seed of the SeedSequence the chunk seeds are spawned from
+        workers (int): Worker processes (None = CPU count, 1 = run in this process)
+        chunk_size (int): Paths per task
+        returns (np.ndarray): Log returns to bootstrap (default: load_hourly_log_returns())
+
+    Returns:
+        dict: Per-path arrays (see apply_policy) plus 'schedule' and 'summary' (see summarize)
+    """
+    if returns is None:
+        returns = load_hourly_log_returns()
+    schedule = policy_schedule(current_price, R0, technical_dict, starting_price, stop_loss=stop_loss, pnl_0=pnl_0)
+
+    chunk_sizes = [min(chunk_size, n_paths - start) for start in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    tasks = [(returns, schedule, size, horizon, block_length, stop_loss, take_profit, seed_seq)
+             for size, seed_seq in zip(chunk_sizes, seeds)]
+
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        chunks = [_simulate_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            chunks = list(pool.map(_simulate_chunk, *zip(*tasks)))
+    results = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+    logger.info(f"Simulated {n_paths} paths x {horizon} h in {time.perf_counter() - start:.2f} s "
+                f"({min(workers, len(tasks))} workers)")
+
+    results['schedule'] = schedule
+    results['summary'] = summarize(results)
+    return results
+
+
+def summarize(results, quantiles=(0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)):
+    """
+    Outcome probabilities (with standard errors) and PnL / drawdown distributions.
+
+    Returns:
+        dict: 'paths', 'survival_probability', 'stop_probability', 'open_probability',
+              '*_stderr', 'pnl_mean', 'pnl_quantiles', 'max_drawdown_quantiles',
+              'mean_bars_to_exit', 'max_lots_quantiles'
+    """
+    outcome = results['outcome']
+    n = len(outcome)
+    summary = {'paths': n}
+    for name, code in (('survival', OUTCOME_SURVIVED), ('stop', OUTCOME_STOPPED), ('open', OUTCOME_OPEN)):
+        p = float(np.mean(outcome == code))
+        summary[f'{name}_probability'] = p
+        summary[f'{name}_stderr'] = float(np.sqrt(p * (1 - p) / n))
+    summary['pnl_mean'] = float(results['pnl'].mean())
+    summary['pnl_quantiles'] = dict(zip(quantiles, np.quantile(results['pnl'], quantiles).tolist()))
+    summary['max_drawdown_quantiles'] = dict(zip(quantiles, np.quantile(results['max_drawdown'], quantiles).tolist()))
+    summary['mean_bars_to_exit'] = float(results['bars'].mean())
+    summary['max_lots_quantiles'] = dict(zip(quantiles, np.quantile(results['max_lots'], quantiles).tolist()))
+    return summary
+
+
+def print_summary(summary):
+    """Print a summary from summarize()."""
+    print(f"Paths: {summary['paths']}")
+    for name in ('survival', 'stop', 'open'):
+        print(f"  {name:>8}: {summary[f'{name}_probability']:.2%} (+/- {summary[f'{name}_stderr']:.2%})")
+    print(f"PnL mean: {summary['pnl_mean']:.2f}")
+    for label, key in (('PnL', 'pnl_quantiles'), ('Max drawdown', 'max_drawdown_quantiles'), ('Max lots', 'max_lots_quantiles')):
+        print(f"{label} quantiles: " + ", ".join(f"{q:.0%}: {v:.1f}" for q, v in summary[key].items()))
+    print(f"Mean hours to exit: {summary['mean_bars_to_exit']:.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Monte Carlo survival of the Sumo risk policy')
+    parser.add_argument('--price', default=None, help="Current price, ZN format (default: Size Up Long/Short Price)")
+    parser.add_argument('--lots', type=float, default=1, help='Current position in lots (negative = short)')
+    parser.add_argument('--starting-price', default=None, help='Trade starting price, ZN format (default: --price)')
+    parser.add_argument('--paths', type=int, default=100_000)
+    parser.add_argument('--horizon', type=int, default=120, help='Hours per path')
+    parser.add_argument('--block', type=int, default=24, help='Bootstrap block length in hours')
+    parser.add_argument('--stop-loss', type=float, default=STOP_LOSS)
+    parser.add_argument('--take-profit', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    technical_dict = pd.read_csv(TECHNICAL_DICT_CSV).iloc[-1].to_dict()
+    technical_dict = {k: v.strip() if isinstance(v, str) else v for k, v in technical_dict.items()}
+    side_field = "Size Up Long Price" if args.lots > 0 else "Size Up Short Price"
+    if args.price:
+        current_price = zn_to_decimal(args.price)
+    elif not pd.isna(technical_dict[side_field]):
+        current_price = zn_to_decimal(technical_dict[side_field])
+    else:
+        # Midway between support and resistance, on the 1/64 grid
+        midpoint = (zn_to_decimal(technical_dict["Strong Support"]) + zn_to_decimal(technical_dict["Strong Resistance"])) / 2
+        current_price = round(midpoint * 64) / 64
+    # Missing size up prices default to the current price, as in risk_stream.risk()
+    for field in ("Size Up Long Price", "Size Up Short Price"):
+        if pd.isna(technical_dict[field]):
+            technical_dict[field] = current_price
+    starting_price = zn_to_decimal(args.starting_price) if args.starting_price else current_price
+    R0 = args.lots * 1000
+    print(f"Technical dict: {technical_dict}")
+    print(f"Current price {current_price}, starting price {starting_price}, {args.lots} lots")
+
+    # The schedule must reproduce R_survival's walk (up to its stop) on a straight adverse path
+    schedule = policy_schedule(current_price, R0, technical_dict, starting_price, stop_loss=args.stop_loss)
+    sweep = R_survival_batch(breakeven, current_price, R0, technical_dict, starting_price, stop_loss=args.stop_loss)
+    walked = int(sweep['length'][0])
+    straight = apply_policy(schedule['levels'][None, :], schedule, stop_loss=-np.inf, take_profit=np.inf)
+    parity = (len(schedule['levels']) == walked and
+              np.array_equal(schedule['risk'], sweep['risk'][0, :walked]) and
+              np.array_equal(schedule['pnl'], sweep['pnl'][0, :walked]) and
+              straight['pnl'][0] == sweep['pnl'][0, walked - 1])
+    print(f"Schedule parity with R_survival ({walked} levels): {'PASSED' if parity else 'FAILED'}")
+    max_policy_lots = np.abs(schedule['risk']).max() / 1000
+
+    returns = load_hourly_log_returns()
+    kwargs = dict(n_paths=args.paths, horizon=args.horizon, block_length=args.block, stop_loss=args.stop_loss,
+                  take_profit=args.take_profit, seed=args.seed, returns=returns)
+    start = time.perf_counter()
+    results = run_monte_carlo(current_price, R0, technical_dict, starting_price, workers=args.workers, **kwargs)
+    parallel_s = time.perf_counter() - start
+    print(f"{args.paths} paths in {parallel_s:.2f} s")
+    print_summary(results['summary'])
+
+    # No path may hold more than R_survival does before its stop
+    capped = results['max_lots'].max() <= max_policy_lots
+    print(f"Max lots within R_survival's {max_policy_lots:g} before the stop: {'PASSED' if capped else 'FAILED'} "
+          f"(max {results['max_lots'].max():g})")
+
+    # Same seed, one process: identical paths
+    check = run_monte_carlo(current_price, R0, technical_dict, starting_price, workers=1,
+                            **dict(kwargs, n_paths=min(args.paths, 20_000)))
+    n_check = len(check['pnl'])
+    reproducible = all(np.array_equal(results[key][:n_check], check[key]) for key in ('outcome', 'pnl', 'max_drawdown'))
+    print(f"Reproducible across worker counts: {'PASSED' if reproducible else 'FAILED'}")
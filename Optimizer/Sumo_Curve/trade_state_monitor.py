@@ -62,6 +62,41 @@ def detect_trade_events(previous_net_pos: float, current_net_pos: float) -> list
     return events
 
 
+def trade_events_for_rows(new_rows: pd.DataFrame, previous_net_position: Optional[float]) -> Tuple[list, Optional[float]]:
+    """
+    Trade state events for new net position rows.
+
+    The first row is skipped when there is no previous net position.
+
+    Returns:
+        tuple: (list of event dicts, net position after the last row)
+    """
+    trade_events = []
+    
+    for idx, row in new_rows.iterrows():
+        current_net_pos = row['NetPosition']
+        
+        # Skip first row if we don't have previous position
+        if previous_net_position is not None:
+            events = detect_trade_events(previous_net_position, current_net_pos)
+            
+            for trade_state, description in events:
+                trade_events.append({
+                    'Timestamp': row['TimeStamp'],
+                    'Date': row['Date'],
+                    'Time': row['Time'],
+                    'Price': row['Price'],
+                    'TradeState': trade_state,
+                    'NetPosition': current_net_pos,
+                    'PreviousNetPosition': previous_net_position,
+                    'Description': description
+                })
+        
+        previous_net_position = current_net_pos
+    
+    return trade_events, previous_net_position
+
+
 def stream_trade_state_monitor(
     input_file: str = NET_POSITION_STREAMING_CSV,
     output_file: str = TRADE_STATE_EVENTS_CSV,
@@ -121,28 +156,7 @@ def stream_trade_state_monitor(
                 new_rows = df.iloc[last_processed_row:].copy()
                 
                 if not new_rows.empty:
-                    trade_events = []
-                    
-                    for idx, row in new_rows.iterrows():
-                        current_net_pos = row['NetPosition']
-                        
-                        # Skip first row if we don't have previous position
-                        if previous_net_position is not None:
-                            events = detect_trade_events(previous_net_position, current_net_pos)
-                            
-                            for trade_state, description in events:
-                                trade_events.append({
-                                    'Timestamp': row['TimeStamp'],
-                                    'Date': row['Date'],
-                                    'Time': row['Time'],
-                                    'Price': row['Price'],
-                                    'TradeState': trade_state,
-                                    'NetPosition': current_net_pos,
-                                    'PreviousNetPosition': previous_net_position,
-                                    'Description': description
-                                })
-                        
-                        previous_net_position = current_net_pos
+                    trade_events, previous_net_position = trade_events_for_rows(new_rows, previous_net_position)
                     
                     # Write trade events to output CSV
                     if trade_events:
@@ -228,28 +242,7 @@ def run_trade_state_once(
                 previous_net_position = existing_df['NetPosition'].iloc[-1]
         
         if not new_rows.empty:
-            trade_events = []
-            
-            for idx, row in new_rows.iterrows():
-                current_net_pos = row['NetPosition']
-                
-                # Skip first row if we don't have previous position
-                if previous_net_position is not None:
-                    events = detect_trade_events(previous_net_position, current_net_pos)
-                    
-                    for trade_state, description in events:
-                        trade_events.append({
-                            'Timestamp': row['TimeStamp'],
-                            'Date': row['Date'],
-                            'Time': row['Time'],
-                            'Price': row['Price'],
-                            'TradeState': trade_state,
-                            'NetPosition': current_net_pos,
-                            'PreviousNetPosition': previous_net_position,
-                            'Description': description
-                        })
-                
-                previous_net_position = current_net_pos
+            trade_events, previous_net_position = trade_events_for_rows(new_rows, previous_net_position)
             
             # Write trade events to output CSV
             if trade_events:
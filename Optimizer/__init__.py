@@ -4,12 +4,22 @@ from .risk_utils import (
     zn_to_decimal,
     decimal_to_zn,
     levels_crossed,
+    LevelIndex,
+    get_level_index,
+    current_levels,
+    current_level_index,
     TECH_LEVELS_DEC,
+    TECH_LEVEL_INDEX,
 )
 
 __all__ = [
     "zn_to_decimal",
     "decimal_to_zn", 
     "levels_crossed",
+    "LevelIndex",
+    "get_level_index",
+    "current_levels",
+    "current_level_index",
     "TECH_LEVELS_DEC",
-] 
\ No newline at end of file
+    "TECH_LEVEL_INDEX",
+] 
@@ -10,6 +10,7 @@ LADDER_DIR = os.path.join(OUTPUT_DIR, "ladder")
 # Input files
 CONTINUOUS_FILLS_CSV = os.path.join(LADDER_DIR, "continuous_fills.csv")
 LIVE_ZN_PRICES_CSV = os.path.join(WORKSPACE_ROOT, "NAM_NBM_Final_Code", "Live_ZN_Prices.csv")
+ZN_INTRADAY_1H_CSV = os.path.join(WORKSPACE_ROOT, "NAM_NBM_Final_Code", "Intraday_data_ZN_1h_2022-12-20_to_2025-06-11.csv")
 
 # Output files
 LIFO_STREAMING_CSV = os.path.join(OUTPUT_DIR, "lifo_streaming.csv")
@@ -19,6 +20,8 @@ RISK_STREAMING_PKL = os.path.join(OUTPUT_DIR, "risk_streaming.pkl")
 TRADE_STATE_EVENTS_CSV = os.path.join(OUTPUT_DIR, "trade_state_events.csv")
 TRADE_STATE_MONITOR_STATE_PKL = os.path.join(OUTPUT_DIR, "trade_state_monitor_state.pkl")
 TECHNICAL_DICT_CSV = os.path.join(OUTPUT_DIR, "technical_dict.csv")
+PARAM_OPTIMIZER_CACHE_PKL = os.path.join(OUTPUT_DIR, "param_optimizer_cache.pkl")
+PARAM_OPTIMIZER_REPORT_CSV = os.path.join(OUTPUT_DIR, "param_optimizer_report.csv")
 LIVE_PRICE_PATH = "Z:/Archive/Live_TT_ZN_Prices.csv"
 
 
@@ -0,0 +1,163 @@
+"""
+Latest-row reader for append-only CSV files.
+
+The live monitors append one row per event to their CSVs (trade state
+events, net position, prices) and the risk stream only ever needs the last
+row. read_last_row reads the header line and then walks backward from the
+end of the file in small blocks until it finds the last usable row, so the
+cost does not grow with the file. LatestRowCache keeps the parsed row per
+file and only re-reads it when the file's (mtime, size, inode) stamp moves,
+so an unchanged file costs one os.stat.
+
+Values are converted the way pd.read_csv does for a single row: integers,
+floats, booleans, NaN for empty/NA markers, and strings kept as written.
+Types are inferred from the row itself, so a whole number in a column that
+pandas would read as float64 (because another row is empty) comes back as
+an int of equal value. Quoted fields spanning several lines are not
+supported.
+"""
+
+import csv
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+_BLOCK_SIZE = 4096
+
+# pandas' default NA markers
+_NA_VALUES = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+_BOOL_VALUES = {"True": True, "TRUE": True, "true": True, "False": False, "FALSE": False, "false": False}
+
+
+def parse_value(text: str):
+    """Convert one CSV field like pandas' type inference (int, float, bool, NaN or str)."""
+    if text in _NA_VALUES:
+        return float('nan')
+    if '_' in text:  # Python accepts "1_000" as a number, pandas does not
+        return _BOOL_VALUES.get(text, text)
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    return _BOOL_VALUES.get(text, text)
+
+
+def _parse_line(line: str) -> list:
+    return next(csv.reader([line]))
+
+
+def _read_header(f) -> list:
+    f.seek(0)
+    header = f.readline().decode('utf-8-sig').rstrip('\r\n')
+    if not header:
+        raise ValueError("empty file")
+    return _parse_line(header)
+
+
+def _lines_backward(f, end: int, data_start: int):
+    """Yield the file's lines between data_start and end, last line first (bytes, no newline)."""
+    position = end
+    remainder = b''
+    while position > data_start:
+        size = min(_BLOCK_SIZE, position - data_start)
+        position -= size
+        f.seek(position)
+        chunk = f.read(size) + remainder
+        lines = chunk.split(b'\n')
+        # The first piece may be cut mid-line; keep it for the next block
+        remainder = lines[0]
+        for line in reversed(lines[1:]):
+            yield line.rstrip(b'\r')
+    if remainder:
+        yield remainder.rstrip(b'\r')
+
+
+def read_last_row(file_path: str, required: Optional[str] = None) -> Dict:
+    """
+    Read the last data row of a CSV file as a dictionary, reading backward from the end.
+
+    Args:
+        file_path (str): CSV file with a header line
+        required (str): Skip trailing rows where this column is empty/NA
+                        (like dropna(subset=[required]) before taking the last row)
+
+    Returns:
+        dict: Column -> value of the last row
+
+    Raises:
+        OSError: If the file can't be read
+        ValueError: If the file has no (matching) data rows or lacks the required column
+    """
+    with open(file_path, 'rb') as f:
+        header = _read_header(f)
+        data_start = f.tell()
+        if required is not None and required not in header:
+            raise ValueError(f"{file_path} has no '{required}' column")
+        end = f.seek(0, os.SEEK_END)
+
+        for raw in _lines_backward(f, end, data_start):
+            if not raw.strip():
+                continue
+            fields = _parse_line(raw.decode('utf-8'))
+            # Short rows are padded with NaN, extra fields dropped, like pandas
+            fields += [''] * (len(header) - len(fields))
+            row = {column: parse_value(text) for column, text in zip(header, fields)}
+            if required is not None and fields[header.index(required)] in _NA_VALUES:
+                continue
+            return row
+    raise ValueError(f"{file_path} has no data rows")
+
+
+class LatestRowCache:
+    """Last rows of CSV files, re-read only when a file's (mtime, size, inode) stamp changes."""
+
+    def __init__(self) -> None:
+        self._rows: Dict[Tuple[str, Optional[str]], Tuple[tuple, Dict]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path: str, required: Optional[str] = None) -> Dict:
+        """
+        Return a copy of the last row of file_path (see read_last_row).
+
+        Callers may modify the returned dict; the cached row is not affected.
+        """
+        stat = os.stat(file_path)
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        key = (file_path, required)
+        cached = self._rows.get(key)
+        if cached is not None and cached[0] == stamp:
+            self.hits += 1
+            return dict(cached[1])
+
+        row = read_last_row(file_path, required)
+        with self._lock:
+            self._rows[key] = (stamp, row)
+            self.misses += 1
+        return dict(row)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {'files': len(self._rows), 'hits': self.hits, 'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0}
+
+
+# Process-wide cache used by the get_last_* helpers
+LATEST_ROWS = LatestRowCache()
+
+
+def get_latest_row(file_path: str, required: Optional[str] = None) -> Dict:
+    """Last row of a CSV file as a dictionary, cached until the file changes."""
+    return LATEST_ROWS.get(file_path, required)
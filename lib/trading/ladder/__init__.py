@@ -6,10 +6,57 @@ from .csv_to_sqlite import (
     get_table_schema,
     query_sqlite_table
 )
+from .ladder_builder import (
+    TICKS_PER_POINT,
+    PRICE_INCREMENT_DECIMAL,
+    price_to_tick,
+    tick_to_price,
+    bucket_orders_by_tick,
+    ladder_tick_range,
+    build_ladder_rows
+)
+from .working_orders_poller import (
+    WorkingOrdersPoller,
+    normalize_working_orders,
+    group_orders_by_price,
+    diff_orders
+)
+from .actant_fills import (
+    parse_tt_special_prices,
+    zn_future_fills_from_frame,
+    calculate_baseline_vectorized
+)
+from .actant_sod_store import ActantSODStore, file_sha256
+from .spot_price_provider import (
+    SpotPriceProvider,
+    LivePriceFileProvider,
+    InMemorySpotPriceProvider,
+    CallableSpotPriceProvider
+)
 
 __all__ = [
     'decimal_to_tt_bond_format',
     'csv_to_sqlite_table',
     'get_table_schema', 
-    'query_sqlite_table'
+    'query_sqlite_table',
+    'TICKS_PER_POINT',
+    'PRICE_INCREMENT_DECIMAL',
+    'price_to_tick',
+    'tick_to_price',
+    'bucket_orders_by_tick',
+    'ladder_tick_range',
+    'build_ladder_rows',
+    'WorkingOrdersPoller',
+    'normalize_working_orders',
+    'group_orders_by_price',
+    'diff_orders',
+    'SpotPriceProvider',
+    'LivePriceFileProvider',
+    'InMemorySpotPriceProvider',
+    'CallableSpotPriceProvider',
+    'parse_tt_special_prices',
+    'zn_future_fills_from_frame',
+    'calculate_baseline_vectorized',
+    'ActantSODStore',
+    'file_sha256'
 ] 
\ No newline at end of file
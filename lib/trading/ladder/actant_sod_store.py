@@ -0,0 +1,212 @@
+"""
+Incremental loader for the Actant SOD (start of day) CSV.
+
+The scenario ladder used to reload the whole SOD CSV into SQLite with
+if_exists='replace' on every refresh and read it back through a fresh
+connection. ActantSODStore keeps one connection open and:
+
+- skips the CSV entirely when its mtime/size are unchanged, and skips the
+  load when only the mtime moved but the content hash is the same;
+- otherwise upserts only the rows whose content changed into a table
+  indexed by (ASSET, PRODUCT_CODE), deleting rows that disappeared;
+- caches ZN future fills as NumPy arrays, rebuilt only when the table changed.
+
+data_version is bumped on every real change so callers can cache anything
+derived from the fills (e.g. the baseline at spot) on it.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .actant_fills import zn_future_fills_from_frame
+
+logger = logging.getLogger('actant_sod_store')
+
+# Bookkeeping table holding the last loaded state of each source file
+_FILE_STATE_TABLE = "sod_file_state"
+
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ActantSODStore:
+    """
+    SQLite-backed, incrementally updated store of Actant SOD rows.
+
+    Rows are keyed by their position in the CSV (row_id) and carry a content
+    hash, so a reload only writes rows that actually changed.
+    """
+
+    def __init__(self, db_filepath, table_name):
+        """
+        Initialize the store.
+
+        Args:
+            db_filepath (str): Path to the SQLite database file
+            table_name (str): Table holding the SOD rows
+        """
+        self.db_filepath = db_filepath
+        self.table_name = table_name
+        self.data_version = 0
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._columns = None
+        self._stat_cache = {}  # csv path -> (mtime_ns, size) last seen
+        self._zn_fills = None
+        self._zn_fills_version = None
+
+    def _connection(self):
+        """Open the shared connection on first use and make sure the bookkeeping table exists."""
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_filepath)
+            if db_dir and not os.path.exists(db_dir):
+                os.makedirs(db_dir)
+            # Dash serves callbacks from worker threads; access is serialized by self._lock
+            self._conn = sqlite3.connect(self.db_filepath, check_same_thread=False)
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{_FILE_STATE_TABLE}" '
+                f'(path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, sha256 TEXT)'
+            )
+        return self._conn
+
+    def _ensure_table(self, columns):
+        """Create the keyed table, recreating it if it predates row_id or the CSV header changed."""
+        conn = self._connection()
+        existing = [row[1] for row in conn.execute(f'PRAGMA table_info("{self.table_name}")')]
+        wanted = ['row_id', 'row_hash'] + list(columns)
+        if existing == wanted:
+            self._columns = list(columns)
+            return
+        if existing:
+            logger.info(f"Recreating {self.table_name}: schema does not match the SOD header")
+            conn.execute(f'DROP TABLE "{self.table_name}"')
+            conn.execute(f'DELETE FROM "{_FILE_STATE_TABLE}"')
+        column_defs = ", ".join(f'"{col}"' for col in columns)
+        conn.execute(
+            f'CREATE TABLE "{self.table_name}" '
+            f'(row_id INTEGER PRIMARY KEY, row_hash INTEGER, {column_defs})'
+        )
+        conn.execute(
+            f'CREATE INDEX IF NOT EXISTS "idx_{self.table_name}_asset_product" '
+            f'ON "{self.table_name}" ("ASSET", "PRODUCT_CODE")'
+        )
+        self._columns = list(columns)
+
+    def sync(self, csv_filepath):
+        """
+        Bring the table up to date with the SOD CSV.
+
+        Args:
+            csv_filepath (str): Path to the Actant SOD CSV
+
+        Returns:
+            bool: True if any row was inserted, updated or deleted
+        """
+        with self._lock:
+            stat = os.stat(csv_filepath)
+            file_key = (stat.st_mtime_ns, stat.st_size)
+            if self._stat_cache.get(csv_filepath) == file_key:
+                return False
+
+            conn = self._connection()
+            sha256 = file_sha256(csv_filepath)
+            stored = conn.execute(
+                f'SELECT sha256 FROM "{_FILE_STATE_TABLE}" WHERE path = ?', (csv_filepath,)
+            ).fetchone()
+            if stored and stored[0] == sha256 and self._table_exists():
+                logger.info(f"SOD file {csv_filepath} unchanged since last load, skipping")
+                self._record_file_state(csv_filepath, file_key, sha256)
+                return False
+
+            df = pd.read_csv(csv_filepath)
+            changed = self._upsert_rows(df)
+            self._record_file_state(csv_filepath, file_key, sha256)
+            if changed:
+                self.data_version += 1
+            return changed
+
+    def _table_exists(self):
+        return self._connection().execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (self.table_name,)
+        ).fetchone() is not None
+
+    def _record_file_state(self, csv_filepath, file_key, sha256):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                f'INSERT OR REPLACE INTO "{_FILE_STATE_TABLE}" (path, mtime_ns, size, sha256) VALUES (?, ?, ?, ?)',
+                (csv_filepath, file_key[0], file_key[1], sha256)
+            )
+        self._stat_cache[csv_filepath] = file_key
+
+    def _upsert_rows(self, df):
+        """Write only new/changed rows of df and drop rows past its end. Returns True if anything changed."""
+        self._ensure_table(df.columns)
+        conn = self._connection()
+
+        # Stable per-row content hash (uint64 -> int64 so SQLite can store it)
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy().astype(np.int64)
+        existing = dict(conn.execute(f'SELECT row_id, row_hash FROM "{self.table_name}"').fetchall())
+
+        changed_ids = [i for i, h in enumerate(row_hashes.tolist()) if existing.get(i) != h]
+        stale_ids = [row_id for row_id in existing if row_id >= len(df)]
+        if not changed_ids and not stale_ids:
+            logger.info(f"SOD content unchanged ({len(df)} rows)")
+            return False
+
+        # Object dtype so SQLite receives plain Python values, NaN -> NULL
+        values = df.astype(object).where(df.notna(), None).to_numpy()
+        placeholders = ", ".join("?" for _ in range(len(df.columns) + 2))
+        with conn:
+            conn.executemany(
+                f'INSERT OR REPLACE INTO "{self.table_name}" VALUES ({placeholders})',
+                ((i, int(row_hashes[i]), *values[i]) for i in changed_ids)
+            )
+            if stale_ids:
+                conn.execute(f'DELETE FROM "{self.table_name}" WHERE row_id >= ?', (len(df),))
+        logger.info(f"SOD upsert: {len(changed_ids)} rows written, {len(stale_ids)} removed ({len(df)} total)")
+        return True
+
+    def zn_future_fills(self):
+        """
+        Return the ZN future fills as cached NumPy arrays.
+
+        Prices are parsed column-wise (see zn_future_fills_from_frame) only
+        when the table changed since the last call.
+
+        Returns:
+            dict: {'price': float64 array, 'qty': int64 array}, in file order
+        """
+        with self._lock:
+            if self._zn_fills is not None and self._zn_fills_version == self.data_version:
+                return self._zn_fills
+
+            df = pd.read_sql_query(
+                f'SELECT PRICE_TODAY, QUANTITY, LONG_SHORT FROM "{self.table_name}" '
+                f"WHERE ASSET = 'ZN' AND PRODUCT_CODE = 'FUTURE' ORDER BY row_id",
+                self._connection()
+            )
+            self._zn_fills = zn_future_fills_from_frame(df)
+            self._zn_fills_version = self.data_version
+            logger.info(f"Cached {len(self._zn_fills['price'])} ZN future fills (SOD data v{self.data_version})")
+            return self._zn_fills
+
+    def close(self):
+        """Close the shared connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,3 +1,6 @@
+from ..price_ticks import TICKS_PER_POINT, _TT_SUFFIXES
+
+
 # Modified version without monitoring decorator
 def decimal_to_tt_bond_format(decimal_price):
     """
@@ -28,6 +31,10 @@ def decimal_to_tt_bond_format(decimal_price):
     # E.g., if price is 110.046875 (110 and 3/64), num_sixty_fourths = 3
     num_sixty_fourths = round(fractional_value * 64.0)
 
+    # On-grid fractions come straight from the shared 1/64 suffix table
+    if 0 <= num_sixty_fourths < TICKS_PER_POINT:
+        return f"{whole_part}'{_TT_SUFFIXES[num_sixty_fourths]}"
+
     # Number of full 32nds
     # E.g., 1/64 -> 0 full 32nds. 2/64 -> 1 full 32nd. 3/64 -> 1 full 32nd.
     num_full_32nds = int(num_sixty_fourths // 2)
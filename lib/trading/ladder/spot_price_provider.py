@@ -0,0 +1,108 @@
+"""
+Spot price providers for the scenario ladder.
+
+The ladder asks a provider for the current ZN spot price instead of knowing
+where it comes from. Providers return (decimal_price, special_string_price)
+and raise on failure:
+
+- LivePriceFileProvider reads the last price from the live TT price feed CSV
+  (the same LIVE_PRICE_PATH file the risk stream uses) through
+  csv_tail.get_latest_row, which only reads the tail of the file and skips
+  the read entirely if the file did not change.
+- InMemorySpotPriceProvider holds a price pushed in by another component of
+  the same process (or a fixed mock price).
+- CallableSpotPriceProvider wraps any slow fetch function, e.g. the Pricing
+  Monkey browser automation, which can then be used as an optional backend.
+"""
+
+import logging
+import threading
+
+from .price_formatter import decimal_to_tt_bond_format
+from ..csv_tail import get_latest_row
+
+logger = logging.getLogger('spot_price_provider')
+
+
+class SpotPriceProvider:
+    """Base class for spot price providers."""
+
+    # Cheap providers can be polled on the ladder's auto-refresh interval;
+    # slow ones (browser automation) only run when the user asks for a refresh.
+    supports_polling = True
+
+    def get_spot_price(self):
+        """
+        Return the current spot price.
+
+        Returns:
+            tuple: (decimal_price, special_string_price)
+
+        Raises:
+            Exception: If no price is available
+        """
+        raise NotImplementedError
+
+
+class LivePriceFileProvider(SpotPriceProvider):
+    """Reads spot from the last row of the live price feed CSV, cached until the file changes."""
+
+    def __init__(self, file_path, column='price'):
+        """
+        Initialize the provider.
+
+        Args:
+            file_path (str): Path to the live price CSV (e.g. config.LIVE_PRICE_PATH)
+            column (str): Column holding the decimal price
+        """
+        self.file_path = file_path
+        self.column = column
+
+    def get_spot_price(self):
+        price = float(get_latest_row(self.file_path, required=self.column)[self.column])
+        return price, decimal_to_tt_bond_format(price)
+
+
+class InMemorySpotPriceProvider(SpotPriceProvider):
+    """Holds a spot price set by another component running in the same process."""
+
+    def __init__(self, decimal_price=None, special_string_price=None):
+        self._lock = threading.Lock()
+        self._price = None
+        if decimal_price is not None:
+            self.set_price(decimal_price, special_string_price)
+
+    def set_price(self, decimal_price, special_string_price=None):
+        """Publish a new spot price (thread-safe)."""
+        if special_string_price is None:
+            special_string_price = decimal_to_tt_bond_format(decimal_price)
+        with self._lock:
+            self._price = (decimal_price, special_string_price)
+
+    def get_spot_price(self):
+        with self._lock:
+            if self._price is None:
+                raise ValueError("No spot price has been published yet")
+            return self._price
+
+
+class CallableSpotPriceProvider(SpotPriceProvider):
+    """Adapts a fetch function returning (decimal_price, special_string_price)."""
+
+    def __init__(self, fetch_fn, supports_polling=False):
+        """
+        Initialize the provider.
+
+        Args:
+            fetch_fn (callable): Zero-argument function returning (decimal, special string);
+                                 a None decimal price is treated as a failure
+            supports_polling (bool): Whether the function is cheap enough to poll
+        """
+        self.fetch_fn = fetch_fn
+        self.supports_polling = supports_polling
+
+    def get_spot_price(self):
+        decimal_price, special_string_price = self.fetch_fn()
+        if decimal_price is None:
+            raise ValueError(f"Spot price fetch returned no price ({special_string_price!r})")
+        return decimal_price, special_string_price
@@ -0,0 +1,236 @@
+"""
+Background poller that keeps a cached snapshot of TT working orders.
+
+The scenario ladder used to call the TT orders endpoint from inside its Dash
+callback on every refresh. The poller moves that network call onto a daemon
+thread: each poll fetches the working orders, groups them by price level,
+bumps a version counter when anything changed and records the
+added/removed/modified orders. Callbacks only ever read the cached snapshot.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger('working_orders_poller')
+
+# Number of diffs kept so a reader that is a few versions behind can still
+# refresh only the rows that changed instead of rebuilding the whole ladder.
+DIFF_HISTORY_SIZE = 50
+
+
+def normalize_working_orders(orders_data):
+    """
+    Filter a raw TT orders response down to the relevant working orders.
+
+    Keeps orders with status '1', a numeric price, a positive leaves quantity
+    and a valid side, exactly like the ladder callback did.
+
+    Args:
+        orders_data (list): Raw order dictionaries from the TT orders endpoint
+
+    Returns:
+        dict: Mapping of order key -> {'price', 'qty', 'side'}
+    """
+    orders = {}
+    if not isinstance(orders_data, list):
+        return orders
+
+    for idx, order in enumerate(orders_data):
+        if isinstance(order, dict) and \
+           order.get('orderStatus') == '1' and \
+           isinstance(order.get('price'), (int, float)) and \
+           isinstance(order.get('leavesQuantity'), (int, float)) and \
+           order.get('leavesQuantity') > 0 and \
+           order.get('side') in ['1', '2']:
+            # Fall back to a positional key if TT did not send an order id
+            order_key = order.get('orderId') or f"{order['side']}@{order['price']}#{idx}"
+            orders[order_key] = {
+                'price': float(order['price']),
+                'qty': float(order['leavesQuantity']),
+                'side': order.get('side')
+            }
+    return orders
+
+
+def group_orders_by_price(orders):
+    """
+    Aggregate working orders into price levels.
+
+    Args:
+        orders (dict): Mapping of order key -> {'price', 'qty', 'side'}
+
+    Returns:
+        dict: Mapping of price -> {'qty': total quantity, 'side': side of the first order}
+    """
+    levels = {}
+    for order in orders.values():
+        level = levels.get(order['price'])
+        if level is None:
+            levels[order['price']] = {'qty': order['qty'], 'side': order['side']}
+        else:
+            level['qty'] += order['qty']
+    return levels
+
+
+def diff_orders(previous, current):
+    """
+    Compare two order snapshots.
+
+    Args:
+        previous (dict): Previous mapping of order key -> order
+        current (dict): Current mapping of order key -> order
+
+    Returns:
+        dict: {'added': [...], 'removed': [...], 'modified': [...]} where each entry
+              carries the order key and the order data ('modified' entries also
+              carry the previous order as 'before')
+    """
+    added = [{'order_id': key, **order} for key, order in current.items() if key not in previous]
+    removed = [{'order_id': key, **order} for key, order in previous.items() if key not in current]
+    modified = [
+        {'order_id': key, **order, 'before': previous[key]}
+        for key, order in current.items()
+        if key in previous and previous[key] != order
+    ]
+    return {'added': added, 'removed': removed, 'modified': modified}
+
+
+def changed_prices(diff):
+    """Return the set of price levels touched by a diff."""
+    prices = set()
+    for entry in diff['added'] + diff['removed']:
+        prices.add(entry['price'])
+    for entry in diff['modified']:
+        prices.add(entry['price'])
+        prices.add(entry['before']['price'])
+    return prices
+
+
+class WorkingOrdersPoller:
+    """
+    Polls working orders on a background thread and caches the latest snapshot.
+
+    The fetch function is injected so the poller does not depend on how the
+    orders are obtained (live TT REST call or the mock JSON file). It must
+    return the raw list of order dictionaries and raise on failure.
+    """
+
+    def __init__(self, fetch_fn, interval=1.0):
+        """
+        Initialize the poller.
+
+        Args:
+            fetch_fn (callable): Zero-argument function returning the raw orders list
+            interval (float): Seconds between polls
+        """
+        self.fetch_fn = fetch_fn
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self._version = 0
+        self._orders = {}
+        self._levels = {}
+        self._last_diff = {'added': [], 'removed': [], 'modified': []}
+        self._diff_history = deque(maxlen=DIFF_HISTORY_SIZE)  # (version, changed price set)
+        self._error = ""
+        self._last_poll_time = None
+
+    def poll_once(self):
+        """
+        Fetch orders once and update the snapshot if anything changed.
+
+        Returns:
+            bool: True if the snapshot changed (version was bumped)
+        """
+        try:
+            current = normalize_working_orders(self.fetch_fn())
+            error = ""
+        except Exception as e:
+            logger.error(f"Error fetching working orders: {e}")
+            with self._lock:
+                self._error = f"Error fetching working orders: {e}"
+                self._last_poll_time = time.time()
+            return False
+
+        with self._lock:
+            self._error = error
+            self._last_poll_time = time.time()
+            diff = diff_orders(self._orders, current)
+            if not (diff['added'] or diff['removed'] or diff['modified']):
+                return False
+
+            self._version += 1
+            self._orders = current
+            self._levels = group_orders_by_price(current)
+            self._last_diff = diff
+            self._diff_history.append((self._version, changed_prices(diff)))
+
+        logger.info(
+            f"Working orders v{self._version}: +{len(diff['added'])} "
+            f"-{len(diff['removed'])} ~{len(diff['modified'])}"
+        )
+        return True
+
+    def snapshot(self):
+        """
+        Return the latest cached snapshot without touching the network.
+
+        Returns:
+            dict: {'version', 'orders', 'levels', 'diff', 'error', 'last_poll_time'}
+        """
+        with self._lock:
+            return {
+                'version': self._version,
+                'orders': dict(self._orders),
+                'levels': {price: dict(level) for price, level in self._levels.items()},
+                'diff': self._last_diff,
+                'error': self._error,
+                'last_poll_time': self._last_poll_time,
+            }
+
+    def changed_prices_since(self, version):
+        """
+        Collect the price levels changed after a given version.
+
+        Args:
+            version (int): Snapshot version the caller last rendered
+
+        Returns:
+            set or None: Changed prices, or None if the history no longer reaches
+                         back to that version and the caller must rebuild fully
+        """
+        with self._lock:
+            if version == self._version:
+                return set()
+            if version > self._version or not self._diff_history or self._diff_history[0][0] > version + 1:
+                return None
+            prices = set()
+            for diff_version, diff_prices in self._diff_history:
+                if diff_version > version:
+                    prices |= diff_prices
+            return prices
+
+    def start(self):
+        """Start the background polling thread (no-op if already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='working-orders-poller', daemon=True)
+        self._thread.start()
+        logger.info(f"Working orders poller started (interval {self.interval}s)")
+
+    def stop(self, timeout=None):
+        """Stop the background polling thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        logger.info("Working orders poller stopped")
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.poll_once()
+            self._stop_event.wait(self.interval)
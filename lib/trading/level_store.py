@@ -0,0 +1,219 @@
+"""
+Versioned, hot-reloadable store of the technical levels.
+
+The levels live in a CSV file (one ZN price string per row under a "Level"
+header) instead of a hard-coded list. The store parses the file once into an
+immutable LevelSnapshot: the strings, the integer ticks and the decimal
+prices, sorted ascending and de-duplicated, with read-only NumPy arrays that
+every consumer in the process shares.
+
+snapshot() re-checks the file's mtime (at most every check_interval seconds)
+and swaps in a new snapshot when the file changed, so editing the file is
+picked up by running processes without a restart. The version only moves
+when the levels themselves change. A file that is missing or can't be parsed
+keeps the previous levels (the built-in DEFAULT_TECHNICAL_LEVELS before the
+first successful load).
+"""
+
+import csv
+import logging
+import os
+import threading
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from lib.trading.price_ticks import TICKS_PER_POINT, zn_to_tick, tick_to_zn
+
+logger = logging.getLogger('level_store')
+
+# data/input/technical_levels.csv in the workspace root
+DEFAULT_LEVELS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..',
+                                                   'data', 'input', 'technical_levels.csv'))
+
+# CBOT 10-year T-Note technical levels used until the levels file is loaded
+DEFAULT_TECHNICAL_LEVELS: Tuple[str, ...] = (
+    "108'15", "108'23", "108'29",
+    "109'02", "109'07", "109'11", "109'19", "109'21", "109'28",
+    "110'02", "110'06", "110'09", "110'15", "110'20", "110'24", "110'31",
+    "111'01", "111'05", "111'08", "111'14", "111'18", "111'26", "112'00",
+    "112'07", "112'11", "112'16", "112'19", "112'26",
+    "113'01", "113'08", "113'11", "113'18", "113'25", "113'31",
+    "114'06", "114'12", "114'18", "114'23", "114'30",
+)
+
+_LEVEL_COLUMN = "Level"
+
+
+class LevelSnapshot(NamedTuple):
+    """One immutable version of the technical levels, sorted ascending."""
+    version: int
+    strings: Tuple[str, ...]   # ZN strings, e.g. "110'24"
+    ticks: np.ndarray          # int64 ticks (1/64ths), read-only
+    levels: np.ndarray         # float decimal prices, read-only
+    source: str                # file path, or "default"
+
+
+def _snapshot(version: int, ticks: List[int], source: str) -> LevelSnapshot:
+    ticks = np.unique(np.asarray(ticks, dtype=np.int64))
+    levels = ticks / TICKS_PER_POINT
+    ticks.flags.writeable = False
+    levels.flags.writeable = False
+    return LevelSnapshot(version, tuple(tick_to_zn(int(t)) for t in ticks), ticks, levels, source)
+
+
+def read_levels_file(path: str) -> List[int]:
+    """
+    Read technical levels from a CSV file.
+
+    Args:
+        path (str): CSV with a "Level" column of ZN price strings (blank rows are skipped)
+
+    Returns:
+        list: Level ticks, in file order
+
+    Raises:
+        ValueError: If the file has no "Level" column, no levels or an unparseable price
+    """
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or _LEVEL_COLUMN not in reader.fieldnames:
+            raise ValueError(f"{path} has no '{_LEVEL_COLUMN}' column")
+        ticks = [zn_to_tick(row[_LEVEL_COLUMN]) for row in reader if (row[_LEVEL_COLUMN] or '').strip()]
+    if not ticks:
+        raise ValueError(f"{path} has no levels")
+    return ticks
+
+
+def write_levels_file(path: str, levels) -> None:
+    """Write ZN level strings (or ticks) to a levels CSV, replacing it atomically."""
+    strings = [tick_to_zn(int(level)) if isinstance(level, (int, np.integer)) else level for level in levels]
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow([_LEVEL_COLUMN])
+        writer.writerows([s] for s in strings)
+    os.replace(tmp_path, path)
+
+
+class TechnicalLevelStore:
+    """Technical levels loaded from a file and reloaded when its mtime changes."""
+
+    def __init__(self, path: str = DEFAULT_LEVELS_PATH, check_interval: float = 1.0,
+                 default_levels=DEFAULT_TECHNICAL_LEVELS) -> None:
+        """
+        Initialize the store and load the file if it exists.
+
+        Args:
+            path (str): Levels CSV
+            check_interval (float): Minimum seconds between mtime checks (0 checks on every call)
+            default_levels (sequence): ZN strings used until the file loads
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._file_stamp = None          # (mtime_ns, size) of the last file read
+        self._next_check = 0.0
+        self._snapshot = _snapshot(1, [zn_to_tick(s) for s in default_levels], "default")
+        self.reload(force=True)
+
+    @property
+    def version(self) -> int:
+        return self.snapshot().version
+
+    def snapshot(self) -> LevelSnapshot:
+        """The current levels, reloading first if the file changed."""
+        if time.monotonic() >= self._next_check:
+            self.reload()
+        return self._snapshot
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Re-read the levels file if its mtime or size changed.
+
+        Args:
+            force (bool): Re-read even if the file looks unchanged
+
+        Returns:
+            bool: True if the levels changed (new version)
+        """
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                if self._file_stamp is not None:
+                    logger.warning(f"Levels file {self.path} is gone, keeping v{self._snapshot.version}")
+                    self._file_stamp = None
+                return False
+
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if stamp == self._file_stamp and not force:
+                return False
+            # Remember the stamp even if parsing fails so a bad file is only reported once
+            self._file_stamp = stamp
+            try:
+                ticks = read_levels_file(self.path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Can't load levels from {self.path} ({e}), keeping v{self._snapshot.version}")
+                return False
+
+            current = self._snapshot
+            new = _snapshot(current.version + 1, ticks, self.path)
+            if np.array_equal(new.ticks, current.ticks):
+                if current.source != self.path:
+                    self._snapshot = current._replace(source=self.path)
+                return False
+            self._snapshot = new
+            logger.info(f"Loaded {len(new.ticks)} technical levels from {self.path} "
+                        f"(v{current.version} -> v{new.version}, {new.strings[0]} to {new.strings[-1]})")
+            return True
+
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_level_store(path: Optional[str] = None) -> TechnicalLevelStore:
+    """Return the process-wide store for a levels file (DEFAULT_LEVELS_PATH if omitted)."""
+    path = os.path.abspath(path or DEFAULT_LEVELS_PATH)
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = _STORES[path] = TechnicalLevelStore(path)
+        return store
+
+
+if __name__ == '__main__':
+    # Hot-reload check on a temporary file, then the cost of a snapshot() call
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'levels.csv')
+        store = TechnicalLevelStore(path, check_interval=0)
+        checks = [store.version == 1, store.snapshot().source == "default"]
+
+        write_levels_file(path, DEFAULT_TECHNICAL_LEVELS)
+        checks += [store.version == 1, store.snapshot().source == path]     # same levels: no new version
+
+        write_levels_file(path, ["112'00", "110'24", " 110'24", "115'00+"])  # unsorted, duplicate, spaces
+        snap = store.snapshot()
+        checks += [snap.version == 2, snap.strings == ("110'24", "112'00", "115'00+"),
+                   snap.levels.tolist() == [110.75, 112.0, 115.015625], not snap.levels.flags.writeable]
+
+        with open(path, 'w') as f:
+            f.write("Level\nnot a price\n")
+        checks += [store.version == 2]                                      # bad file keeps the levels
+        os.remove(path)
+        checks += [store.version == 2]
+
+    print("PASSED" if all(checks) else f"FAILED: {checks}")
+
+    store = get_level_store()
+    print(f"{store.path}: v{store.version}, {len(store.snapshot().levels)} levels ({store.snapshot().source})")
+    n = 100_000
+    start = time.perf_counter()
+    for _ in range(n):
+        store.snapshot()
+    print(f"snapshot(): {(time.perf_counter() - start) / n * 1e6:.2f} us per call")
@@ -0,0 +1,63 @@
+"""
+Loader for recorded ZN price logs.
+
+Two price log layouts are in use:
+
+- The TT/archive price log (e.g. config.LIVE_PRICE_PATH, Z:/Archive/price_log.csv):
+  timestamp, price. Naive timestamps are US/Central, the feed's local time.
+- Live_ZN_Prices.csv, written by NAM_NBM_Final_Code/Live_Price_Processing.py:
+  timestamp, Close. Timestamps are already US/Eastern.
+
+load_price_log detects the layout from the columns and returns the prices
+on naive US/Eastern times, the clock of the historical hourly bars. The
+Central -> Eastern conversion is the one Live_Price_Processing.read_archive_data
+applies before it writes Live_ZN_Prices.csv.
+"""
+
+import pandas as pd
+
+# Candidate column names, in order of preference
+PRICE_TIME_COLUMNS = ('timestamp', 'Timestamp', 'Datetime', 'datetime', 'time')
+PRICE_VALUE_COLUMNS = ('price', 'Price', 'Close', 'close')
+
+# Price columns of the TT/archive log, whose naive timestamps are US/Central
+_CENTRAL_PRICE_COLUMNS = ('price', 'Price')
+
+TARGET_TZ = 'US/Eastern'
+
+
+def _to_eastern(times, naive_tz):
+    """Naive Eastern times from naive times in naive_tz (or from tz-aware times)."""
+    if times.tz is None:
+        if naive_tz == TARGET_TZ:
+            return times
+        # The repeated hour of the fall-back DST change can't be placed; those rows are dropped
+        times = times.tz_localize(naive_tz, ambiguous='NaT', nonexistent='NaT')
+    return times.tz_convert(TARGET_TZ).tz_localize(None)
+
+
+def load_price_log(csv_path, date=None):
+    """
+    Load a recorded price log as a (time, price) series on US/Eastern time.
+
+    Args:
+        csv_path (str): Price log CSV (TT/archive log or Live_ZN_Prices.csv layout)
+        date (str): Keep only prices of this Eastern date (YYYY-MM-DD)
+
+    Returns:
+        pd.Series: Decimal prices indexed by naive US/Eastern time, sorted
+    """
+    df = pd.read_csv(csv_path)
+    time_col = next((c for c in PRICE_TIME_COLUMNS if c in df.columns), None)
+    price_col = next((c for c in PRICE_VALUE_COLUMNS if c in df.columns), None)
+    if time_col is None or price_col is None:
+        raise ValueError(f"Can't find time/price columns in {csv_path}: {list(df.columns)}")
+
+    times = pd.DatetimeIndex(pd.to_datetime(df[time_col], errors='coerce'))
+    naive_tz = 'US/Central' if price_col in _CENTRAL_PRICE_COLUMNS else TARGET_TZ
+    prices = pd.Series(pd.to_numeric(df[price_col], errors='coerce').values,
+                       index=_to_eastern(times, naive_tz))
+    prices = prices[prices.index.notna() & prices.notna()].sort_index(kind='stable')
+    if date is not None:
+        prices = prices[prices.index.strftime('%Y-%m-%d') == date]
+    return prices
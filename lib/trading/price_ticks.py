@@ -0,0 +1,247 @@
+"""
+Integer-tick price representation shared by the ladder and the risk code.
+
+ZN trades in half-32nds, so every price is a whole number of 1/64ths of a
+point. Holding prices as that integer tick count makes comparisons exact
+(no epsilon) and lets every string format be produced or parsed with table
+lookups instead of regexes:
+
+    decimal   110.578125
+    tick      7077                (110 * 64 + 37)
+    ZN        "110'18+"           (zn_to_tick / tick_to_zn)
+    TT bond   "110'185"           (tt_to_tick / tick_to_tt)
+    PM        "110-18.5"          (pm_to_tick)
+
+The tradeable ZN range (100'00 to 130'31+) is additionally precomputed into
+string <-> tick/decimal tables, so zn_to_price and zn_string_for_price are
+plain dict/tuple lookups there.
+
+This module only uses the standard library so it can be imported from the
+dependency-light risk utilities.
+"""
+
+import re
+
+TICKS_PER_POINT = 64
+TICK_SIZE = 1.0 / TICKS_PER_POINT
+TICKS_PER_BP = 4                      # one basis point = 2/32 = 4/64
+DOLLARS_PER_TICK = 62.5 / TICKS_PER_BP  # $15.625 per 1/64
+
+# A float price must sit this close (in ticks) to a tick to count as on-grid
+_ON_GRID_TOLERANCE = 0.01
+
+# Fractional-part tables, indexed by the tick within the point (0..63)
+_ZN_SUFFIXES = tuple(f"{sub // 2:02d}{'+' if sub % 2 else ''}" for sub in range(TICKS_PER_POINT))
+_TT_SUFFIXES = tuple(f"{sub // 2:02d}{5 if sub % 2 else 0}" for sub in range(TICKS_PER_POINT))
+
+# Parsing tables: two-digit 32nds -> ticks, TT fraction digits -> ticks, PM fraction -> ticks
+_THIRTY_SECONDS_TO_TICKS = {f"{n:02d}": 2 * n for n in range(100)}
+_TT_FRACTION_TO_TICKS = {
+    **{f"{n:02d}": 2 * n for n in range(100)},
+    **{f"{n:02d}0": 2 * n for n in range(100)},
+    **{f"{n:02d}5": 2 * n + 1 for n in range(100)},
+}
+_PM_DECIMALS_TO_HALF = {"0": 0, "00": 0, "000": 0, "5": 1, "50": 1, "500": 1}
+
+_ZN_SEPARATORS = "'- "
+_ZN_FALLBACK_PATTERN = re.compile(r"\s*(\d+)[\-\' ]?(\d{2})(\+?)\s*")
+
+
+def price_to_tick(price):
+    """Convert a decimal price to the nearest integer tick (1/64ths)."""
+    return int(round(price * TICKS_PER_POINT))
+
+
+def tick_to_price(tick):
+    """Convert an integer tick back to its decimal price (exact for ZN prices)."""
+    return tick / TICKS_PER_POINT
+
+
+def price_to_tick_exact(price):
+    """Return the tick of an on-grid price, or None if the price sits between ticks."""
+    scaled = price * TICKS_PER_POINT
+    tick = int(round(scaled))
+    return tick if abs(scaled - tick) < _ON_GRID_TOLERANCE else None
+
+
+def zn_to_tick(s):
+    """
+    Parse a CBOT/ZN price string ("110'18+", "110-18", "110 18+", "11018") to a tick.
+
+    Raises:
+        ValueError: If the string is not a ZN price
+    """
+    text = s.strip()
+    half = 0
+    if text.endswith('+'):
+        text, half = text[:-1], 1
+    head, frac = text[:-2], text[-2:]
+    if head and head[-1] in _ZN_SEPARATORS:
+        head = head[:-1]
+    thirty_seconds_ticks = _THIRTY_SECONDS_TO_TICKS.get(frac)
+    if thirty_seconds_ticks is None or not head.isdecimal() or not head.isascii():
+        # Unusual spacing etc.: defer to the full pattern
+        m = _ZN_FALLBACK_PATTERN.fullmatch(s)
+        if not m:
+            raise ValueError(f"Can't parse ZN price '{s}'")
+        return int(m.group(1)) * TICKS_PER_POINT + 2 * int(m.group(2)) + (1 if m.group(3) else 0)
+    return int(head) * TICKS_PER_POINT + thirty_seconds_ticks + half
+
+
+def tick_to_zn(tick):
+    """Format a tick as a ZN price string, e.g. 7077 -> "110'18+"."""
+    points, sub = divmod(tick, TICKS_PER_POINT)
+    return f"{points}'{_ZN_SUFFIXES[sub]}"
+
+
+def tt_to_tick(s):
+    """
+    Parse a TT bond price string ("110'185", "110'18", "110'180") to a tick.
+
+    Returns:
+        int or None: The tick, or None if the string is not an on-grid TT price
+                     (e.g. quarter-32nds such as "110'1825")
+    """
+    if not isinstance(s, str):
+        return None
+    points, sep, fraction = s.strip().partition("'")
+    fraction_ticks = _TT_FRACTION_TO_TICKS.get(fraction)
+    if not sep or fraction_ticks is None or not points.isdecimal() or not points.isascii():
+        return None
+    return int(points) * TICKS_PER_POINT + fraction_ticks
+
+
+def tick_to_tt(tick):
+    """Format a tick as a TT bond price string, e.g. 7077 -> "110'185"."""
+    points, sub = divmod(tick, TICKS_PER_POINT)
+    return f"{points}'{_TT_SUFFIXES[sub]}"
+
+
+# ---------------------------------------------------------------------------
+# Precomputed tables for the tradeable range
+# ---------------------------------------------------------------------------
+
+ZN_TABLE_MIN_POINT = 100
+ZN_TABLE_MAX_POINT = 130
+_TABLE_MIN_TICK = ZN_TABLE_MIN_POINT * TICKS_PER_POINT
+_TABLE_MAX_TICK = (ZN_TABLE_MAX_POINT + 1) * TICKS_PER_POINT - 1  # 130'31+
+
+# Tick -> ZN string, indexed by tick - _TABLE_MIN_TICK
+_ZN_TABLE_STRINGS = tuple(tick_to_zn(t) for t in range(_TABLE_MIN_TICK, _TABLE_MAX_TICK + 1))
+# ZN string ("110'18+" and "110-18+" spellings) -> tick / decimal
+_ZN_TABLE_TICKS = {}
+for _tick, _zn in enumerate(_ZN_TABLE_STRINGS, start=_TABLE_MIN_TICK):
+    _ZN_TABLE_TICKS[_zn] = _tick
+    _ZN_TABLE_TICKS[_zn.replace("'", "-")] = _tick
+_ZN_TABLE_PRICES = {zn: tick / TICKS_PER_POINT for zn, tick in _ZN_TABLE_TICKS.items()}
+del _tick, _zn
+
+
+def zn_to_price(s):
+    """
+    Convert a ZN price string to its decimal price.
+
+    O(1) dict lookup for "110'18+"/"110-18+" strings in the table range;
+    other spellings and prices are parsed with zn_to_tick.
+
+    Raises:
+        ValueError: If the string is not a ZN price
+    """
+    price = _ZN_TABLE_PRICES.get(s)
+    if price is None:
+        price = zn_to_tick(s) / TICKS_PER_POINT
+    return price
+
+
+def zn_string_for_price(price):
+    """
+    Return the ZN string of a price exactly on the 1/64 grid within the table range.
+
+    Returns:
+        str or None: e.g. 110.578125 -> "110'18+", or None if the price is
+                     off the grid or outside the table range
+    """
+    scaled = float(price) * TICKS_PER_POINT
+    if scaled.is_integer() and _TABLE_MIN_TICK <= scaled <= _TABLE_MAX_TICK:
+        return _ZN_TABLE_STRINGS[int(scaled) - _TABLE_MIN_TICK]
+    return None
+
+
+def pm_to_tick(s):
+    """
+    Parse a Pricing Monkey price string ("110-18.5", "110-18.00") to a tick.
+
+    Returns:
+        int or None: The tick, or None if the string is not an on-grid PM price
+    """
+    if not isinstance(s, str):
+        return None
+    points, sep, rest = s.strip().partition("-")
+    thirty_seconds, dot, decimals = rest.partition(".")
+    half = _PM_DECIMALS_TO_HALF.get(decimals) if dot else 0
+    if not sep or half is None or not points.isdecimal() or not points.isascii() or \
+       not thirty_seconds.isdecimal() or not thirty_seconds.isascii() or len(thirty_seconds) > 2:
+        return None
+    return int(points) * TICKS_PER_POINT + 2 * int(thirty_seconds) + half
+
+
+if __name__ == '__main__':
+    # Round-trip checks over the tradeable range and a comparison with the regex parsers
+    import time
+
+    def zn_to_decimal_regex(s):
+        m = re.fullmatch(r"\s*(\d+)[\-\' ]?(\d{2})(\+?)\s*", s)
+        if not m:
+            raise ValueError(f"Can't parse ZN price '{s}'")
+        return int(m.group(1)) + int(m.group(2)) / 32.0 + (1 / 64.0 if m.group(3) else 0)
+
+    ticks = range(100 * TICKS_PER_POINT, 131 * TICKS_PER_POINT)
+    zn_strings = [tick_to_zn(t) for t in ticks]
+    checks = [
+        all(zn_to_tick(tick_to_zn(t)) == t for t in ticks),
+        all(tt_to_tick(tick_to_tt(t)) == t for t in ticks),
+        all(price_to_tick_exact(tick_to_price(t)) == t for t in ticks),
+        all(zn_to_decimal_regex(s) == tick_to_price(zn_to_tick(s)) for s in zn_strings),
+        [zn_to_tick(s) for s in ["110-18+", " 110 18 ", "11018+", "110'18+"]] == [7077, 7076, 7077, 7077],
+        [tt_to_tick(s) for s in ["110'185", "110'18", "110'180", "110'1825", "bad"]] == [7077, 7076, 7076, None, None],
+        [pm_to_tick(s) for s in ["110-18.5", "110-18.00", "110-18", "110-18.25"]] == [7077, 7076, 7076, None],
+        price_to_tick_exact(110.0 + 1 / 128) is None,
+    ]
+    print("PASSED" if all(checks) else f"FAILED: {checks}")
+
+    n = len(zn_strings)
+    start = time.perf_counter()
+    for s in zn_strings:
+        zn_to_decimal_regex(s)
+    regex_us = (time.perf_counter() - start) / n * 1e6
+    start = time.perf_counter()
+    for s in zn_strings:
+        zn_to_tick(s)
+    tick_us = (time.perf_counter() - start) / n * 1e6
+    start = time.perf_counter()
+    for s in zn_strings:
+        zn_to_price(s)
+    lookup_us = (time.perf_counter() - start) / n * 1e6
+    print(f"ZN -> decimal: regex {regex_us:.2f} us, tick parse {tick_us:.2f} us, "
+          f"precomputed table {lookup_us:.2f} us per string ({n} strings)")
+
+    def decimal_to_zn_arithmetic(x):
+        pts = int(x)
+        remainder = round((x - pts) * 32, 3)
+        frac = int(remainder)
+        half = 1 if (remainder - frac) >= 0.5 else 0
+        return f"{pts}'{frac:02d}{'+' if half else ''}"
+
+    prices = [tick_to_price(t) for t in ticks]
+    table_ok = all(zn_string_for_price(p) == decimal_to_zn_arithmetic(p) for p in prices) and \
+        all(zn_to_price(s) == zn_to_decimal_regex(s) for s in zn_strings + [s.replace("'", "-") for s in zn_strings])
+    print("Table parity PASSED" if table_ok else "Table parity FAILED")
+    start = time.perf_counter()
+    for p in prices:
+        decimal_to_zn_arithmetic(p)
+    arith_us = (time.perf_counter() - start) / n * 1e6
+    start = time.perf_counter()
+    for p in prices:
+        zn_string_for_price(p)
+    table_us = (time.perf_counter() - start) / n * 1e6
+    print(f"decimal -> ZN: arithmetic {arith_us:.2f} us, precomputed table {table_us:.2f} us per price")
@@ -29,6 +29,7 @@ import pandas as pd
 import json
 
 from config import CONTINUOUS_FILLS_CSV, LIFO_STREAMING_CSV
+from lib.trading.price_ticks import TICKS_PER_POINT, DOLLARS_PER_TICK
 
 def load_config(config_file='config.json'):
     """Load configuration from a JSON file."""
@@ -47,6 +48,21 @@ PositionStack = List[Tuple[float, float]]  # (quantity, price) - qty>0 for long,
 # LIFO PnL calculation (using new logic that handles both long and short)
 # ---------------------------------------------------------------------------
 
+def price_move_pnl(entry_price: float, exit_price: float, qty: float) -> float:
+    """
+    PnL of qty long from entry_price to exit_price.
+
+    Prices exactly on the 1/64 grid are differenced as integer ticks at
+    $15.625 per tick (same result as the decimal formula, without the float
+    subtraction); anything else uses the decimal formula.
+    """
+    entry_ticks = float(entry_price) * TICKS_PER_POINT
+    exit_ticks = float(exit_price) * TICKS_PER_POINT
+    if entry_ticks.is_integer() and exit_ticks.is_integer():
+        return (int(exit_ticks) - int(entry_ticks)) * qty * DOLLARS_PER_TICK
+    return (exit_price - entry_price) * qty * 16 * 62.5
+
+
 def calculate_lifo_pnl_and_update_stack(stack: List[Tuple[float, float]], qty: float, price: float) -> float:
     """
     Process a trade using LIFO logic and return realized PnL.
@@ -65,9 +81,9 @@ def calculate_lifo_pnl_and_update_stack(stack: List[Tuple[float, float]], qty: f
                                                    # Match is already non-negative.
 
         if remaining < 0:        # selling long
-            pnl_this_trade += (price - lot_price) * match * 16 * 62.5
+            pnl_this_trade += price_move_pnl(lot_price, price, match)
         else:                    # buying to cover short
-            pnl_this_trade += (lot_price - price) * match * 16 * 62.5
+            pnl_this_trade += price_move_pnl(price, lot_price, match)
 
         # shrink lot & remaining
         if abs(lot_qty) > match: # This is the case where the last lot quantity is greater than the match quantity.
@@ -128,6 +144,49 @@ def load_stack_state(state_file: str) -> Tuple[PositionStack, int, set]:
 # Run-once processing for event-driven mode
 # ---------------------------------------------------------------------------
 
+def lifo_records_for_rows(rows: pd.DataFrame, position_stack: PositionStack, processed_transactions: set) -> list:
+    """
+    Run new fill rows through the LIFO stack (updated in place).
+
+    Rows already in processed_transactions are skipped.
+
+    Returns:
+        list: Output rows [Timestamp, TradeQty, TradePx, RealisedPnL, StackSize, OrderId, TimeStamp]
+              for fills that realised PnL (or failed)
+    """
+    records = []
+    for _, row in rows.iterrows():
+        # Create unique transaction ID for deduplication
+        txn_id = (row.get('TimeStamp', ''), row.get('OrderId', ''), row.get('Quantity', 0), row.get('Price', 0))
+        if txn_id in processed_transactions:
+            continue
+        processed_transactions.add(txn_id)
+        
+        # Process trade
+        side = int(row.get('Side', 0))
+        qty = float(row.get('Quantity', 0))
+        price = float(row.get('Price', 0))
+        
+        if side == 1:  # BUY
+            trade_qty = qty
+        elif side == 2:  # SELL
+            trade_qty = -qty
+        else:
+            continue
+        
+        ts = f"{row.get('Date', '')} {row.get('Time', '')}"
+        # Execute LIFO logic
+        try:
+            pnl = calculate_lifo_pnl_and_update_stack(position_stack, trade_qty, price)
+            if pnl != 0:
+                records.append([ts, trade_qty, price, pnl, len(position_stack), row.get('OrderId', ''), row.get('TimeStamp', '')])
+        except ValueError as e:
+            print(f"ERROR processing trade: {e}")
+            # Write error to CSV for tracking
+            records.append([ts, trade_qty, price, f"ERROR: {e}", len(position_stack), row.get('OrderId', ''), row.get('TimeStamp', '')])
+    return records
+
+
 def process_lifo_once(csv_file: str, output_path: str, reset: bool = False) -> bool:
     """Process LIFO once and exit - for event-driven mode."""
     try:
@@ -163,45 +222,10 @@ def process_lifo_once(csv_file: str, output_path: str, reset: bool = False) -> b
                 ])
         
         # Process new rows only
-        sell_events_processed = 0
-        for i in range(last_processed_row, len(df)):
-            row = df.iloc[i]
-            
-            # Create unique transaction ID for deduplication
-            txn_id = (row.get('TimeStamp', ''), row.get('OrderId', ''), row.get('Quantity', 0), row.get('Price', 0))
-            if txn_id in processed_transactions:
-                continue
-            processed_transactions.add(txn_id)
-            
-            # Process trade
-            side = int(row.get('Side', 0))
-            qty = float(row.get('Quantity', 0))
-            price = float(row.get('Price', 0))
-            
-            if side == 1:  # BUY
-                trade_qty = qty
-            elif side == 2:  # SELL
-                trade_qty = -qty
-                sell_events_processed += 1
-            else:
-                continue
-            
-            # Execute LIFO logic
-            try:
-                pnl = calculate_lifo_pnl_and_update_stack(position_stack, trade_qty, price)
-                
-                # Write result
-                if pnl != 0:
-                    ts = f"{row.get('Date', '')} {row.get('Time', '')}"
-                    with open(output_path, "a", newline="") as f:
-                        csv.writer(f).writerow([ts, trade_qty, price, pnl, len(position_stack), row.get('OrderId', ''), row.get('TimeStamp', '')])
-                    
-            except ValueError as e:
-                print(f"ERROR processing trade: {e}")
-                # Write error to CSV for tracking
-                ts = f"{row.get('Date', '')} {row.get('Time', '')}"
-                with open(output_path, "a", newline="") as f:
-                    csv.writer(f).writerow([ts, trade_qty, price, f"ERROR: {e}", len(position_stack), row.get('OrderId', ''), row.get('TimeStamp', '')])
+        records = lifo_records_for_rows(df.iloc[last_processed_row:], position_stack, processed_transactions)
+        if records:
+            with open(output_path, "a", newline="") as f:
+                csv.writer(f).writerows(records)
 
         # Update last processed row and save state
         last_processed_row = len(df)
@@ -53,6 +53,23 @@ def load_config(config_file='config.json'):
 # Load configuration
 config = load_config()
 
+
+def filter_contract_fills(df: pd.DataFrame) -> pd.DataFrame:
+    """Fills for the exchange and contract in config.json."""
+    mask = (df['Exchange'] == config['exchange']) & \
+           (df['Contract'] == config['contract'])
+    return df[mask].copy()
+
+
+def add_net_position(new_rows: pd.DataFrame, current_net_position: float) -> pd.DataFrame:
+    """Add SignedQuantity and the running NetPosition (continuing from current_net_position) to new fill rows."""
+    # Calculate signed quantity for new rows
+    new_rows['SignedQuantity'] = np.where(new_rows['Side'] == 1, new_rows['Quantity'], -new_rows['Quantity'])
+    
+    # Calculate cumulative net position starting from current position
+    new_rows['NetPosition'] = current_net_position + new_rows['SignedQuantity'].cumsum()
+    return new_rows
+
 def stream_net_position_monitor(
     input_file: str = CONTINUOUS_FILLS_CSV,
     output_file: str = NET_POSITION_STREAMING_CSV,
@@ -109,9 +126,7 @@ def stream_net_position_monitor(
             df = pd.read_csv(input_file)
             
             # Filter for trades based on config
-            mask = (df['Exchange'] == config['exchange']) & \
-                   (df['Contract'] == config['contract'])
-            filtered_df = df[mask].copy()
+            filtered_df = filter_contract_fills(df)
             
             # Check if we have new rows to process
             if len(filtered_df) > last_processed_row:
@@ -121,11 +136,7 @@ def stream_net_position_monitor(
                 new_rows = filtered_df.iloc[last_processed_row:].copy()
                 
                 if not new_rows.empty:
-                    # Calculate signed quantity for new rows
-                    new_rows['SignedQuantity'] = np.where(new_rows['Side'] == 1, new_rows['Quantity'], -new_rows['Quantity'])
-                    
-                    # Calculate cumulative net position starting from current position
-                    new_rows['NetPosition'] = current_net_position + new_rows['SignedQuantity'].cumsum()
+                    new_rows = add_net_position(new_rows, current_net_position)
                     
                     # Append new rows to output CSV
                     new_rows.to_csv(output_file, mode='a', header=False, index=False)
@@ -189,9 +200,7 @@ def run_net_position_once(
 
         # Read and filter data (same logic as continuous monitor)
         df = pd.read_csv(input_file)
-        mask = (df['Exchange'] == config['exchange']) & \
-               (df['Contract'] == config['contract'])
-        filtered_df = df[mask].copy()
+        filtered_df = filter_contract_fills(df)
         
         # Check for new rows to process
         if len(filtered_df) <= last_processed_row:
@@ -204,11 +213,7 @@ def run_net_position_once(
         new_rows = filtered_df.iloc[last_processed_row:].copy()
         
         if not new_rows.empty:
-            # Calculate signed quantity for new rows
-            new_rows['SignedQuantity'] = np.where(new_rows['Side'] == 1, new_rows['Quantity'], -new_rows['Quantity'])
-            
-            # Calculate cumulative net position starting from current position
-            new_rows['NetPosition'] = current_net_position + new_rows['SignedQuantity'].cumsum()
+            new_rows = add_net_position(new_rows, current_net_position)
             
             # Append new rows to output CSV
             new_rows.to_csv(output_file, mode='a', header=False, index=False)
@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+"""
+Historical Replay Backtester
+Replays a recorded fills file and price log through the live pipeline in memory:
+
+    fills -> net_position_monitor -> trade_state_monitor -> risk_stream
+          -> lifo_pnl_monitor
+
+Each stage is the same per-batch function the watchdog path runs
+(filter_contract_fills/add_net_position, trade_events_for_rows, risk,
+lifo_records_for_rows); only the CSV/pickle state around them is replaced by
+in-memory state. Fills and price ticks are merged into one event stream and
+played on a simulated clock at N x real time (speed 0 = as fast as possible).
+
+Outputs are the net position rows, trade state events, LIFO records and risk
+history the live monitors would have written, plus per-stage timing stats.
+
+Run from the repository root (net_position_monitor reads config.json from the
+working directory).
+"""
+
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import CONTINUOUS_FILLS_CSV, LIVE_ZN_PRICES_CSV, TECHNICAL_DICT_CSV
+from lifo_pnl_monitor import lifo_records_for_rows, parse_fill_datetime
+from net_position_monitor import filter_contract_fills, add_net_position
+from Optimizer.Sumo_Curve.trade_state_monitor import trade_events_for_rows
+from Optimizer.Sumo_Curve.risk_stream import risk
+from Optimizer.Sumo_Curve.risk_tracker import RiskInputTracker
+from lib.trading.price_log import load_price_log
+
+STAGES = ('net_position', 'trade_state', 'lifo', 'risk')
+
+# Column names of the live output files
+TRADE_EVENT_COLUMNS = ['Timestamp', 'Date', 'Time', 'Price', 'TradeState', 'NetPosition', 'PreviousNetPosition', 'Description']
+LIFO_COLUMNS = ["Timestamp", "TradeQty", "TradePx", "RealisedPnL", "StackSize", "OrderId", "TimeStamp"]
+
+
+class SimulatedClock:
+    """Replay clock running at speed x real time; speed <= 0 replays as fast as possible."""
+
+    def __init__(self, start, speed=0.0):
+        """
+        Initialize the clock.
+
+        Args:
+            start (datetime): Simulated time of the first event
+            speed (float): Simulated seconds per wall-clock second (0 = no waiting)
+        """
+        self.start = start
+        self.speed = speed
+        self.max_lag = 0.0
+        self._wall_start = time.perf_counter()
+
+    def wait_until(self, event_time):
+        """Sleep until event_time is due on the simulated clock, tracking how late events run."""
+        if self.speed <= 0:
+            return
+        due = (event_time - self.start).total_seconds() / self.speed
+        delay = due - (time.perf_counter() - self._wall_start)
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            self.max_lag = max(self.max_lag, -delay)
+
+
+def load_fills(csv_path, date=None):
+    """
+    Load a recorded fills file (continuous_fills.csv format) with an EventTime column.
+
+    Args:
+        csv_path (str): Fills CSV
+        date (str): Keep only fills of this date (YYYY-MM-DD)
+
+    Returns:
+        pd.DataFrame: Fills in file order
+    """
+    fills = pd.read_csv(csv_path)
+    if date is not None:
+        fills = fills[fills['Date'].astype(str) == date]
+    fills = fills.reset_index(drop=True)
+    fills['EventTime'] = [parse_fill_datetime(str(d), str(t)) for d, t in zip(fills['Date'], fills['Time'])]
+    return fills
+
+
+def build_events(fills, prices):
+    """
+    Merge fills and price ticks into one time-ordered event list.
+
+    Fills sharing a timestamp form one batch, like rows appended to the fills
+    file in one write. A price tick at the same time as a fill batch is
+    applied first.
+
+    Returns:
+        list: (time, 'price', price) and (time, 'fills', (first_row, end_row)) tuples
+    """
+    events = [(t.to_pydatetime(), 0, 'price', float(p)) for t, p in prices.items()]
+    start = 0
+    times = fills['EventTime'].tolist()
+    for i in range(1, len(times) + 1):
+        if i == len(times) or times[i] != times[start]:
+            events.append((times[start], 1, 'fills', (start, i)))
+            start = i
+    events.sort(key=lambda e: (e[0], e[1]))
+    return [(t, kind, payload) for t, _, kind, payload in events]
+
+
+def timing_stats(timings):
+    """
+    Summarize per-stage durations.
+
+    Args:
+        timings (dict): Stage name -> list of durations in seconds
+
+    Returns:
+        pd.DataFrame: count, total/mean/p50/p95/max in ms per stage
+    """
+    rows = []
+    for stage in STAGES:
+        ms = np.asarray(timings.get(stage, []), dtype=float) * 1000
+        rows.append({
+            'stage': stage,
+            'count': len(ms),
+            'total_ms': ms.sum() if len(ms) else 0.0,
+            'mean_ms': ms.mean() if len(ms) else np.nan,
+            'p50_ms': np.percentile(ms, 50) if len(ms) else np.nan,
+            'p95_ms': np.percentile(ms, 95) if len(ms) else np.nan,
+            'max_ms': ms.max() if len(ms) else np.nan,
+        })
+    return pd.DataFrame(rows).set_index('stage')
+
+
+def replay(fills, prices, technical_dict, speed=0.0, initial_net_position=0.0, initial_starting_price=np.nan,
+           skip_unchanged_risk=True):
+    """
+    Replay fills and prices through the pipeline stages in memory.
+
+    Args:
+        fills (pd.DataFrame): Fills as returned by load_fills
+        prices (pd.Series): Prices as returned by load_price_log
+        technical_dict (dict): Technical dict used for every risk computation
+        speed (float): Simulated clock speed (0 = as fast as possible)
+        initial_net_position (float): Net position before the first fill
+        initial_starting_price (float): Starting price of a trade already open before the first fill
+                                        (required when initial_net_position is not 0)
+        skip_unchanged_risk (bool): Skip risk() when its inputs are unchanged, like the live stream
+
+    Returns:
+        dict: net_positions, trade_events, lifo (DataFrames), risk_history (list of dicts),
+              risk_errors (list), timing (DataFrame) and summary (dict)
+    """
+    if initial_net_position != 0 and pd.isna(initial_starting_price):
+        raise ValueError("initial_starting_price is required when initial_net_position is not 0")
+    events = build_events(fills, prices)
+    if not events:
+        raise ValueError("Nothing to replay: no fills or prices")
+
+    # Live pipeline state, held in memory
+    net_position = float(initial_net_position)
+    previous_net_position = net_position
+    net_position_dict = {'NetPosition': net_position}
+    trade_dict = {'TradeState': 1 if net_position != 0 else 0, 'Price': initial_starting_price}
+    position_stack, processed_transactions = [], set()
+    if net_position != 0:
+        position_stack.append((net_position, initial_starting_price))
+    current_price = None
+    tracker = RiskInputTracker(log_every=0)
+
+    net_position_frames, trade_events, lifo_records = [], [], []
+    risk_history, risk_errors = [], []
+    timings = {stage: [] for stage in STAGES}
+
+    clock = SimulatedClock(events[0][0], speed)
+    wall_start = time.perf_counter()
+    for event_time, kind, payload in events:
+        clock.wait_until(event_time)
+
+        if kind == 'price':
+            current_price = payload
+        else:
+            batch = fills.iloc[payload[0]:payload[1]]
+
+            start = time.perf_counter()
+            new_rows = filter_contract_fills(batch.drop(columns='EventTime'))
+            if not new_rows.empty:
+                new_rows = add_net_position(new_rows, net_position)
+                net_position = new_rows['NetPosition'].iloc[-1]
+                net_position_dict = new_rows.iloc[-1].to_dict()
+                net_position_frames.append(new_rows)
+            timings['net_position'].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            new_events, previous_net_position = trade_events_for_rows(new_rows, previous_net_position)
+            if new_events:
+                trade_events.extend(new_events)
+                trade_dict = new_events[-1]
+            timings['trade_state'].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            lifo_records.extend(lifo_records_for_rows(batch, position_stack, processed_transactions))
+            timings['lifo'].append(time.perf_counter() - start)
+
+        if current_price is None:
+            continue
+
+        # Risk stage: runs after every price tick and fill batch, as the watchdog and price stream trigger it
+        technical = dict(technical_dict)
+        start = time.perf_counter()
+        key = tracker.key(trade_dict.get('TradeState'), current_price, technical,
+                          net_position_dict.get('NetPosition'), trade_dict.get('Price'))
+        if skip_unchanged_risk and tracker.is_current(key):
+            continue
+        try:
+            combined_dict = risk((trade_dict, technical, net_position_dict, current_price))
+        except Exception as e:
+            risk_errors.append({'timestamp': event_time, 'price': current_price, 'error': str(e)})
+            continue
+        finally:
+            timings['risk'].append(time.perf_counter() - start)
+        tracker.record(key)
+
+        # Same history shape as the risk pickle: a new entry only when the dict changes
+        if risk_history and risk_history[-1]['combined_dict'] == combined_dict:
+            risk_history[-1]['timestamp'] = event_time
+        else:
+            risk_history.append({
+                'timestamp': event_time,
+                'price': current_price,
+                'trade_state': trade_dict.get('TradeState'),
+                'net_position': net_position_dict.get('NetPosition'),
+                'combined_dict': combined_dict,
+            })
+
+    wall_seconds = time.perf_counter() - wall_start
+    simulated_seconds = (events[-1][0] - events[0][0]).total_seconds()
+    summary = {
+        'start': events[0][0],
+        'end': events[-1][0],
+        'events': len(events),
+        'fills': len(fills),
+        'prices': len(prices),
+        'simulated_seconds': simulated_seconds,
+        'wall_seconds': wall_seconds,
+        'speedup': simulated_seconds / wall_seconds if wall_seconds > 0 else np.inf,
+        'max_clock_lag_seconds': clock.max_lag,
+        'final_net_position': net_position,
+        'risk_tracker': tracker.stats(),
+    }
+
+    net_positions = pd.concat(net_position_frames, ignore_index=True) if net_position_frames else pd.DataFrame()
+    return {
+        'net_positions': net_positions,
+        'trade_events': pd.DataFrame(trade_events, columns=TRADE_EVENT_COLUMNS),
+        'lifo': pd.DataFrame(lifo_records, columns=LIFO_COLUMNS),
+        'risk_history': risk_history,
+        'risk_errors': risk_errors,
+        'timing': timing_stats(timings),
+        'summary': summary,
+    }
+
+
+def write_outputs(result, output_dir):
+    """Write the replay outputs under the live file names, plus the timing stats."""
+    os.makedirs(output_dir, exist_ok=True)
+    result['net_positions'].to_csv(os.path.join(output_dir, 'net_position_streaming.csv'), index=False)
+    result['trade_events'].to_csv(os.path.join(output_dir, 'trade_state_events.csv'), index=False)
+    result['lifo'].to_csv(os.path.join(output_dir, 'lifo_streaming.csv'), index=False)
+    with open(os.path.join(output_dir, 'risk_streaming.pkl'), 'wb') as f:
+        pickle.dump(result['risk_history'], f)
+    result['timing'].to_csv(os.path.join(output_dir, 'replay_timing.csv'))
+    print(f"Replay outputs written to {output_dir}")
+
+
+def print_report(result):
+    """Print the replay summary and per-stage timings."""
+    summary = result['summary']
+    print(f"\nReplayed {summary['start']} -> {summary['end']}: {summary['events']} events "
+          f"({summary['fills']} fills, {summary['prices']} prices)")
+    print(f"Simulated {summary['simulated_seconds'] / 3600:.2f} h in {summary['wall_seconds']:.2f} s "
+          f"({summary['speedup']:,.0f}x real time, max clock lag {summary['max_clock_lag_seconds']:.3f} s)")
+    print(f"Net position rows: {len(result['net_positions'])}, final position {summary['final_net_position']}")
+    print(f"Trade events: {len(result['trade_events'])}, LIFO records: {len(result['lifo'])}, "
+          f"risk snapshots: {len(result['risk_history'])}, risk errors: {len(result['risk_errors'])}")
+    tracker = summary['risk_tracker']
+    print(f"Risk inputs unchanged (skipped): {tracker['hits']}, recomputed: {tracker['misses']}")
+    print("\nStage timings:")
+    print(result['timing'].to_string(float_format=lambda x: f"{x:.3f}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded fills file and price log through the pipeline')
+    parser.add_argument('--fills', default=CONTINUOUS_FILLS_CSV, help='Recorded fills CSV')
+    parser.add_argument('--prices', default=LIVE_ZN_PRICES_CSV, help='Recorded price log CSV')
+    parser.add_argument('--technical-dict', default=TECHNICAL_DICT_CSV, help='Technical dict CSV (last row is used)')
+    parser.add_argument('--date', help='Replay only this date (YYYY-MM-DD)')
+    parser.add_argument('--speed', type=float, default=0.0, help='Simulated clock speed (0 = as fast as possible)')
+    parser.add_argument('--initial-position', type=float, default=0.0, help='Net position before the first fill')
+    parser.add_argument('--initial-starting-price', type=float, default=np.nan,
+                        help='Decimal starting price of the trade open before the first fill '
+                             '(required with a non-zero --initial-position)')
+    parser.add_argument('--output-dir', help='Write the stage outputs to this directory')
+    parser.add_argument('--no-skip', action='store_true', help='Recompute risk on every event')
+    args = parser.parse_args()
+    if args.initial_position != 0 and np.isnan(args.initial_starting_price):
+        parser.error("--initial-starting-price is required when --initial-position is not 0")
+
+    fills = load_fills(args.fills, args.date)
+    prices = load_price_log(args.prices, args.date)
+    technical_dict = pd.read_csv(args.technical_dict).iloc[-1].to_dict()
+    print(f"Loaded {len(fills)} fills from {args.fills} and {len(prices)} prices from {args.prices}")
+
+    result = replay(fills, prices, technical_dict, speed=args.speed, initial_net_position=args.initial_position,
+                    initial_starting_price=args.initial_starting_price, skip_unchanged_risk=not args.no_skip)
+    print_report(result)
+    if args.output_dir:
+        write_outputs(result, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
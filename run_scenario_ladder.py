@@ -1,5 +1,5 @@
 import dash
-from dash import html, dcc
+from dash import html, dcc, Patch
 import dash_bootstrap_components as dbc
 import os
 import sys
@@ -7,20 +7,25 @@ import pandas as pd
 import requests
 import json
 import math # For rounding prices
+import logging
+import numpy as np
 import re   # For regex parsing of spot price
 import time
-import webbrowser
-import pyperclip
 import sqlite3
-from pywinauto.keyboard import send_keys
+from collections import OrderedDict
 from dash.dependencies import Input, Output, State
 from dash.exceptions import PreventUpdate
+from config import LIVE_PRICE_PATH
 
 # --- Import components from package ---
 try:
     from lib.components import DataTable, Button, Grid
-    from lib.components.themes import default_theme
-    from lib.trading.ladder import decimal_to_tt_bond_format, csv_to_sqlite_table, query_sqlite_table
+    from lib.components.themes import default_theme, get_datatable_default_styles
+    from lib.trading.ladder import decimal_to_tt_bond_format, query_sqlite_table, WorkingOrdersPoller, ActantSODStore
+    from lib.trading.ladder import zn_future_fills_from_frame, calculate_baseline_vectorized
+    from lib.trading.ladder import TICKS_PER_POINT, price_to_tick, tick_to_price, ladder_tick_range, build_ladder_rows
+    from lib.trading.ladder import LivePriceFileProvider, InMemorySpotPriceProvider, CallableSpotPriceProvider
+    from lib.trading.price_ticks import DOLLARS_PER_TICK, price_to_tick_exact, tt_to_tick, pm_to_tick
     from lib.trading.tt_api import (
         TTTokenManager, 
         TT_API_KEY, TT_API_SECRET, TT_SIM_API_KEY, TT_SIM_API_SECRET,
@@ -32,6 +37,8 @@ except ImportError as e:
     sys.exit(1)
 # --- End Imports ---
 
+logger = logging.getLogger('scenario_ladder') # Per-level ladder detail is logged at DEBUG
+
 # --- Initialize Dash App ---
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 app.title = "Scenario Ladder"
@@ -54,6 +61,11 @@ ACTANT_TABLE_NAME = "actant_sod_fills"
 BP_DECIMAL_PRICE_CHANGE = 0.0625  # 2 * (1/32) = 1/16 = 0.0625
 DOLLARS_PER_BP = 62.5  # $62.5 per basis point
 
+# Spot price source: 'live_file' reads LIVE_PRICE_PATH (the feed the risk stream uses),
+# 'pricing_monkey' drives the Pricing Monkey page via browser automation (Windows only, slow)
+SPOT_PRICE_SOURCE = 'live_file'
+SPOT_REFRESH_INTERVAL_SECONDS = 1.0 # Automatic spot refresh (polling providers only)
+
 # Pricing Monkey constants
 PM_URL = "https://pricingmonkey.com/b/e9172aaf-2cb4-4f2c-826d-92f57d3aea90"
 PM_WAIT_FOR_BROWSER_OPEN = 3.0
@@ -63,11 +75,16 @@ PM_KEY_PRESS_PAUSE = 0.1
 
 # --- Constants ---
 TT_API_BASE_URL = "https://ttrestapi.trade.tt"
-PRICE_INCREMENT_DECIMAL = 1.0 / 64.0  # For ZN-like instruments
 DATATABLE_ID = 'scenario-ladder-table'
 MESSAGE_DIV_ID = 'scenario-ladder-message'
 STORE_ID = 'scenario-ladder-store' # For triggering load and potentially storing state
 USE_MOCK_DATA = False # Flag to switch between mock and live data
+ORDERS_POLL_INTERVAL_SECONDS = 1.0 # Background working-orders poll interval
+ORDERS_INTERVAL_ID = 'orders-poll-interval' # UI tick that checks the cached orders snapshot
+ORDERS_VERSION_STORE_ID = 'orders-version-store' # Snapshot version currently rendered in the ladder
+LADDER_STYLES_STORE_ID = 'ladder-base-styles-store' # Static conditional styles the spot highlight is layered on
+SPOT_INTERVAL_ID = 'spot-refresh-interval' # UI tick that re-reads the spot price provider
+LADDER_CACHE_SIZE = 16 # Memoized ladders kept, keyed by (orders version, spot half-tick, baseline)
 
 def parse_and_convert_pm_price(price_str):
     """
@@ -100,7 +117,12 @@ def parse_and_convert_pm_price(price_str):
     fraction_as_decimal = float("0." + fractional_part_str)
     
     # Convert to decimal price: whole_points + (thirty_seconds_part + fraction_as_decimal) / 32.0
-    decimal_price = whole_points + (thirty_seconds_part + fraction_as_decimal) / 32.0
+    # On-grid prices (whole or half 32nds) go through the integer tick tables
+    tick = pm_to_tick(match.group(0))
+    if tick is not None:
+        decimal_price = tick_to_price(tick)
+    else:
+        decimal_price = whole_points + (thirty_seconds_part + fraction_as_decimal) / 32.0
     
     # Generate special string format
     # For exact 32nds (e.g. "110-09.00" or "110-09.0"), use format "110'090"
@@ -125,6 +147,13 @@ def convert_tt_special_format_to_decimal(price_str):
     """
     price_str = price_str.strip() if price_str else ""
     
+    # Whole and half 32nds ("110'08", "110'085") are a table lookup on the integer tick
+    tick = tt_to_tick(price_str)
+    if tick is not None:
+        decimal_price = tick_to_price(tick)
+        print(f"Converted '{price_str}' to decimal: {decimal_price}")
+        return decimal_price
+    
     # Pattern for "XXX'YYZZ" format where YY is 32nds and ZZ is optional fractional part
     pattern = r"(\d+)'(\d{2,4})"
     match = re.match(pattern, price_str)
@@ -179,31 +208,9 @@ def load_actant_zn_fills(csv_filepath):
             
         print(f"Found {len(zn_future_fills)} ZN future fills in Actant data")
         
-        # Process each fill
-        processed_fills = []
-        for _, row in zn_future_fills.iterrows():
-            # Convert price from TT special format to decimal
-            price_str = row.get('PRICE_TODAY')
-            price = convert_tt_special_format_to_decimal(price_str)
-            
-            if price is None:
-                print(f"Skipping fill with invalid price: {price_str}")
-                continue
-                
-            # Get quantity and adjust sign based on long/short
-            quantity = float(row.get('QUANTITY', 0))
-            if pd.isna(quantity) or quantity == 0:
-                print(f"Skipping fill with invalid quantity: {quantity}")
-                continue
-                
-            side = row.get('LONG_SHORT', '')
-            if side == 'S':  # Short position
-                quantity = -quantity
-            
-            processed_fills.append({
-                'price': price,
-                'qty': int(quantity)  # Ensure quantity is an integer
-            })
+        # Parse prices column-wise; invalid prices and zero quantities are dropped
+        fills = zn_future_fills_from_frame(zn_future_fills)
+        processed_fills = [{'price': price, 'qty': qty} for price, qty in zip(fills['price'].tolist(), fills['qty'].tolist())]
             
         print(f"Processed {len(processed_fills)} valid ZN future fills")
         return processed_fills
@@ -257,31 +264,9 @@ def load_actant_zn_fills_from_db(db_filepath, table_name):
             
         print(f"Found {len(zn_future_fills)} ZN future fills in database")
         
-        # Process each fill
-        processed_fills = []
-        for _, row in zn_future_fills.iterrows():
-            # Convert price from TT special format to decimal
-            price_str = row.get('PRICE_TODAY')
-            price = convert_tt_special_format_to_decimal(price_str)
-            
-            if price is None:
-                print(f"Skipping fill with invalid price: {price_str}")
-                continue
-                
-            # Get quantity and adjust sign based on long/short
-            quantity = float(row.get('QUANTITY', 0))
-            if pd.isna(quantity) or quantity == 0:
-                print(f"Skipping fill with invalid quantity: {quantity}")
-                continue
-                
-            side = row.get('LONG_SHORT', '')
-            if side == 'S':  # Short position
-                quantity = -quantity
-            
-            processed_fills.append({
-                'price': price,
-                'qty': int(quantity)  # Ensure quantity is an integer
-            })
+        # Parse prices column-wise; invalid prices and zero quantities are dropped
+        fills = zn_future_fills_from_frame(zn_future_fills)
+        processed_fills = [{'price': price, 'qty': qty} for price, qty in zip(fills['price'].tolist(), fills['qty'].tolist())]
             
         print(f"Processed {len(processed_fills)} valid ZN future fills from database")
         return processed_fills
@@ -305,67 +290,287 @@ def calculate_baseline_from_actant_fills(actant_fills, spot_decimal_price):
         print("No fills or invalid spot price - using zero baseline")
         return {'base_pos': 0, 'base_pnl': 0.0}
 
-    # Sort fills by price (ascending) to process them in sequence
-    sorted_fills = sorted(actant_fills, key=lambda x: x['price'])
+    prices = np.array([fill['price'] for fill in actant_fills], dtype=float)
+    quantities = np.array([fill['qty'] for fill in actant_fills], dtype=np.int64)
+    return calculate_baseline_from_fill_arrays(prices, quantities, spot_decimal_price)
+
+def calculate_baseline_from_fill_arrays(prices, quantities, spot_decimal_price):
+    """
+    Calculate baseline position and P&L at spot from fill price/quantity arrays.
     
-    current_position = 0
-    realized_pnl = 0.0
-    
-    # Initialize evaluation price with the first fill price
-    if sorted_fills:
-        current_eval_price = sorted_fills[0]['price']
-    else:
-        return {'base_pos': 0, 'base_pnl': 0.0}
+    Fills are walked in price order with cumulative sums (see
+    calculate_baseline_vectorized); results match the former per-fill loop exactly.
     
+    Args:
+        prices (np.ndarray): Fill prices in decimal format
+        quantities (np.ndarray): Signed fill quantities
+        spot_decimal_price (float): Current spot price in decimal format
+        
+    Returns:
+        dict: Dictionary with 'base_pos' and 'base_pnl' keys
+    """
     print("\n--- Baseline P&L Calculation from Actant Fills ---")
-    print(f"Starting price (first fill): {decimal_to_tt_bond_format(current_eval_price)} ({current_eval_price})")
+    if len(prices):
+        print(f"Starting price (lowest fill): {decimal_to_tt_bond_format(float(np.min(prices)))}, fills: {len(prices)}")
     print(f"Target spot price: {decimal_to_tt_bond_format(spot_decimal_price)} ({spot_decimal_price})")
+    result = calculate_baseline_vectorized(prices, quantities, spot_decimal_price)
+    print(f"\nBaseline Result: Position = {result['base_pos']}, P&L at spot = ${result['base_pnl']:.2f}")
+    return result
+
+# Actant SOD store: one SQLite connection, incremental loads, cached ZN fills
+_actant_store = None
+_baseline_cache = {'key': None, 'result': None}
+
+def get_actant_store():
+    """Return the shared Actant SOD store, creating it on first use."""
+    global _actant_store
+    if _actant_store is None:
+        _actant_store = ActantSODStore(ACTANT_DB_FILEPATH, ACTANT_TABLE_NAME)
+    return _actant_store
+
+def get_actant_baseline(spot_decimal_price):
+    """
+    Return the baseline position and P&L at spot from the Actant SOD fills.
+
+    Syncs the SOD CSV into the store (a no-op when the file is unchanged) and
+    reuses the previous baseline while neither the fills nor spot changed.
+    Falls back to reading the CSV directly if the store cannot be used.
+
+    Args:
+        spot_decimal_price (float): Current spot price in decimal format
+
+    Returns:
+        dict or None: {'base_pos', 'base_pnl'}, or None without spot or fills
+    """
+    if spot_decimal_price is None:
+        return None
     
-    for fill in sorted_fills:
-        fill_price = fill['price']
-        fill_qty = fill['qty']
-        
-        # P&L from price movement with current position
-        price_movement = fill_price - current_eval_price
-        if abs(price_movement) > 0.000001:  # Avoid floating point comparison issues
-            bp_movement = price_movement / BP_DECIMAL_PRICE_CHANGE
-            pnl_increment = bp_movement * DOLLARS_PER_BP * current_position
-            realized_pnl += pnl_increment
-            
-            print(f"\nPosition before fill: {current_position}")
-            print(f"Price movement: {current_eval_price} to {fill_price} = {price_movement:.7f}")
-            print(f"BP movement: {price_movement:.7f} / {BP_DECIMAL_PRICE_CHANGE} = {bp_movement:.3f} BPs")
-            print(f"P&L increment: {bp_movement:.3f} BPs * ${DOLLARS_PER_BP}/BP * {current_position} = ${pnl_increment:.2f}")
-            print(f"Running P&L: ${realized_pnl:.2f}")
-        
-        # Update position with current fill
-        current_position += fill_qty
-        print(f"Fill executed: {'BUY' if fill_qty > 0 else 'SELL'} {abs(fill_qty)} @ {decimal_to_tt_bond_format(fill_price)}")
-        print(f"New position after fill: {current_position}")
-        
-        # Update evaluation price for next iteration
-        current_eval_price = fill_price
-    
-    # Calculate P&L adjustment from last fill to spot price
-    price_movement_to_spot = spot_decimal_price - current_eval_price
-    if abs(price_movement_to_spot) > 0.000001:  # Avoid floating point comparison issues
-        bp_movement_to_spot = price_movement_to_spot / BP_DECIMAL_PRICE_CHANGE
-        pnl_increment_to_spot = bp_movement_to_spot * DOLLARS_PER_BP * current_position
-        realized_pnl += pnl_increment_to_spot
-        
-        print(f"\nFinal position: {current_position}")
-        print(f"Price movement to spot: {current_eval_price} to {spot_decimal_price} = {price_movement_to_spot:.7f}")
-        print(f"BP movement: {price_movement_to_spot:.7f} / {BP_DECIMAL_PRICE_CHANGE} = {bp_movement_to_spot:.3f} BPs")
-        print(f"P&L increment to spot: {bp_movement_to_spot:.3f} BPs * ${DOLLARS_PER_BP}/BP * {current_position} = ${pnl_increment_to_spot:.2f}")
-        print(f"Final P&L at spot: ${realized_pnl:.2f}")
+    try:
+        store = get_actant_store()
+        if os.path.exists(ACTANT_CSV_FILE):
+            store.sync(ACTANT_CSV_FILE)
+        else:
+            print(f"Actant CSV file not found: {ACTANT_CSV_FILE}")
+        cache_key = (store.data_version, spot_decimal_price)
+        if _baseline_cache['key'] == cache_key:
+            return _baseline_cache['result']
+        fills = store.zn_future_fills()
+    except Exception as e:
+        print(f"Error loading Actant SOD store: {e}, falling back to direct CSV reading")
+        cache_key = None
+        fills = zn_future_fills_from_frame(pd.read_csv(ACTANT_CSV_FILE)) if os.path.exists(ACTANT_CSV_FILE) else {'price': []}
     
-    result = {
-        'base_pos': current_position,
-        'base_pnl': round(realized_pnl, 2)
-    }
-    print(f"\nBaseline Result: Position = {result['base_pos']}, P&L at spot = ${result['base_pnl']:.2f}")
+    print(f"Loaded {len(fills['price'])} Actant ZN fills")
+    result = calculate_baseline_from_fill_arrays(fills['price'], fills['qty'], spot_decimal_price) if len(fills['price']) else None
+    _baseline_cache['key'], _baseline_cache['result'] = cache_key, result
     return result
 
+def fetch_working_orders():
+    """
+    Fetch the raw working orders list from the mock file or the TT REST API.
+
+    Runs on the background orders poller thread, never inside a Dash callback.
+
+    Returns:
+        list: Raw order dictionaries as returned by TT
+
+    Raises:
+        Exception: If the token cannot be acquired or the request fails
+    """
+    if USE_MOCK_DATA:
+        with open(MOCK_DATA_FILE, 'r') as f:
+            api_response = json.load(f)
+        orders_data = api_response.get('orders', []) if isinstance(api_response, dict) else []
+        if not orders_data and isinstance(api_response, list): # Handle if root is a list
+            orders_data = api_response
+        return orders_data
+
+    token_manager = TTTokenManager(
+        api_key=TT_API_KEY if USE_MOCK_DATA else TT_SIM_API_KEY,
+        api_secret=TT_API_SECRET if USE_MOCK_DATA else TT_SIM_API_SECRET,
+        app_name=APP_NAME,
+        company_name=COMPANY_NAME,
+        environment=ENVIRONMENT,
+        token_file_base=TOKEN_FILE
+    )
+    token = token_manager.get_token()
+    if not token:
+        raise RuntimeError("Failed to acquire TT API token.")
+
+    service = "ttledger"
+    endpoint = "/orders" # Fetches working orders by default
+    url = f"{TT_API_BASE_URL}/{service}/{token_manager.env_path_segment}{endpoint}"
+    params = {"requestId": token_manager.create_request_id()} # For now, get all working orders
+    headers = {
+        "x-api-key": token_manager.api_key,
+        "accept": "application/json",
+        "Authorization": f"Bearer {token}"
+    }
+
+    response = requests.get(url, headers=headers, params=params, timeout=30)
+    response.raise_for_status()
+
+    api_response = response.json()
+    orders_data = api_response.get('orders', []) if isinstance(api_response, dict) else []
+    if not orders_data and isinstance(api_response, list): orders_data = api_response
+    return orders_data
+
+# Background poller holding the latest working-orders snapshot for the callbacks
+orders_poller = WorkingOrdersPoller(fetch_working_orders, interval=ORDERS_POLL_INTERVAL_SECONDS)
+
+def get_orders_snapshot():
+    """
+    Return the cached working-orders snapshot, starting the poller on first use.
+
+    The very first call polls synchronously so the initial ladder is not empty;
+    every later call is a pure in-memory read.
+    """
+    if orders_poller.snapshot()['last_poll_time'] is None:
+        orders_poller.poll_once()
+    orders_poller.start()
+    return orders_poller.snapshot()
+
+def apply_order_level_changes(table_data, order_levels, changed_prices):
+    """
+    Refresh the working quantity/side of only the ladder rows whose price changed.
+
+    Args:
+        table_data (list): Current ladder rows (each with 'decimal_price_val')
+        order_levels (dict): Snapshot price level -> {'qty', 'side'}
+        changed_prices (set): Prices touched since the rendered snapshot version
+
+    Returns:
+        list or None: Updated rows, or None if a changed price falls outside the
+                      current ladder and a full rebuild is required
+    """
+    rows_by_tick = {
+        row.get('tick', price_to_tick(row['decimal_price_val'])): i
+        for i, row in enumerate(table_data) if row.get('decimal_price_val') is not None
+    }
+    if not rows_by_tick:
+        return None
+    min_tick, max_tick = min(rows_by_tick), max(rows_by_tick)
+
+    # Off-grid orders never match a ladder level, like in bucket_orders_by_tick
+    levels_by_tick = {}
+    for price, level in order_levels.items():
+        tick = price_to_tick_exact(price)
+        if tick is not None:
+            levels_by_tick[tick] = level
+    output_data = list(table_data)
+    for price in changed_prices:
+        tick = price_to_tick_exact(price)
+        if tick is None:
+            continue
+        # Rows at the padded edges (or beyond) change the ladder range itself
+        if not (min_tick < tick < max_tick):
+            return None
+        i = rows_by_tick[tick]
+        level = levels_by_tick.get(tick)
+        row = dict(output_data[i])
+        row['my_qty'] = int(level['qty']) if level else ""
+        row['working_qty_side'] = level['side'] if level else ""
+        output_data[i] = row
+    print(f"Refreshed {len(changed_prices)} changed ladder rows from orders snapshot")
+    return output_data
+
+def spot_within_ladder(table_data, spot_price_data):
+    """
+    Check that the ladder already has spot-based projections and that spot lies inside it.
+
+    Rows built before any spot was known carry no 'projected_pnl', and a spot
+    outside the rendered levels cannot be shown, so both need a full rebuild.
+    """
+    spot_decimal_price = spot_price_data.get('decimal_price')
+    if spot_decimal_price is None or 'projected_pnl' not in table_data[0]:
+        return False
+    prices = [row['decimal_price_val'] for row in table_data if row.get('decimal_price_val') is not None]
+    return bool(prices) and min(prices) <= spot_decimal_price <= max(prices)
+
+# Memoized ladders: (orders version, spot half-tick, base_pos, base_pnl) -> rows
+_ladder_cache = OrderedDict()
+
+def generate_ladder_rows(orders_snapshot, spot_price_data, baseline):
+    """
+    Build the full ladder for an orders snapshot, spot price and baseline, memoized.
+
+    The ladder only depends on these three inputs, so a refresh that does not
+    move any of them is served from the cache. Spot is keyed at half-tick
+    (1/128) resolution, the grid TT and Pricing Monkey prices sit on.
+
+    Args:
+        orders_snapshot (dict): Snapshot from the working-orders poller
+        spot_price_data (dict): Spot price data from spot-price-store (may be None)
+        baseline (dict): Baseline {'base_pos', 'base_pnl'} from Actant fills
+
+    Returns:
+        list: Ladder rows (highest price first), empty if there is no price to build around
+    """
+    spot_decimal_val = spot_price_data.get('decimal_price') if spot_price_data else None
+    spot_key = int(round(spot_decimal_val * TICKS_PER_POINT * 2)) if spot_decimal_val is not None else None
+    cache_key = (orders_snapshot['version'], spot_key, baseline['base_pos'], baseline['base_pnl'])
+    cached_rows = _ladder_cache.get(cache_key)
+    if cached_rows is not None:
+        _ladder_cache.move_to_end(cache_key)
+        print(f"Ladder cache hit for orders v{cache_key[0]}, spot key {spot_key}")
+        return cached_rows
+
+    # --- Overall raw min/max prices from orders and spot ---
+    raw_prices = [order['price'] for order in orders_snapshot['orders'].values()]
+    if spot_decimal_val is not None:
+        raw_prices.append(spot_decimal_val)
+    if not raw_prices:
+        return []
+    print(f"Overall raw min/max before rounding: {min(raw_prices)}/{max(raw_prices)}")
+
+    # --- Ladder range as integer tick indices (1/64ths), padded one level each side ---
+    ladder_min_tick, ladder_max_tick = ladder_tick_range(min(raw_prices), max(raw_prices))
+    num_levels = ladder_max_tick - ladder_min_tick + 1
+    print(f"Final Ladder Price Range: {decimal_to_tt_bond_format(tick_to_price(ladder_min_tick))} to {decimal_to_tt_bond_format(tick_to_price(ladder_max_tick))}, Levels: {num_levels}")
+
+    # Orders are bucketed by tick once; each level is then a direct lookup.
+    # If multiple orders share a price level, the side of the first one is used.
+    ladder_rows = build_ladder_rows(list(orders_snapshot['orders'].values()), ladder_min_tick, ladder_max_tick)
+    if spot_decimal_val is not None:
+        ladder_rows = update_data_with_spot_price(
+            ladder_rows, spot_price_data,
+            base_position=baseline['base_pos'], base_pnl=baseline['base_pnl']
+        )
+
+    _ladder_cache[cache_key] = ladder_rows
+    if len(_ladder_cache) > LADDER_CACHE_SIZE:
+        _ladder_cache.popitem(last=False)
+    return ladder_rows
+
+def patch_ladder_rows(current_rows, new_rows):
+    """
+    Express a ladder refresh as a Dash Patch of only the changed row fields.
+
+    Args:
+        current_rows (list): Rows currently rendered in the DataTable
+        new_rows (list): Freshly computed rows
+
+    Returns:
+        Patch, list or dash.no_update: A Patch when the ladder keeps the same
+            levels, the full row list when the levels themselves changed, and
+            no_update when nothing changed
+    """
+    if not current_rows or len(current_rows) != len(new_rows) or \
+       any(old.get('tick') != new.get('tick') for old, new in zip(current_rows, new_rows)):
+        return new_rows
+
+    patch = Patch()
+    changed_fields = 0
+    for i, (old, new) in enumerate(zip(current_rows, new_rows)):
+        for key, value in new.items():
+            if old.get(key) != value:
+                patch[i][key] = value
+                changed_fields += 1
+    if not changed_fields:
+        return dash.no_update
+    print(f"Patching {changed_fields} ladder fields instead of resending {len(new_rows)} rows")
+    return patch
+
 # Initialize mock spot price by parsing the string format
 MOCK_SPOT_DECIMAL_PRICE, MOCK_SPOT_SPECIAL_STRING_PRICE = parse_and_convert_pm_price(MOCK_SPOT_PRICE_STR)
 if MOCK_SPOT_DECIMAL_PRICE is None:
@@ -373,6 +578,81 @@ if MOCK_SPOT_DECIMAL_PRICE is None:
 else:
     print(f"Initialized Mock Spot Price: '{MOCK_SPOT_SPECIAL_STRING_PRICE}' (Decimal: {MOCK_SPOT_DECIMAL_PRICE})")
 
+# Static conditional styles for the ladder. The spot highlight is added on top of these
+# by a clientside callback so a spot move never re-sends rows just to restyle them.
+LADDER_STYLE_DATA_CONDITIONAL = [
+    {
+        'if': {
+            'filter_query': '{working_qty_side} = "1"', # Buy side
+            'column_id': 'my_qty'
+        },
+        'color': '#1E88E5'  # Blue
+    },
+    {
+        'if': {
+            'filter_query': '{working_qty_side} = "2"', # Sell side
+            'column_id': 'my_qty'
+        },
+        'color': '#E53935'  # Red
+    },
+    {
+        'if': {
+            'filter_query': '{projected_pnl} > 0',
+            'column_id': 'projected_pnl'
+        },
+        'color': '#4CAF50'  # Green for positive PnL
+    },
+    {
+        'if': {
+            'filter_query': '{projected_pnl} < 0',
+            'column_id': 'projected_pnl'
+        },
+        'color': '#F44336'  # Red for negative PnL
+    },
+    {
+        'if': {
+            'filter_query': '{position_debug} > 0',
+            'column_id': 'position_debug'
+        },
+        'color': '#1E88E5'  # Blue for long position
+    },
+    {
+        'if': {
+            'filter_query': '{position_debug} < 0',
+            'column_id': 'position_debug'
+        },
+        'color': '#E53935'  # Red for short position
+    },
+    {
+        'if': {
+            'filter_query': '{risk} > 0',
+            'column_id': 'risk'
+        },
+        'color': '#1E88E5'  # Blue for long position (risk)
+    },
+    {
+        'if': {
+            'filter_query': '{risk} < 0',
+            'column_id': 'risk'
+        },
+        'color': '#E53935'  # Red for short position (risk)
+    },
+    {
+        'if': {
+            'filter_query': '{breakeven} > 0',
+            'column_id': 'breakeven'
+        },
+        'color': '#4CAF50'  # Green for positive breakeven
+    },
+    {
+        'if': {
+            'filter_query': '{breakeven} < 0',
+            'column_id': 'breakeven'
+        },
+        'color': '#F44336'  # Red for negative breakeven
+    }
+]
+
 # --- App Layout ---
 app.layout = dbc.Container([
     dcc.Store(id=STORE_ID, data={'initial_load_trigger': True}), # Trigger initial load
@@ -384,6 +664,13 @@ app.layout = dbc.Container([
         'base_pos': 0,
         'base_pnl': 0.0
     }), # Store for baseline position/P&L from Actant fills
+    dcc.Store(id=ORDERS_VERSION_STORE_ID, data={'version': None}), # Orders snapshot version shown in the ladder
+    dcc.Interval(id=ORDERS_INTERVAL_ID, interval=int(ORDERS_POLL_INTERVAL_SECONDS * 1000)), # Checks the cached snapshot, no network call
+    dcc.Interval(id=SPOT_INTERVAL_ID, interval=int(SPOT_REFRESH_INTERVAL_SECONDS * 1000)), # Automatic spot refresh
+    dcc.Store(id=LADDER_STYLES_STORE_ID, data=[
+        *get_datatable_default_styles(default_theme)["style_data_conditional"],
+        *LADDER_STYLE_DATA_CONDITIONAL
+    ]), # Same base styles the rendered DataTable starts with
     html.H2("Scenario Ladder", style={"textAlign": "center", "color": "#18F0C3", "marginBottom": "20px"}),
     dbc.Row([
         dbc.Col(
@@ -422,100 +709,7 @@ app.layout = dbc.Container([
                     'backgroundColor': '#333333', 'color': 'white', 'height': '28px',
                     'padding': '0px', 'textAlign': 'center', 'fontWeight': 'bold', 'border': '1px solid #444'
                 },
-                style_data_conditional=[
-                    {
-                        'if': {
-                            'filter_query': '{working_qty_side} = "1"', # Buy side
-                            'column_id': 'my_qty'
-                        },
-                        'color': '#1E88E5'  # Blue
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{working_qty_side} = "2"', # Sell side
-                            'column_id': 'my_qty'
-                        },
-                        'color': '#E53935'  # Red
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{is_exact_spot} = 1',
-                            'column_id': 'price'
-                        },
-                        'backgroundColor': '#228B22',  # ForestGreen
-                        'color': 'white'
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{is_below_spot} = 1',
-                            'column_id': 'price'
-                        },
-                        'borderBottom': '2px solid #228B22'  # Green bottom border
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{is_above_spot} = 1',
-                            'column_id': 'price'
-                        },
-                        'borderTop': '2px solid #228B22'  # Green top border
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{projected_pnl} > 0',
-                            'column_id': 'projected_pnl'
-                        },
-                        'color': '#4CAF50'  # Green for positive PnL
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{projected_pnl} < 0',
-                            'column_id': 'projected_pnl'
-                        },
-                        'color': '#F44336'  # Red for negative PnL
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{position_debug} > 0',
-                            'column_id': 'position_debug'
-                        },
-                        'color': '#1E88E5'  # Blue for long position
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{position_debug} < 0',
-                            'column_id': 'position_debug'
-                        },
-                        'color': '#E53935'  # Red for short position
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{risk} > 0',
-                            'column_id': 'risk'
-                        },
-                        'color': '#1E88E5'  # Blue for long position (risk)
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{risk} < 0',
-                            'column_id': 'risk'
-                        },
-                        'color': '#E53935'  # Red for short position (risk)
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{breakeven} > 0',
-                            'column_id': 'breakeven'
-                        },
-                        'color': '#4CAF50'  # Green for positive breakeven
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{breakeven} < 0',
-                            'column_id': 'breakeven'
-                        },
-                        'color': '#F44336'  # Red for negative breakeven
-                    }
-                ],
+                style_data_conditional=LADDER_STYLE_DATA_CONDITIONAL,
                 page_size=100 # Adjust as needed, or make it dynamic
             ).render()
                 ], # Close the Grid children list
@@ -528,6 +722,38 @@ app.layout = dbc.Container([
 
 print("Dash layout defined for Scenario Ladder")
 
+# --- Clientside Callback for the Spot Highlight ---
+# Runs in the browser: marks the spot row (exact match) or the top border of
+# the tick just below a midpoint spot, keyed on the integer 'tick' column.
+app.clientside_callback(
+    """
+    function(spotData, baseStyles) {
+        var styles = (baseStyles || []).slice();
+        if (!spotData || spotData.decimal_price === null || spotData.decimal_price === undefined) {
+            return styles;
+        }
+        var scaled = spotData.decimal_price * %d;
+        var spotTick = Math.round(scaled);
+        if (Math.abs(scaled - spotTick) < 0.01) {
+            styles.push({
+                'if': {'filter_query': '{tick} = ' + spotTick, 'column_id': 'price'},
+                'backgroundColor': '#228B22',  // ForestGreen
+                'color': 'white'
+            });
+        } else {
+            styles.push({
+                'if': {'filter_query': '{tick} = ' + Math.floor(scaled), 'column_id': 'price'},
+                'borderTop': '2px solid #228B22'  // Green top border
+            });
+        }
+        return styles;
+    }
+    """ % TICKS_PER_POINT,
+    Output(DATATABLE_ID, 'style_data_conditional'),
+    Input('spot-price-store', 'data'),
+    State(LADDER_STYLES_STORE_ID, 'data')
+)
+
 # --- Callback to Fetch and Process Orders ---
 @app.callback(
     Output(DATATABLE_ID, 'data'),
@@ -536,13 +762,16 @@ print("Dash layout defined for Scenario Ladder")
     Output(MESSAGE_DIV_ID, 'style'),
     Output('baseline-store', 'data'),
     Output('baseline-display', 'children'),
+    Output(ORDERS_VERSION_STORE_ID, 'data'),
     Input(STORE_ID, 'data'),
     Input('spot-price-store', 'data'), # Add spot price store as input
     Input('refresh-data-button', 'n_clicks'), # Add refresh button as input
+    Input(ORDERS_INTERVAL_ID, 'n_intervals'), # Periodic check of the cached orders snapshot
     State(DATATABLE_ID, 'data'),      # Add State for current table data
-    State('baseline-store', 'data')   # Add State for baseline data
+    State('baseline-store', 'data'),  # Add State for baseline data
+    State(ORDERS_VERSION_STORE_ID, 'data') # Orders snapshot version currently rendered
 )
-def load_and_display_orders(store_data, spot_price_data, n_clicks, current_table_data, baseline_data):
+def load_and_display_orders(store_data, spot_price_data, n_clicks, n_intervals, current_table_data, baseline_data, orders_version_data):
     print("Callback triggered: load_and_display_orders")
     triggered_input_info = dash.callback_context.triggered[0]
     context_id = triggered_input_info['prop_id']
@@ -552,6 +781,7 @@ def load_and_display_orders(store_data, spot_price_data, n_clicks, current_table
     # Note: When app first loads, context_id is '.' with no specific component
     is_initial_app_load = (context_id == '.')
     is_store_trigger = (context_id == f'{STORE_ID}.data')
+    is_orders_tick = (context_id == f'{ORDERS_INTERVAL_ID}.n_intervals')
     
     # Full refresh needed if:
     # - Button clicked, OR
@@ -563,28 +793,54 @@ def load_and_display_orders(store_data, spot_price_data, n_clicks, current_table
         (is_store_trigger and store_data and store_data.get('initial_load_trigger'))
     )
     
+    # Orders come from the background poller's cached snapshot - no network call here
+    orders_snapshot = get_orders_snapshot()
+    orders_version = orders_snapshot['version']
+    rendered_version = orders_version_data.get('version') if orders_version_data else None
+    orders_version_out = {'version': orders_version}
+    
+    # 1b. Orders tick: nothing to do unless the snapshot moved past the rendered version
+    if is_orders_tick:
+        if rendered_version is None or orders_version == rendered_version:
+            raise PreventUpdate
+        print(f"Orders snapshot changed: v{rendered_version} -> v{orders_version}")
+        changed_prices = orders_poller.changed_prices_since(rendered_version)
+        if current_table_data and changed_prices is not None:
+            updated_rows = apply_order_level_changes(current_table_data, orders_snapshot['levels'], changed_prices)
+            if updated_rows is not None:
+                base_pos = baseline_data.get('base_pos', 0) if baseline_data else 0
+                base_pnl = baseline_data.get('base_pnl', 0.0) if baseline_data else 0.0
+                if spot_price_data and spot_price_data.get('decimal_price') is not None:
+                    updated_rows = update_data_with_spot_price(updated_rows, spot_price_data, base_pos, base_pnl)
+                return patch_ladder_rows(current_table_data, updated_rows), dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, orders_version_out
+        # Changes reach beyond the current ladder range - rebuild it from the snapshot
+        full_refresh_needed = True
+    
     # Log the current trigger context for debugging
     print(f"Trigger context: '{context_id}', Initial load: {is_initial_app_load}, Full refresh needed: {full_refresh_needed}")
     
     # 2. If triggered only by spot price update, just update spot indicators on existing data
     if context_id == 'spot-price-store.data' and spot_price_data and not full_refresh_needed:
         # Use current_table_data from State
-        if current_table_data and len(current_table_data) > 0:
+        if current_table_data and len(current_table_data) > 0 and spot_within_ladder(current_table_data, spot_price_data):
             print(f"Spot price update only. current_table_data has {len(current_table_data)} rows.")
             # Use existing baseline data if available
             base_pos = baseline_data.get('base_pos', 0) if baseline_data else 0
             base_pnl = baseline_data.get('base_pnl', 0.0) if baseline_data else 0.0
             updated_data = update_data_with_spot_price(current_table_data, spot_price_data, base_pos, base_pnl)
-            # No need to update baseline on spot price change only
-            return updated_data, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
+            # No need to update baseline on spot price change only; send only the changed fields
+            return patch_ladder_rows(current_table_data, updated_data), dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
+        elif spot_price_data.get('decimal_price') is not None:
+            # First spot for this ladder, or spot moved off its range: rebuild around it
+            print("Spot price update needs a full ladder rebuild (empty ladder, first spot or spot outside range).")
+            full_refresh_needed = True
         else:
-            # Table not populated yet, or empty. Let the full load logic run if initial_load_trigger is set.
-            print("Spot price update, but current_table_data is empty. Letting full load proceed.")
+            print("Spot price update without a price, nothing to refresh.")
     
     # If not an initial load or refresh button click, don't proceed with full refresh
     if not full_refresh_needed:
         print("Callback skipped: not triggered by initial load or refresh button")
-        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
         
     # Log the trigger
     if context_id == 'refresh-data-button.n_clicks':
@@ -593,11 +849,14 @@ def load_and_display_orders(store_data, spot_price_data, n_clicks, current_table
         print("Full refresh triggered by initial app load (context_id='.')")
     elif is_store_trigger:
         print(f"Full refresh triggered by store update with initial_load_trigger={store_data.get('initial_load_trigger')}")
+    elif is_orders_tick:
+        print(f"Full refresh triggered by orders snapshot v{orders_version}")
+    elif context_id == 'spot-price-store.data':
+        print("Full refresh triggered by spot price update")
     else:
         print(f"Full refresh triggered by unknown source: {context_id}")
 
-    orders_data = []
-    error_message_str = ""
+    error_message_str = orders_snapshot['error']
 
     # --- Extract Spot Price Consistently (Step 3a of Plan v2) ---
     spot_decimal_val = None
@@ -610,95 +869,12 @@ def load_and_display_orders(store_data, spot_price_data, n_clicks, current_table
     else:
         print("spot_price_data is None or does not contain 'decimal_price'.")
 
-    if USE_MOCK_DATA:
-        print(f"Using mock data from: {MOCK_DATA_FILE}")
-        try:
-            with open(MOCK_DATA_FILE, 'r') as f:
-                api_response = json.load(f)
-            orders_data = api_response.get('orders', [])
-            if not orders_data and isinstance(api_response, list): # Handle if root is a list
-                 orders_data = api_response
-            print(f"Loaded {len(orders_data)} orders from mock file.")
-        except Exception as e:
-            error_message_str = f"Error loading mock data: {e}"
-            print(error_message_str)
-            orders_data = [] # Ensure it's a list
-    else:
-        print("Fetching live data from TT API...")
-        try:
-            token_manager = TTTokenManager(
-                api_key=TT_API_KEY if USE_MOCK_DATA else TT_SIM_API_KEY,
-                api_secret=TT_API_SECRET if USE_MOCK_DATA else TT_SIM_API_SECRET,
-                app_name=APP_NAME,
-                company_name=COMPANY_NAME,
-                environment=ENVIRONMENT,
-                token_file_base=TOKEN_FILE
-            )
-            token = token_manager.get_token()
-            if not token:
-                error_message_str = "Failed to acquire TT API token."
-                print(error_message_str)
-            else:
-                service = "ttledger"
-                endpoint = "/orders" # Fetches working orders by default
-                url = f"{TT_API_BASE_URL}/{service}/{token_manager.env_path_segment}{endpoint}"
-                
-                request_id = token_manager.create_request_id()
-                # Potentially add instrumentId filter here if needed, e.g. from tt_config or a new constant
-                # params = {"requestId": request_id, "instrumentId": "YOUR_INSTRUMENT_ID_HERE"} 
-                params = {"requestId": request_id} # For now, get all working orders
-                
-                headers = {
-                    "x-api-key": token_manager.api_key,
-                    "accept": "application/json",
-                    "Authorization": f"Bearer {token}"
-                }
-
-                print(f"Making API request to {url} with params: {params}")
-                response = requests.get(url, headers=headers, params=params, timeout=30)
-                response.raise_for_status()
-                
-                api_response = response.json()
-                orders_data = api_response.get('orders', [])
-                if not orders_data and isinstance(api_response, list): orders_data = api_response
-                print(f"Received {len(orders_data)} orders from API.")
-                
-                # Optionally save the live response for inspection
-                # live_response_path = os.path.join(ladderTest_dir, "live_working_orders_response.json")
-                # with open(live_response_path, 'w') as f:
-                #     json.dump(api_response, f, indent=2)
-                # print(f"Live response saved to {live_response_path}")
-
-        except requests.exceptions.HTTPError as http_err:
-            error_message_str = f"HTTP error fetching orders: {http_err} - {http_err.response.text if http_err.response else 'No response text'}"
-            print(error_message_str)
-        except Exception as e:
-            error_message_str = f"Error fetching live orders: {e}"
-            print(error_message_str)
-        
-        if error_message_str: # If API call failed, ensure orders_data is empty list
-            orders_data = []
-
     # --- Process orders and build ladder ---
     ladder_table_data = []
     
-    # Filter for relevant working orders (status '1') and valid price/qty
-    # The mock data seems to be already filtered for working orders with status '1'
-    processed_orders = []
-    if isinstance(orders_data, list): # Ensure orders_data is a list before iterating
-        for order in orders_data:
-            if isinstance(order, dict) and \
-               order.get('orderStatus') == '1' and \
-               isinstance(order.get('price'), (int, float)) and \
-               isinstance(order.get('leavesQuantity'), (int, float)) and \
-               order.get('leavesQuantity') > 0 and \
-               order.get('side') in ['1', '2']: # Ensure side is valid
-                processed_orders.append({
-                    'price': float(order['price']),
-                    'qty': float(order['leavesQuantity']),
-                    'side': order.get('side') 
-                })
-    print(f"Processed {len(processed_orders)} relevant working orders.")
+    # The snapshot already holds only relevant working orders (status '1', valid price/qty/side)
+    processed_orders = list(orders_snapshot['orders'].values())
+    print(f"Processed {len(processed_orders)} relevant working orders (snapshot v{orders_version}).")
 
     # --- Adjust Early Exit for "No working orders" (Step 3b of Plan v2) ---
     if not processed_orders and not error_message_str and spot_decimal_val is None:
@@ -710,194 +886,59 @@ def load_and_display_orders(store_data, spot_price_data, n_clicks, current_table
         # Use existing baseline_results and baseline_display_text if computed, else defaults
         final_baseline_results = baseline_data if baseline_data else {'base_pos': 0, 'base_pnl': 0.0}
         final_baseline_display_text = "No Actant data available"
-        return [], table_style_hidden, message_text, message_style_visible, final_baseline_results, final_baseline_display_text
+        return [], table_style_hidden, message_text, message_style_visible, final_baseline_results, final_baseline_display_text, orders_version_out
     elif error_message_str and not processed_orders : # Prioritize API/load error message if it exists and no orders processed
         message_text = error_message_str
         print(f"Displaying error: {message_text}")
         message_style_visible = {'textAlign': 'center', 'color': 'red', 'marginBottom': '20px', 'display': 'block'} # Error in red
         table_style_hidden = {'display': 'none'}
-        return [], table_style_hidden, message_text, message_style_visible
+        return [], table_style_hidden, message_text, message_style_visible, dash.no_update, dash.no_update, orders_version_out
     elif not processed_orders and error_message_str: # Should be caught by above, but as a safeguard
         message_text = error_message_str
         print(f"Displaying error (safeguard): {message_text}")
 
     # Process Actant fill data to get baseline position and P&L
-    actant_fills = []
     baseline_results = {'base_pos': 0, 'base_pnl': 0.0}
     baseline_display_text = "No Actant data available"
     
-    try:
-        # Step 1: Check if CSV exists and update the SQLite database
-        if os.path.exists(ACTANT_CSV_FILE):
-            try:
-                # Check if csv_to_sqlite_table function is available
-                if 'csv_to_sqlite_table' in globals() or 'csv_to_sqlite_table' in locals():
-                    print(f"Updating SQLite DB from {ACTANT_CSV_FILE}...")
-                    success = csv_to_sqlite_table(ACTANT_CSV_FILE, ACTANT_DB_FILEPATH, ACTANT_TABLE_NAME)
-                    if success:
-                        print(f"Successfully updated {ACTANT_TABLE_NAME} in {ACTANT_DB_FILEPATH}")
-                    else:
-                        print(f"Failed to update SQLite DB, will try direct CSV reading")
-                        
-                        # Fall back to direct CSV reading if SQLite update fails
-                        if not os.path.exists(ACTANT_DB_FILEPATH):
-                            print(f"SQLite DB not found after update attempt, falling back to direct CSV")
-                            actant_fills = load_actant_zn_fills(ACTANT_CSV_FILE)
-                else:
-                    print("csv_to_sqlite_table function not available, using direct CSV reading")
-                    actant_fills = load_actant_zn_fills(ACTANT_CSV_FILE)
-            except Exception as e:
-                print(f"Error updating SQLite DB: {e}, falling back to direct CSV reading")
-                actant_fills = load_actant_zn_fills(ACTANT_CSV_FILE)
-        else:
-            print(f"Actant CSV file not found: {ACTANT_CSV_FILE}")
-            
-        # Step 2: If no fills loaded yet, try to read from SQLite if the DB file exists
-        if not actant_fills and os.path.exists(ACTANT_DB_FILEPATH):
-            try:
-                print(f"Loading Actant data from SQLite DB {ACTANT_DB_FILEPATH}")
-                actant_fills = load_actant_zn_fills_from_db(ACTANT_DB_FILEPATH, ACTANT_TABLE_NAME)
-            except Exception as e:
-                print(f"Error loading from SQLite DB: {e}")
-                # Already tried or will try direct CSV reading if needed
-            
-        print(f"Loaded {len(actant_fills)} Actant ZN fills")
-            
-        # Step 3: Calculate baseline position and P&L if we have fills and spot price
-        if spot_decimal_val is not None and actant_fills:
-            # Calculate baseline position and P&L
-            baseline_results = calculate_baseline_from_actant_fills(actant_fills, spot_decimal_val)
-                
-            # Prepare display text
-            pos_str = f"Long {baseline_results['base_pos']}" if baseline_results['base_pos'] > 0 else \
-                     f"Short {-baseline_results['base_pos']}" if baseline_results['base_pos'] < 0 else "FLAT"
-            pnl_str = f"${baseline_results['base_pnl']:.2f}"
-            baseline_display_text = f"Current Position: {pos_str}, Realized P&L @ Spot: {pnl_str}"
-            print(f"Baseline from Actant: {baseline_display_text}")
-        else:
-            print("Either spot price or Actant fills not available for baseline calculation")
-    except Exception as e:
-        print(f"Error processing Actant data: {e}")
-        baseline_display_text = f"Error processing Actant data: {str(e)}"
+    if is_orders_tick and baseline_data:
+        # Orders-only rebuild: the baseline depends on Actant fills and spot, not on working orders
+        baseline_results = baseline_data
+        baseline_display_text = dash.no_update
+    else:
+        try:
+            # Incremental SOD load; the baseline is only recomputed when fills or spot changed
+            baseline_results = get_actant_baseline(spot_decimal_val)
+            if baseline_results is not None:
+                # Prepare display text
+                pos_str = f"Long {baseline_results['base_pos']}" if baseline_results['base_pos'] > 0 else \
+                         f"Short {-baseline_results['base_pos']}" if baseline_results['base_pos'] < 0 else "FLAT"
+                pnl_str = f"${baseline_results['base_pnl']:.2f}"
+                baseline_display_text = f"Current Position: {pos_str}, Realized P&L @ Spot: {pnl_str}"
+                print(f"Baseline from Actant: {baseline_display_text}")
+            else:
+                baseline_results = {'base_pos': 0, 'base_pnl': 0.0}
+                print("Either spot price or Actant fills not available for baseline calculation")
+        except Exception as e:
+            print(f"Error processing Actant data: {e}")
+            baseline_display_text = f"Error processing Actant data: {str(e)}"
         
     if processed_orders or spot_decimal_val is not None:
-        # --- Calculate Overall Raw Min/Max Prices (Step 3d of Plan v2) ---
-        current_min_raw_price = None
-        current_max_raw_price = None
-
-        if processed_orders:
-            order_prices = [
-                float(o['price']) for o in processed_orders
-                if isinstance(o.get('price'), (int, float)) and o.get('price') is not None
-            ]
-            if order_prices:  # Ensure list is not empty
-                min_order_val = min(order_prices)
-                max_order_val = max(order_prices)
-                current_min_raw_price = min_order_val
-                current_max_raw_price = max_order_val
-                print(f"Min/Max from orders: {min_order_val}/{max_order_val}")
-
-        if spot_decimal_val is not None:
-            print(f"Considering spot_decimal_val for range: {spot_decimal_val}")
-            if current_min_raw_price is None or spot_decimal_val < current_min_raw_price:
-                current_min_raw_price = spot_decimal_val
-            if current_max_raw_price is None or spot_decimal_val > current_max_raw_price:
-                current_max_raw_price = spot_decimal_val
-        
-        print(f"Overall raw min/max before rounding: {current_min_raw_price}/{current_max_raw_price}")
+        # Memoized on (orders version, spot half-tick, baseline)
+        ladder_table_data = generate_ladder_rows(orders_snapshot, spot_price_data, baseline_results)
 
-        # If current_min_raw_price is still None, means no valid prices from orders and no spot price.
-        # This should ideally not be reached if the parent 'if' condition is robust.
-        # However, if it is, we can't proceed.
-        if current_min_raw_price is None:
+        if not ladder_table_data:
             print("No valid price data (orders or spot) to form ladder. Returning empty.")
             message_text = "No price data available to display ladder."
             message_style_visible = {'textAlign': 'center', 'color': 'orange', 'marginBottom': '20px', 'display': 'block'}
             table_style_hidden = {'display': 'none'}
-            # Use existing baseline_results and baseline_display_text if computed, else defaults
-            final_baseline_results = baseline_results if 'baseline_results' in locals() else {'base_pos': 0, 'base_pnl': 0.0}
-            final_baseline_display_text = baseline_display_text if 'baseline_display_text' in locals() else "No Actant data"
-            return [], table_style_hidden, message_text, message_style_visible, final_baseline_results, final_baseline_display_text
-
-        # Round to nearest tick using current_min_raw_price and current_max_raw_price
-        ladder_min_price = math.floor(current_min_raw_price / PRICE_INCREMENT_DECIMAL) * PRICE_INCREMENT_DECIMAL
-        ladder_max_price = math.ceil(current_max_raw_price / PRICE_INCREMENT_DECIMAL) * PRICE_INCREMENT_DECIMAL
-        
-        print(f"Ladder min/max after initial rounding: {ladder_min_price}/{ladder_max_price}")
-
-        # --- Add Padding (Step 3e of Plan v2) ---
-        ladder_min_price -= PRICE_INCREMENT_DECIMAL
-        ladder_max_price += PRICE_INCREMENT_DECIMAL
-
-        # Re-round for precision after padding
-        ladder_min_price = round(ladder_min_price / PRICE_INCREMENT_DECIMAL) * PRICE_INCREMENT_DECIMAL
-        ladder_max_price = round(ladder_max_price / PRICE_INCREMENT_DECIMAL) * PRICE_INCREMENT_DECIMAL
-        
-        print(f"Ladder min/max after padding and re-rounding: {ladder_min_price}/{ladder_max_price}")
-        
-        # --- Ensure num_levels is Positive (Step 3f of Plan v2) ---
-        num_levels = round((ladder_max_price - ladder_min_price) / PRICE_INCREMENT_DECIMAL) + 1
-        if num_levels <= 0:
-            num_levels = 1 # Ensure at least one level if rounding leads to non-positive
-        
-        print(f"Final Ladder Price Range: {decimal_to_tt_bond_format(ladder_min_price)} to {decimal_to_tt_bond_format(ladder_max_price)}, Levels: {num_levels}")
-
-        current_price_level = ladder_max_price
-        epsilon = PRICE_INCREMENT_DECIMAL / 100.0 # For float comparisons
-        
-        for _ in range(num_levels):
-            formatted_price = decimal_to_tt_bond_format(current_price_level)
-            my_qty_at_level = 0
-            # Determine side for this level. Assumes all orders at one price level have the same side.
-            # If multiple orders at the same price level, the side of the first one encountered will be used.
-            # This should be fine as they are *my* working orders.
-            side_at_level = "" 
-            
-            for order in processed_orders:
-                if abs(order['price'] - current_price_level) < epsilon:
-                    my_qty_at_level += order['qty']
-                    if not side_at_level: # Capture side from the first order matching this price level
-                        side_at_level = order['side']
-            
-            # Create the row data with spot price indicators
-            row_data = {
-                'price': formatted_price,
-                'my_qty': int(my_qty_at_level) if my_qty_at_level > 0 else "", # Show int or empty
-                'working_qty_side': side_at_level if my_qty_at_level > 0 else "", # Add side for styling
-                'decimal_price_val': current_price_level, # Store the decimal price
-                # Spot price indicators (default to 0, handled by update_data_with_spot_price)
-                'is_exact_spot': 0,
-                'is_below_spot': 0,
-                # Spot price indicators (default to 0, handled by update_data_with_spot_price)
-                'is_exact_spot': 0,
-                'is_below_spot': 0,
-                # Position and risk fields (will be calculated in update_data_with_spot_price)
-                'position_debug': 0,
-                'risk': 0,
-                # Breakeven field (will be calculated in update_data_with_spot_price)
-                'breakeven': 0,
-            }
-            
-            ladder_table_data.append(row_data)
-            current_price_level -= PRICE_INCREMENT_DECIMAL
-            # Correct for potential floating point drift by re-calculating based on fixed increment
-            current_price_level = round(current_price_level / PRICE_INCREMENT_DECIMAL) * PRICE_INCREMENT_DECIMAL
-
-        # Apply spot price indicators to the ladder data if spot price is available
-        if spot_price_data and spot_price_data.get('decimal_price') is not None: # Check key existence
-            # Use baseline position and P&L for PnL projections
-            ladder_table_data = update_data_with_spot_price(
-                ladder_table_data, 
-                spot_price_data, # This contains spot_decimal_val
-                base_position=baseline_results['base_pos'],
-                base_pnl=baseline_results['base_pnl']
-            )
+            return [], table_style_hidden, message_text, message_style_visible, baseline_results, baseline_display_text, orders_version_out
         
         print(f"Generated {len(ladder_table_data)} rows for the ladder.")
         message_text = "" # Clear message if table has data
         message_style_hidden = {'display': 'none'}
         table_style_visible = {'display': 'block', 'width': '600px', 'margin': 'auto'} # Ensure table is centered
-        return ladder_table_data, table_style_visible, message_text, message_style_hidden, baseline_results, baseline_display_text
+        return patch_ladder_rows(current_table_data, ladder_table_data), table_style_visible, message_text, message_style_hidden, baseline_results, baseline_display_text, orders_version_out
     else: # Should only be hit if not (processed_orders or spot_decimal_val is not None)
           # This means processed_orders is empty AND spot_decimal_val is None.
           # This case should have been caught by the modified early exit.
@@ -909,100 +950,167 @@ def load_and_display_orders(store_data, spot_price_data, n_clicks, current_table
         empty_baseline = {'base_pos': 0, 'base_pnl': 0.0}
         # If baseline was calculated successfully earlier, use that display
         display_text = baseline_display_text if 'baseline_display_text' in locals() and baseline_display_text else "No position data available"
-        return [], table_style_hidden, message_text, message_style_visible, empty_baseline, display_text
+        return [], table_style_hidden, message_text, message_style_visible, empty_baseline, display_text, orders_version_out
 
 
 
-# --- Callback to Get Spot Price from Pricing Monkey ---
+# --- Spot Price Providers ---
+def read_spot_from_pricing_monkey():
+    """
+    Fetch spot price from Pricing Monkey using UI automation.
+    Opens the Pricing Monkey URL, navigates through the UI using keyboard shortcuts,
+    copies the price from the clipboard, and then closes the browser tab.
+    
+    Takes several seconds and only works on Windows, so it is only used when
+    SPOT_PRICE_SOURCE is 'pricing_monkey' and only on an explicit refresh.
+    
+    Returns:
+        tuple: (decimal_price, special_string_price)
+        
+    Raises:
+        Exception: If the automation fails or the clipboard does not hold a price
+    """
+    # Optional Windows-only dependencies, imported only when this backend is used
+    import webbrowser
+    import pyperclip
+    from pywinauto.keyboard import send_keys
+    
+    # Open the Pricing Monkey URL
+    print(f"Opening URL: {PM_URL}")
+    webbrowser.open(PM_URL, new=2)
+    time.sleep(PM_WAIT_FOR_BROWSER_OPEN)  # Wait for browser to open
+    
+    # Navigate to the target element using keyboard shortcuts
+    print("Pressing TAB 10 times to navigate")
+    send_keys('{TAB 10}', pause=PM_KEY_PRESS_PAUSE, with_spaces=True)
+    time.sleep(PM_WAIT_BETWEEN_ACTIONS)
+    
+    print("Pressing DOWN to select price")
+    send_keys('{DOWN}', pause=PM_KEY_PRESS_PAUSE)
+    time.sleep(PM_WAIT_BETWEEN_ACTIONS)
+    
+    # Copy the value to clipboard
+    print("Copying to clipboard")
+    send_keys('^c', pause=PM_KEY_PRESS_PAUSE)
+    time.sleep(PM_WAIT_FOR_COPY)
+    
+    # Get the clipboard content
+    clipboard_content = pyperclip.paste()
+    print(f"Clipboard content: '{clipboard_content}'")
+    
+    # Close the browser tab
+    print("Closing browser tab")
+    send_keys('^w', pause=PM_KEY_PRESS_PAUSE)
+    time.sleep(PM_WAIT_BETWEEN_ACTIONS)
+    
+    # Process the clipboard content
+    decimal_price, special_string_price = parse_and_convert_pm_price(clipboard_content)
+    if decimal_price is None:
+        raise ValueError(f"Failed to parse price from clipboard: '{clipboard_content}'")
+    return decimal_price, special_string_price
+
+_spot_price_provider = None
+
+def get_spot_price_provider():
+    """
+    Return the configured spot price provider, creating it on first use.
+
+    Mock mode serves the fixed mock spot; otherwise SPOT_PRICE_SOURCE picks the
+    live price feed file ('live_file') or Pricing Monkey ('pricing_monkey').
+    """
+    global _spot_price_provider
+    if _spot_price_provider is None:
+        if USE_MOCK_DATA:
+            _spot_price_provider = InMemorySpotPriceProvider(MOCK_SPOT_DECIMAL_PRICE, MOCK_SPOT_SPECIAL_STRING_PRICE)
+        elif SPOT_PRICE_SOURCE == 'pricing_monkey':
+            _spot_price_provider = CallableSpotPriceProvider(read_spot_from_pricing_monkey, supports_polling=False)
+        else:
+            _spot_price_provider = LivePriceFileProvider(LIVE_PRICE_PATH)
+        print(f"Spot price provider: {type(_spot_price_provider).__name__}")
+    return _spot_price_provider
+
+# --- Callback to Refresh the Spot Price ---
 @app.callback(
     Output('spot-price-store', 'data'),
     Output('spot-price-error-div', 'children'),
     Input('refresh-data-button', 'n_clicks'),
+    Input(SPOT_INTERVAL_ID, 'n_intervals'), # Automatic refresh for providers cheap enough to poll
+    State('spot-price-store', 'data'),
+    State('spot-price-error-div', 'children'),
     prevent_initial_call=True
 )
-def fetch_spot_price_from_pm(n_clicks):
+def refresh_spot_price(n_clicks, n_intervals, current_spot_data, current_error):
     """
-    Fetch spot price from Pricing Monkey using UI automation.
-    Opens the Pricing Monkey URL, navigates through the UI using keyboard shortcuts,
-    copies the price from the clipboard, and then closes the browser tab.
+    Refresh the spot price from the configured provider.
     
-    When USE_MOCK_DATA is True, returns the mock spot price instead of
-    fetching from Pricing Monkey.
+    The store is only written when the price actually moved, so an unchanged
+    spot does not trigger a ladder update. On failure the last good price is
+    kept and the error is shown.
     
     Args:
         n_clicks: Button click count
+        n_intervals: Spot refresh interval count
+        current_spot_data (dict): Spot price currently in spot-price-store
+        current_error (str): Error message currently displayed
         
     Returns:
         dict: Spot price data with decimal and string representations
         str: Error message (if any)
     """
-    if n_clicks is None or n_clicks == 0:
+    context_id = dash.callback_context.triggered[0]['prop_id']
+    is_button_click = (context_id == 'refresh-data-button.n_clicks')
+    if is_button_click and not n_clicks:
         raise PreventUpdate
     
-    # If using mock data, return the mock spot price
-    if USE_MOCK_DATA:
-        print(f"Using mock spot price for refresh (button clicks: {n_clicks})")
-        if MOCK_SPOT_DECIMAL_PRICE is not None:
-            return {
-                'decimal_price': MOCK_SPOT_DECIMAL_PRICE,
-                'special_string_price': MOCK_SPOT_SPECIAL_STRING_PRICE
-            }, ""  # Empty error message
-        else:
-            # This case should ideally not happen if parsing was successful at startup
-            return {
-                'decimal_price': None,
-                'special_string_price': None
-            }, "Error: Mock spot price not initialized."
-    
-    print(f"Fetching spot price from Pricing Monkey ({n_clicks} clicks)")
+    provider = get_spot_price_provider()
+    if not is_button_click and not provider.supports_polling:
+        raise PreventUpdate
     
     try:
-        # Open the Pricing Monkey URL
-        print(f"Opening URL: {PM_URL}")
-        webbrowser.open(PM_URL, new=2)
-        time.sleep(PM_WAIT_FOR_BROWSER_OPEN)  # Wait for browser to open
-        
-        # Navigate to the target element using keyboard shortcuts
-        print("Pressing TAB 10 times to navigate")
-        send_keys('{TAB 10}', pause=PM_KEY_PRESS_PAUSE, with_spaces=True)
-        time.sleep(PM_WAIT_BETWEEN_ACTIONS)
-        
-        print("Pressing DOWN to select price")
-        send_keys('{DOWN}', pause=PM_KEY_PRESS_PAUSE)
-        time.sleep(PM_WAIT_BETWEEN_ACTIONS)
-        
-        # Copy the value to clipboard
-        print("Copying to clipboard")
-        send_keys('^c', pause=PM_KEY_PRESS_PAUSE)
-        time.sleep(PM_WAIT_FOR_COPY)
-        
-        # Get the clipboard content
-        clipboard_content = pyperclip.paste()
-        print(f"Clipboard content: '{clipboard_content}'")
-        
-        # Close the browser tab
-        print("Closing browser tab")
-        send_keys('^w', pause=PM_KEY_PRESS_PAUSE)
-        time.sleep(PM_WAIT_BETWEEN_ACTIONS)
-        
-        # Process the clipboard content
-        decimal_price, special_string_price = parse_and_convert_pm_price(clipboard_content)
-        
-        if decimal_price is None:
-            error_msg = f"Failed to parse price from clipboard: '{clipboard_content}'"
-            print(error_msg)
-            return {'decimal_price': None, 'special_string_price': None}, error_msg
-        
-        # Return the parsed data
-        return {
-            'decimal_price': decimal_price,
-            'special_string_price': special_string_price
-        }, ""
-        
+        decimal_price, special_string_price = provider.get_spot_price()
     except Exception as e:
         error_msg = f"Error fetching spot price: {str(e)}"
         print(error_msg)
-        return {'decimal_price': None, 'special_string_price': None}, error_msg
+        return dash.no_update, error_msg
+    
+    current_decimal_price = current_spot_data.get('decimal_price') if current_spot_data else None
+    if decimal_price == current_decimal_price:
+        if current_error:
+            return dash.no_update, ""
+        raise PreventUpdate
+    
+    print(f"Spot price updated: '{special_string_price}' (Decimal: {decimal_price})")
+    return {
+        'decimal_price': decimal_price,
+        'special_string_price': special_string_price
+    }, ""
+
+def _project_from_spot(ticks, signed_qty, spot_ticks, base_position, base_pnl):
+    """
+    Project position and P&L level by level, walking away from spot.
+
+    Vectorized with cumulative sums: the position used for the step into a
+    level is the baseline plus all orders filled on previous levels, and the
+    P&L is the baseline plus the cumulative sum of the step increments.
+
+    Price steps are taken in integer ticks (1/64ths) and valued at
+    DOLLARS_PER_TICK, which is exact for on-grid levels.
+
+    Args:
+        ticks (np.ndarray): Level ticks in the direction of travel from spot
+        signed_qty (np.ndarray): Signed working quantity at each level (+buy/-sell)
+        spot_ticks (float): Spot price in ticks (fractional if spot sits between ticks)
+        base_position (int): Position at spot
+        base_pnl (float): P&L at spot
+
+    Returns:
+        tuple: (positions after orders at each level, P&L at each level)
+    """
+    positions_after = base_position + np.cumsum(signed_qty)
+    positions_before = np.concatenate(([base_position], positions_after[:-1]))
+    tick_steps = np.diff(ticks, prepend=spot_ticks)
+    pnl_increments = tick_steps * DOLLARS_PER_TICK * positions_before
+    return positions_after, base_pnl + np.cumsum(pnl_increments)
 
 def update_data_with_spot_price(existing_data, spot_price_data, base_position=0, base_pnl=0.0):
     """
@@ -1012,12 +1120,16 @@ def update_data_with_spot_price(existing_data, spot_price_data, base_position=0,
     Calculates Projected PnL based on:
     1. Starting with baseline position and P&L at the spot price from Actant fills
     2. Accumulating PnL based on position and price changes between consecutive price levels
-    3. PnL at each level = PnL of previous level + (position * price change in basis points * $63)
+    3. PnL at each level = PnL of previous level + (position * price change in basis points * $62.5)
     
     The position_debug field shows the accumulated position AFTER any working orders at that
     price level are executed. The projected_pnl uses the position BEFORE orders at the current
     row are executed (i.e., using the position resulting from all previous fills).
     
+    Both walks (below and above spot) are NumPy cumulative sums over the ladder's
+    integer tick and signed-quantity arrays; spot matching compares ticks exactly.
+    Per-level detail is logged at DEBUG level only.
+    
     Args:
         existing_data (list): Current DataTable data (list of dictionaries, each with 'decimal_price_val')
         spot_price_data (dict): Spot price data from spot-price-store (contains 'decimal_price')
@@ -1028,203 +1140,85 @@ def update_data_with_spot_price(existing_data, spot_price_data, base_position=0,
         list: Updated DataTable data with spot price indicators and PnL values
     """
     if not existing_data or not spot_price_data:
-        print("update_data_with_spot_price: No existing_data or spot_price_data, returning existing.")
+        logger.info("update_data_with_spot_price: No existing_data or spot_price_data, returning existing.")
         return existing_data
     
     spot_decimal_price = spot_price_data.get('decimal_price')
     if spot_decimal_price is None:
-        print("update_data_with_spot_price: spot_decimal_price is None, returning existing.")
+        logger.info("update_data_with_spot_price: spot_decimal_price is None, returning existing.")
         return existing_data
-        
-    print(f"Updating existing data ({len(existing_data)} rows) with spot price: {spot_decimal_price}")
-    # Add logging for spot price in the specific format
-    special_string_spot = spot_price_data.get('special_string_price', '')
-    print(f"\nSpot Price ({special_string_spot}): Decimal = {int(spot_decimal_price)} + {((spot_decimal_price % 1) * 32):.2f}/32 = {spot_decimal_price}")
     
-    # Create a copy of existing data to avoid modifying the original
-    output_data = [row.copy() for row in existing_data]
-
-    # Determine the base tick for the spot price (floor to the nearest tick)
-    epsilon = PRICE_INCREMENT_DECIMAL / 100.0  # For float comparisons
-    base_tick_for_spot_decimal = math.floor(spot_decimal_price / PRICE_INCREMENT_DECIMAL) * PRICE_INCREMENT_DECIMAL
-    base_tick_for_spot_decimal = round(base_tick_for_spot_decimal / PRICE_INCREMENT_DECIMAL) * PRICE_INCREMENT_DECIMAL
-
-    # Check if the spot price is an exact match to its base tick
-    is_spot_exact_tick = abs(spot_decimal_price - base_tick_for_spot_decimal) < epsilon
-
-    print(f"Spot Price: {spot_decimal_price}, Base Tick for Spot: {base_tick_for_spot_decimal}, Is Exact: {is_spot_exact_tick}")
-
-    # Find the pivot index for the spot price (or the closest price below spot)
-    spot_pivot_idx = len(output_data)  # Default to end of list if not found
-    for i, row in enumerate(output_data):
-        row_price = row.get('decimal_price_val')
-        if row_price is None:
-            continue
-        if row_price <= spot_decimal_price:
-            spot_pivot_idx = i
-            break
+    special_string_spot = spot_price_data.get('special_string_price', '')
+    logger.debug(f"Updating existing data ({len(existing_data)} rows) with spot price ({special_string_spot}): {spot_decimal_price}")
     
-    print(f"Spot pivot index: {spot_pivot_idx} out of {len(output_data)} rows")
+    # Copy the priced rows (high to low price) to avoid modifying the original
+    output_data = sorted(
+        (row.copy() for row in existing_data if row.get('decimal_price_val') is not None),
+        key=lambda x: x['decimal_price_val'], reverse=True
+    )
+    if not output_data:
+        return existing_data
     
-    # Reset all indicators and set initial PnL values to 0
-    for row in output_data:
-        row['is_exact_spot'] = 0
-        row['is_below_spot'] = 0
-        row['is_above_spot'] = 0
-        row['projected_pnl'] = 0
-        # Optional: Add a debugging field to see position at each level
-        row['position_debug'] = 0
-        row['risk'] = 0
-        row['breakeven'] = 0
+    ticks = np.array([
+        row['tick'] if row.get('tick') is not None else price_to_tick(row['decimal_price_val'])
+        for row in output_data
+    ], dtype=np.int64)
+    signed_qty = np.array([
+        int(row['my_qty']) * (1 if row.get('working_qty_side') == '1' else -1 if row.get('working_qty_side') == '2' else 0)
+        if row.get('my_qty') not in (None, "") else 0
+        for row in output_data
+    ], dtype=np.int64)
     
-    # Mark the spot price level(s)
-    for row in output_data:
-        row_price = row.get('decimal_price_val')
-        if row_price is None:
-            continue
-
-        # Case 1: Spot price is an exact match for this row's price
-        if abs(row_price - spot_decimal_price) < epsilon:
-            row['is_exact_spot'] = 1
-        # Case 2: This row's price is the base tick for a midpoint spot price
-        elif not is_spot_exact_tick and abs(row_price - base_tick_for_spot_decimal) < epsilon:
-            row['is_above_spot'] = 1  # Spot is above this base tick, mark this row's top border
+    # Spot in ticks: exact when it sits on the 1/64 grid, else floor to the base tick
+    spot_ticks = spot_decimal_price * TICKS_PER_POINT
+    spot_tick = price_to_tick_exact(spot_decimal_price)
+    is_spot_exact_tick = spot_tick is not None
+    base_tick_for_spot = spot_tick if is_spot_exact_tick else math.floor(spot_ticks)
     
-    # ----- NEW IMPLEMENTATION: CUMULATIVE PNL CALCULATION -----
+    # Spot indicators: exact match, or the base tick of a midpoint spot (mark its top border)
+    is_exact_spot = ticks == spot_tick if is_spot_exact_tick else np.zeros(len(ticks), dtype=bool)
+    is_above_spot = (ticks == base_tick_for_spot) & (not is_spot_exact_tick)
     
-    # PASS 1: Calculate positions and PnL's for prices at and below spot
-    current_position = base_position  # Start with baseline position at spot
-    accumulated_pnl = base_pnl  # Start with baseline P&L at spot
-    previous_price = spot_decimal_price
+    # Pivot: first row (from the top) at or below spot
+    spot_pivot_idx = int(np.searchsorted(-ticks, -spot_ticks, side='left'))
+    logger.debug(f"Spot Price: {spot_decimal_price}, Base Tick for Spot: {base_tick_for_spot}, "
+                 f"Is Exact: {is_spot_exact_tick}, Pivot index: {spot_pivot_idx} of {len(output_data)} rows")
     
-    print(f"\n--- P&L Projections with Baseline: Pos={base_position}, PnL=${base_pnl:.2f} ---")
+    positions = np.empty(len(ticks), dtype=np.int64)
+    pnl = np.empty(len(ticks), dtype=float)
     
-    for i in range(spot_pivot_idx, len(output_data)):
-        row = output_data[i]
-        current_price = row.get('decimal_price_val')
-        if current_price is None:
-            continue
-        
-        # Calculate incremental PnL for this step using position BEFORE orders at this level
-        price_diff = current_price - previous_price
-        bp_diff = price_diff / BP_DECIMAL_PRICE_CHANGE
-        pnl_increment = bp_diff * DOLLARS_PER_BP * current_position
-        
-        # Calculate cumulative PnL (previous level PnL + increment)
-        row['projected_pnl'] = round(accumulated_pnl + pnl_increment, 2)
-        
-        # Log detailed PnL calculation for steps with non-zero positions
-        special_string_price = row.get('price', '')
-        special_string_prev_price = decimal_to_tt_bond_format(previous_price) if i > spot_pivot_idx else special_string_spot
-        
-        if current_position != 0:
-            print(f"\n--- PnL Calculation for Level Below Spot ---")
-            print(f"Previous Level: {special_string_prev_price} ({previous_price})")
-            print(f"Current Level: {special_string_price} ({current_price})")
-            print(f"Position for this step: {current_position} contracts")
-            print(f"Price Difference (Current - Previous): {current_price} - {previous_price} = {price_diff:.7f}")
-            print(f"Basis Points Moved in this step: {price_diff:.7f} / {BP_DECIMAL_PRICE_CHANGE} = {bp_diff:.3f} BPs")
-            print(f"PnL Increment for this step: {bp_diff:.3f} BPs * ${DOLLARS_PER_BP}/BP * {current_position} = ${pnl_increment:.2f}")
-            print(f"PnL from Previous Level: ${accumulated_pnl:.2f}")
-            print(f"Total PnL for Current Level: ${accumulated_pnl:.2f} + ${pnl_increment:.2f} = ${row['projected_pnl']}")
-        
-        # Update accumulators for next iteration
-        accumulated_pnl = row['projected_pnl']
-        previous_price = current_price
-        
-        # Update position based on orders at this level
-        qty = row.get('my_qty')
-        side = row.get('working_qty_side')
-        
-        if qty and qty != "":  # If there's a quantity
-            qty = int(qty)
-            if side == '1':  # Buy order
-                current_position += qty
-            elif side == '2':  # Sell order
-                current_position -= qty
-        
-        # Store the position AFTER processing orders at this level
-        row['position_debug'] = current_position
-        # Calculate risk as position multiplied by 15.625
-        row['risk'] = current_position * 15.625
-        
-        # Calculate breakeven as Projected PnL / Risk (showing 0 if either value is 0)
-        if row['projected_pnl'] != 0 and row['risk'] != 0:
-            row['breakeven'] = row['projected_pnl'] / row['risk']
-        else:
-            row['breakeven'] = 0
+    # Walk 1: at and below spot (down the list)
+    positions[spot_pivot_idx:], pnl[spot_pivot_idx:] = _project_from_spot(
+        ticks[spot_pivot_idx:], signed_qty[spot_pivot_idx:], spot_ticks, base_position, base_pnl)
+    # Walk 2: above spot (up the list, so project on the reversed slice)
+    above_positions, above_pnl = _project_from_spot(
+        ticks[:spot_pivot_idx][::-1], signed_qty[:spot_pivot_idx][::-1], spot_ticks, base_position, base_pnl)
+    positions[:spot_pivot_idx] = above_positions[::-1]
+    pnl[:spot_pivot_idx] = above_pnl[::-1]
     
-    # PASS 2: Calculate positions and PnL's for prices above spot
-    current_position = base_position  # Reset to baseline position for above-spot calculation
-    accumulated_pnl = base_pnl  # Reset to baseline P&L
-    previous_price = spot_decimal_price
-    
-    for i in range(spot_pivot_idx - 1, -1, -1):
-        row = output_data[i]
-        current_price = row.get('decimal_price_val')
-        if current_price is None:
-            continue
-        
-        # Calculate incremental PnL for this step using position BEFORE orders at this level
-        price_diff = current_price - previous_price
-        bp_diff = price_diff / BP_DECIMAL_PRICE_CHANGE
-        pnl_increment = bp_diff * DOLLARS_PER_BP * current_position
-        
-        # Calculate cumulative PnL (previous level PnL + increment)
-        row['projected_pnl'] = round(accumulated_pnl + pnl_increment, 2)
-        
-        # Log detailed PnL calculation for steps with non-zero positions
-        special_string_price = row.get('price', '')
-        special_string_prev_price = decimal_to_tt_bond_format(previous_price) if i < spot_pivot_idx - 1 else special_string_spot
-        
-        if current_position != 0:
-            print(f"\n--- PnL Calculation for Level Above Spot ---")
-            print(f"Previous Level: {special_string_prev_price} ({previous_price})")
-            print(f"Current Level: {special_string_price} ({current_price})")
-            print(f"Position for this step: {current_position} contracts")
-            print(f"Price Difference (Current - Previous): {current_price} - {previous_price} = {price_diff:.7f}")
-            print(f"Basis Points Moved in this step: {price_diff:.7f} / {BP_DECIMAL_PRICE_CHANGE} = {bp_diff:.3f} BPs")
-            print(f"PnL Increment for this step: {bp_diff:.3f} BPs * ${DOLLARS_PER_BP}/BP * {current_position} = ${pnl_increment:.2f}")
-            print(f"PnL from Previous Level: ${accumulated_pnl:.2f}")
-            print(f"Total PnL for Current Level: ${accumulated_pnl:.2f} + ${pnl_increment:.2f} = ${row['projected_pnl']}")
-        
-        # Update accumulators for next iteration
-        accumulated_pnl = row['projected_pnl']
-        previous_price = current_price
-        
-        # Update position based on orders at this level
-        qty = row.get('my_qty')
-        side = row.get('working_qty_side')
-        
-        if qty and qty != "":  # If there's a quantity
-            qty = int(qty)
-            if side == '1':  # Buy order
-                current_position += qty
-            elif side == '2':  # Sell order
-                current_position -= qty
-                
-        # Store the position AFTER processing orders at this level
-        row['position_debug'] = current_position
-        # Calculate risk as position multiplied by 15.625
-        row['risk'] = current_position * 15.625
-        
-        # Calculate breakeven as Projected PnL / Risk (showing 0 if either value is 0)
-        if row['projected_pnl'] != 0 and row['risk'] != 0:
-            row['breakeven'] = row['projected_pnl'] / row['risk']
-        else:
-            row['breakeven'] = 0
+    pnl = np.round(pnl, 2)
+    risk = positions * DOLLARS_PER_TICK  # Risk is position multiplied by 15.625
+    with np.errstate(divide='ignore', invalid='ignore'):
+        breakeven = np.where((pnl != 0) & (risk != 0), pnl / risk, 0.0)
     
-    # Sort back to original order (high to low price should be the same)
-    # This is a safeguard in case the original data had a different sorting
-    output_data.sort(key=lambda x: float('-inf') if x.get('decimal_price_val') is None else x.get('decimal_price_val'), reverse=True)
+    for row, exact, above, pos, row_pnl, row_risk, row_be in zip(
+            output_data, is_exact_spot.tolist(), is_above_spot.tolist(), positions.tolist(),
+            pnl.tolist(), risk.tolist(), breakeven.tolist()):
+        row['is_exact_spot'] = int(exact)
+        row['is_below_spot'] = 0
+        row['is_above_spot'] = int(above)
+        row['projected_pnl'] = row_pnl
+        row['position_debug'] = pos
+        row['risk'] = row_risk
+        row['breakeven'] = row_be
     
-    # Log some debug info for rows with orders or at spot price
-    for i, row in enumerate(output_data):
-        if row.get('decimal_price_val') is not None:
-            if row.get('my_qty') and row.get('my_qty') != "":
-                print(f"Row {i}: Price {row['price']}, Qty {row['my_qty']}, Side {row.get('working_qty_side')}, Position (after fill) {row.get('position_debug')}, PnL {row['projected_pnl']}, Risk {row['risk']}, Breakeven {row['breakeven']:.2f}")
-            elif row.get('is_exact_spot') == 1:
-                print(f"Row {i}: Price {row['price']} (SPOT PRICE), Position (after fill) {row.get('position_debug')}, PnL {row['projected_pnl']}, Risk {row['risk']}, Breakeven {row['breakeven']:.2f}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"P&L projections with baseline: Pos={base_position}, PnL=${base_pnl:.2f}")
+        for i, row in enumerate(output_data):
+            if row.get('my_qty') not in (None, "") or row['is_exact_spot'] == 1:
+                logger.debug(f"Row {i}: Price {row['price']}{' (SPOT PRICE)' if row['is_exact_spot'] else ''}, "
+                             f"Qty {row['my_qty']}, Side {row.get('working_qty_side')}, Position (after fill) {row['position_debug']}, "
+                             f"PnL {row['projected_pnl']}, Risk {row['risk']}, Breakeven {row['breakeven']:.2f}")
     
     return output_data
 
@@ -148,12 +148,14 @@ class SimpleHandler(FileSystemEventHandler):
             print("✅ trade_state completed")
 
             print("🔄 Running risk_stream...")
-            run_risk_once()
+            risk_updated = run_risk_once()
             print("✅ risk_stream completed")
 
-            print("🔄 Running HTML generation...")
-            generate_html_once()
-            print("✅ HTML generation completed")
+            # The HTML only changes when the risk pickle does
+            if risk_updated:
+                print("🔄 Running HTML generation...")
+                generate_html_once()
+                print("✅ HTML generation completed")
 
         t_lifo = threading.Thread(target=lifo_chain)
         t_net = threading.Thread(target=net_position_chain)
@@ -1,4 +1,3 @@
-import pandas as pd
 import sys
 import os
 from datetime import datetime, timedelta
@@ -7,17 +6,12 @@ import math
 import pickle
 import requests
 
+from lib.trading.csv_tail import get_latest_row
+
 def get_last_trade_state_event(file_path: str) -> dict:
-    """Get the last row of the trade state events CSV as a dictionary."""
+    """Get the last row of the trade state events CSV as a dictionary (cached until the file changes)."""
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
-        
-        # Get the last row
-        last_row = df.iloc[-1]
-        
-        # Convert the last row to a dictionary
-        trade_dict = last_row.to_dict()
+        trade_dict = get_latest_row(file_path)
         
         return trade_dict
     except Exception as e:
@@ -26,16 +20,9 @@ def get_last_trade_state_event(file_path: str) -> dict:
 
 
 def get_technical_dict(file_path: str) -> dict:
-    """Get the last row of the technical dict CSV as a dictionary."""
+    """Get the last row of the technical dict CSV as a dictionary (cached until the file changes)."""
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
-        
-        # Get the last row
-        last_row = df.iloc[-1]
-        
-        # Convert the last row to a dictionary
-        technical_dict = last_row.to_dict()
+        technical_dict = get_latest_row(file_path)
         
         return technical_dict
     except Exception as e:
@@ -44,16 +31,9 @@ def get_technical_dict(file_path: str) -> dict:
 
 
 def get_last_net_position(file_path: str) -> dict:
-    """Get the last row of the net position streaming CSV as a dictionary."""
+    """Get the last row of the net position streaming CSV as a dictionary (cached until the file changes)."""
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
-        
-        # Get the last row
-        last_row = df.iloc[-1]
-        
-        # Convert the last row to a dictionary
-        net_position_dict = last_row.to_dict()
+        net_position_dict = get_latest_row(file_path)
         
         return net_position_dict
     except Exception as e:
@@ -62,16 +42,9 @@ def get_last_net_position(file_path: str) -> dict:
 
 
 def get_current_price(file_path: str) -> float:
-    """Get the current price from the price streaming CSV."""
+    """Get the current price from the price streaming CSV (last row with a price, cached until the file changes)."""
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
-        df = df.dropna(subset=["price"])
-        # Get the last row
-        last_row = df.iloc[-1]
-        
-        # Convert the last row to a dictionary
-        last_row_dict = last_row.to_dict()
+        last_row_dict = get_latest_row(file_path, required="price")
         
         current_price = last_row_dict["price"]
 
@@ -81,4 +54,4 @@ def get_current_price(file_path: str) -> float:
         return current_price
     except Exception as e:
         print(f"Error reading price streaming: {e}")
-        return 0
\ No newline at end of file
+        return 0